@@ -0,0 +1,184 @@
+# anomali.py
+import math
+import threading
+from collections import deque
+
+from model import hari_ke_tanggal
+from konfigurasi import (ANOMALI_JENDELA_HARI, ANOMALI_ALPHA_EWMA, ANOMALI_ALPHA_MUSIMAN, ANOMALI_AMBANG_Z,
+                         ANOMALI_MIN_JUMLAH, ANOMALI_RIWAYAT)
+
+
+def _simpangan(varians: float, rata: float) -> float:
+    # Batas bawah ala Poisson (varians ~ rata-rata, minimal 1): hari-hari yang nyaris konstan tidak membuat
+    # kenaikan kecil tampak ekstrem.
+    return math.sqrt(max(varians, rata, 1.0))
+
+
+class StatistikKategori:
+    """Statistik jumlah tiket harian satu kategori, diperbarui per hari yang ditutup (O(1), memori tetap):
+    jendela bergulir (deque + jumlah & jumlah kuadrat), EWMA rata-rata/varians, dan EWMA per hari dalam minggu."""
+
+    __slots__ = ("jendela", "_jumlah", "_kuadrat", "ewma", "ewvar", "n", "musiman", "musiman_var", "musiman_n",
+                 "riwayat")
+
+    def __init__(self, jendela: int, riwayat: int):
+        self.jendela = deque(maxlen=jendela)
+        self._jumlah = self._kuadrat = 0.0
+        self.ewma = self.ewvar = 0.0
+        self.n = 0
+        self.musiman = [0.0] * 7
+        self.musiman_var = [0.0] * 7
+        self.musiman_n = [0] * 7
+        self.riwayat = deque(maxlen=riwayat)    # hari anomali terakhir (dict), terbaru di kanan
+
+    def rata_bergulir(self) -> tuple[float, float]:
+        n = len(self.jendela)
+        if n == 0: return 0.0, 0.0
+        rata = self._jumlah / n
+        varians = (self._kuadrat - self._jumlah * rata) / (n - 1) if n > 1 else 0.0
+        return rata, max(varians, 0.0)
+
+    def skor(self, hari: int, jumlah: int) -> dict:
+        """Bandingkan jumlah pada `hari` dengan baseline sebelum hari itu. Skor = z terkecil dari ketiga baseline,
+        jadi hari baru dianggap anomali jika tinggi terhadap semuanya (termasuk pola hari dalam minggu)."""
+        rata, varians = self.rata_bergulir()
+        z = [(jumlah - rata) / _simpangan(varians, rata)]
+        if self.n: z.append((jumlah - self.ewma) / _simpangan(self.ewvar, self.ewma))
+        dow = (hari + 3) % 7     # hari 0 (1970-01-01) adalah Kamis; 0 = Senin
+        musiman = self.musiman[dow] if self.musiman_n[dow] >= 3 else None
+        if musiman is not None: z.append((jumlah - musiman) / _simpangan(self.musiman_var[dow], musiman))
+        return {"hari": hari, "jumlah": jumlah, "rata_bergulir": rata, "ewma": self.ewma,
+                "baseline_musiman": musiman, "skor": min(z)}
+
+    def tutup_hari(self, hari: int, jumlah: int, alpha: float, alpha_musiman: float):
+        if len(self.jendela) == self.jendela.maxlen:
+            lama = self.jendela[0]
+            self._jumlah -= lama
+            self._kuadrat -= lama * lama
+        self.jendela.append(jumlah)
+        self._jumlah += jumlah
+        self._kuadrat += jumlah * jumlah
+
+        if self.n == 0: self.ewma = float(jumlah)
+        else:
+            selisih = jumlah - self.ewma
+            self.ewma += alpha * selisih
+            self.ewvar = (1 - alpha) * (self.ewvar + alpha * selisih * selisih)
+        self.n += 1
+
+        dow = (hari + 3) % 7
+        if self.musiman_n[dow] == 0: self.musiman[dow] = float(jumlah)
+        else:
+            selisih = jumlah - self.musiman[dow]
+            self.musiman[dow] += alpha_musiman * selisih
+            self.musiman_var[dow] = (1 - alpha_musiman) * (self.musiman_var[dow] + alpha_musiman * selisih * selisih)
+        self.musiman_n[dow] += 1
+
+    def koreksi_jendela(self, umur: int, delta: int) -> bool:
+        """Ubah jumlah hari yang sudah ditutup `umur` hari lalu (1 = kemarin) jika masih di dalam jendela.
+        EWMA & baseline musiman tidak dihitung ulang (perkiraan yang disengaja agar tetap O(1))."""
+        if not 1 <= umur <= len(self.jendela): return False
+        i = len(self.jendela) - umur
+        lama = self.jendela[i]
+        baru = max(lama + delta, 0)
+        self.jendela[i] = baru
+        self._jumlah += baru - lama
+        self._kuadrat += baru * baru - lama * lama
+        return True
+
+
+class DetektorAnomali:
+    """Deteksi lonjakan jumlah tiket harian per kategori secara incremental (tanpa akses database).
+
+    Hari terbuka = hari terbaru yang sudah terlihat (atau `hari_ini`); jumlahnya masih bisa bertambah dan
+    dinilai sebagai status berjalan. Saat hari maju, hari sebelumnya ditutup untuk semua kategori (hari tanpa
+    tiket = 0), dinilai terhadap baseline, lalu masuk ke statistik. Hari ditandai anomali jika
+    jumlah >= min_jumlah dan skor (z terkecil dari baseline bergulir, EWMA, dan musiman) >= ambang_z,
+    setelah minimal setengah jendela hari teramati. Tiket bertanggal setelah `hari_maks` (hari ini) diabaikan:
+    satu tanggal salah ketik di masa depan tidak boleh memajukan hari terbuka."""
+
+    def __init__(self, jendela: int = ANOMALI_JENDELA_HARI, alpha: float = ANOMALI_ALPHA_EWMA,
+                 alpha_musiman: float = ANOMALI_ALPHA_MUSIMAN, ambang_z: float = ANOMALI_AMBANG_Z,
+                 min_jumlah: int = ANOMALI_MIN_JUMLAH, riwayat: int = ANOMALI_RIWAYAT):
+        self.jendela, self.alpha, self.alpha_musiman = jendela, alpha, alpha_musiman
+        self.ambang_z, self.min_jumlah, self.riwayat = ambang_z, min_jumlah, riwayat
+        self.hari_terbuka: int | None = None
+        self.seq = 0                # seq change log terakhir yang sudah diterapkan (diatur pemanggil)
+        self._statistik: dict[str, StatistikKategori] = {}
+        self._terbuka: dict[str, int] = {}
+        self._lock = threading.RLock()
+
+    def _stat(self, kategori: str) -> StatistikKategori:
+        stat = self._statistik.get(kategori)
+        if stat is None:
+            stat = self._statistik[kategori] = StatistikKategori(self.jendela, self.riwayat)
+        return stat
+
+    def _tandai(self, stat: StatistikKategori, hasil: dict) -> bool:
+        return (stat.n >= self.jendela // 2 and hasil["jumlah"] >= self.min_jumlah
+                and hasil["skor"] >= self.ambang_z)
+
+    def majukan(self, hari: int):
+        """Jadikan `hari` hari terbuka; semua hari sebelumnya yang belum ditutup ditutup (dinilai + dicatat)."""
+        with self._lock:
+            if self.hari_terbuka is None:
+                self.hari_terbuka = hari
+                return
+            while self.hari_terbuka < hari:
+                h = self.hari_terbuka
+                for kategori, stat in self._statistik.items():
+                    jumlah = self._terbuka.get(kategori, 0)
+                    hasil = stat.skor(h, jumlah)
+                    if self._tandai(stat, hasil):
+                        stat.riwayat.append({**hasil, "kategori": kategori})
+                    stat.tutup_hari(h, jumlah, self.alpha, self.alpha_musiman)
+                self._terbuka = {}
+                self.hari_terbuka = h + 1
+
+    def tambah(self, kategori: str, hari: int, delta: int = 1, hari_maks: int | None = None):
+        """Terapkan tiket baru (+1) atau terhapus (-1) pada `hari`. Hari lama di luar jendela dan hari setelah
+        `hari_maks` diabaikan."""
+        if hari_maks is not None and hari > hari_maks: return
+        with self._lock:
+            self._stat(kategori)
+            if self.hari_terbuka is None or hari > self.hari_terbuka:
+                self.majukan(hari)
+            if hari == self.hari_terbuka:
+                self._terbuka[kategori] = max(self._terbuka.get(kategori, 0) + delta, 0)
+            else:
+                self._statistik[kategori].koreksi_jendela(self.hari_terbuka - hari, delta)
+
+    def muat_awal(self, baris, hari_terbuka: int):
+        """Isi statistik dari jumlah harian (hari, kategori, jumlah) terurut per hari, sampai `hari_terbuka`
+        (baris setelahnya diabaikan)."""
+        with self._lock:
+            for hari, kategori, jumlah in baris:
+                self.tambah(kategori, hari, jumlah, hari_maks=hari_terbuka)
+            self.majukan(hari_terbuka)
+
+    @staticmethod
+    def _keluaran(hasil: dict, kategori: str, berjalan: bool, anomali: bool) -> dict:
+        return {"tanggal": hari_ke_tanggal(hasil["hari"]), "kategori": kategori, "jumlah": hasil["jumlah"],
+                "rata_bergulir": round(hasil["rata_bergulir"], 2), "ewma": round(hasil["ewma"], 2),
+                "baseline_musiman": None if hasil["baseline_musiman"] is None else round(hasil["baseline_musiman"], 2),
+                "skor": round(hasil["skor"], 2), "berjalan": berjalan, "anomali": anomali}
+
+    def status_terkini(self) -> list[dict]:
+        """Penilaian hari terbuka (jumlah sejauh ini) untuk setiap kategori, skor tertinggi dulu."""
+        with self._lock:
+            if self.hari_terbuka is None: return []
+            hasil = []
+            for kategori, stat in self._statistik.items():
+                nilai = stat.skor(self.hari_terbuka, self._terbuka.get(kategori, 0))
+                hasil.append(self._keluaran(nilai, kategori, True, self._tandai(stat, nilai)))
+            return sorted(hasil, key=lambda h: h["skor"], reverse=True)
+
+    def anomali(self, kategori: str | None = None, termasuk_berjalan: bool = True) -> list[dict]:
+        """Hari yang ditandai anomali (maks. `riwayat` terakhir per kategori), terbaru dulu.
+        termasuk_berjalan: ikut sertakan hari terbuka jika jumlah sejauh ini sudah melewati ambang."""
+        with self._lock:
+            hasil = [self._keluaran(h, k, False, True) for k, stat in self._statistik.items()
+                     if kategori is None or k == kategori for h in stat.riwayat]
+            if termasuk_berjalan:
+                hasil += [s for s in self.status_terkini() if s["anomali"] and (kategori is None or s["kategori"] == kategori)]
+            return sorted(hasil, key=lambda h: (h["tanggal"], h["skor"]), reverse=True)
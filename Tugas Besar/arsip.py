@@ -0,0 +1,386 @@
+# arsip.py
+import argparse
+import datetime
+import os
+import re
+import sqlite3
+import sys
+import time
+import urllib.parse
+import database
+from impor_lambat import pd
+from model import tanggal_ke_hari, hari_ke_tanggal
+from konfigurasi import (ARSIP_DIREKTORI, ARSIP_TAHUN_AKTIF, ARSIP_MODE, ARSIP_MAKS_LAMPIRAN, DB_POOL_TIMEOUT,
+                         DB_PRAGMA)
+
+# Tiket periode tertutup dipindah ke satu file SQLite per tahun (problems_<tahun>_v<versi>.db) yang terdaftar di
+# tabel arsip_partisi database utama. File arsip berdiri sendiri (nama & kategori sebagai teks, FTS sendiri) dan
+# tidak pernah ditimpa: menggulung ulang satu tahun membuat versi baru, jadi aman dibuka immutable.
+KOLOM = "id, nama_problem, deskripsi_problem, kategori_problem, penyebab, solusi, tanggal_masuk"
+
+_SKEMA_ARSIP = [
+    """
+    CREATE TABLE problems (
+        id INTEGER PRIMARY KEY,
+        nama_problem TEXT NOT NULL,
+        deskripsi_problem TEXT,
+        kategori_problem TEXT,
+        penyebab TEXT NOT NULL,
+        solusi TEXT NOT NULL,
+        tanggal_masuk INTEGER NOT NULL
+    )
+    """,
+]
+# Indeks & FTS dibuat setelah data masuk (lebih cepat daripada dijaga per baris). Tokenizer & bobot BM25 sama
+# dengan migrasi 3 supaya skor pencarian sebanding dengan database utama.
+_INDEKS_ARSIP = [
+    "CREATE INDEX idx_problems_kategori_tanggal ON problems (kategori_problem, tanggal_masuk, id)",
+    "CREATE INDEX idx_problems_tanggal ON problems (tanggal_masuk, id)",
+    """
+    CREATE VIRTUAL TABLE problems_fts USING fts5(
+        nama_problem, deskripsi_problem, penyebab, solusi,
+        content='problems', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    "INSERT INTO problems_fts (problems_fts, rank) VALUES ('rank', 'bm25(10.0, 2.0, 4.0, 4.0)')",
+    "INSERT INTO problems_fts (problems_fts) VALUES ('rebuild')",
+    "INSERT INTO problems_fts (problems_fts) VALUES ('optimize')",
+]
+
+SQL_PARTISI = """
+    SELECT tahun, versi, berkas, hari_awal, hari_akhir, id_min, id_max, jumlah
+    FROM arsip_partisi ORDER BY tahun DESC
+"""
+
+
+def direktori_arsip(db_path: str | None = None) -> str:
+    return ARSIP_DIREKTORI or os.path.splitext(db_path or database.DB_PATH)[0] + "_arsip"
+
+
+def uri_arsip(path: str, mode: str = ARSIP_MODE) -> str:
+    uri = f"file:{urllib.parse.quote(os.path.abspath(path))}?mode=ro"
+    return uri + "&immutable=1" if mode == "immutable" else uri
+
+
+def nama_skema(partisi: dict) -> str:
+    return f"arsip_{partisi['tahun']}_{partisi['versi']}"
+
+
+def _hari(nilai) -> int | None:
+    if nilai is None or isinstance(nilai, int): return nilai
+    return tanggal_ke_hari(nilai)
+
+
+def daftar_partisi() -> list[dict]:
+    return [dict(row) for row in database.fetch_query(SQL_PARTISI) or []]
+
+
+_partisi_cache: tuple = (None, [])
+
+
+def _partisi_per_versi(versi: tuple) -> list[dict]:
+    """daftar_partisi() yang dibaca ulang hanya jika database.versi_data() berubah."""
+    global _partisi_cache
+    if _partisi_cache[0] != versi:
+        _partisi_cache = (versi, daftar_partisi())
+    return _partisi_cache[1]
+
+
+def pilih_partisi(partisi: list[dict], tanggal_mulai=None, tanggal_akhir=None,
+                  rentang_id: tuple | None = None) -> list[dict]:
+    """Partisi yang mungkin berisi baris dalam rentang tanggal (date/nomor hari) dan rentang id (min, maks);
+    batas None = tidak dibatasi. Partisi lain tidak perlu di-ATTACH sama sekali."""
+    mulai, akhir = _hari(tanggal_mulai), _hari(tanggal_akhir)
+    id_min, id_maks = rentang_id or (None, None)
+    return [p for p in partisi
+            if (mulai is None or p["hari_akhir"] >= mulai) and (akhir is None or p["hari_awal"] <= akhir)
+            and (id_min is None or p["id_max"] >= id_min) and (id_maks is None or p["id_min"] <= id_maks)]
+
+
+def sql_gabungan(sql: str, params: tuple = (), partisi: list[dict] = (), urut: tuple = (),
+                 batas: int | None = None, lewati: int = 0, utama: bool = True) -> tuple[str, tuple, dict]:
+    """Satu SELECT dengan placeholder {problems}/{fts} -> UNION ALL database utama (jika `utama`) + `partisi`,
+    lalu ORDER BY `urut` ((kolom hasil, naik), ...) dan LIMIT/OFFSET di luar gabungan.
+    Return: (sql, params, lampiran {skema: URI file arsip})."""
+    bagian, lampiran = [sql.format(problems="problems", fts="problems_fts")] if utama else [], {}
+    direktori = direktori_arsip() if partisi else None
+    for p in partisi:
+        skema = nama_skema(p)
+        lampiran[skema] = uri_arsip(os.path.join(direktori, p["berkas"]))
+        bagian.append(sql.format(problems=f"{skema}.problems", fts=f"{skema}.problems_fts"))
+    sql = " UNION ALL ".join(bagian)
+    params = tuple(params) * len(bagian)
+    if urut:
+        sql += " ORDER BY " + ", ".join(f"{kolom} {'ASC' if naik else 'DESC'}" for kolom, naik in urut)
+    if batas is not None:
+        sql += " LIMIT ? OFFSET ?"
+        params += (int(batas), int(lewati))
+    return sql, params, lampiran
+
+
+def _kelompok(partisi: list[dict]) -> list[list[dict]]:
+    return [partisi[i:i + ARSIP_MAKS_LAMPIRAN] for i in range(0, len(partisi), ARSIP_MAKS_LAMPIRAN)] or [[]]
+
+
+def _jalankan(sql: str, params: tuple, partisi: list[dict], urut: tuple, batas: int | None, lewati: int,
+              sebagai: str):
+    kelompok = _kelompok(partisi)
+    if len(kelompok) > 1 and batas is not None:
+        batas, lewati, potong = batas + lewati, 0, (lewati, lewati + batas)
+    hasil = []
+    for i, bagian in enumerate(kelompok):
+        # Kelompok pertama ikut membaca database utama; kelompok berikutnya hanya arsip.
+        teks, semua, lampiran = sql_gabungan(sql, params, bagian, urut, batas, lewati, utama=i == 0)
+        if sebagai == "dataframe": hasil.append(database.get_dataframe(teks, semua or None, lampiran=lampiran))
+        else: hasil.append(database.fetch_query(teks, semua or None, lampiran=lampiran) or [])
+    if len(hasil) == 1:
+        return hasil[0]
+    # Lebih banyak arsip daripada batas ATTACH: tiap kelompok sudah terurut & terbatas, digabung di Python.
+    awal, akhir = potong if batas is not None else (0, None)
+    if sebagai == "dataframe":
+        df = pd.concat([h for h in hasil if not h.empty] or hasil[:1], ignore_index=True)
+        if urut: df = df.sort_values([k for k, _ in urut], ascending=[n for _, n in urut], kind="stable")
+        return df.iloc[awal:akhir].reset_index(drop=True)
+    rows = [row for h in hasil for row in h]
+    for kolom, naik in reversed(urut):
+        rows.sort(key=lambda row: row[kolom], reverse=not naik)
+    return rows[awal:akhir]
+
+
+def baca(sql: str, params: tuple = (), *, tanggal_mulai=None, tanggal_akhir=None, rentang_id: tuple | None = None,
+         urut: tuple = (), batas: int | None = None, lewati: int = 0, sebagai: str = "baris"):
+    """Jalankan `sql` (SELECT dengan placeholder {problems}/{fts}, tanpa ORDER BY/LIMIT) di database utama dan
+    partisi arsip yang lolos pruning tanggal/id. sebagai: "baris" (list Row) atau "dataframe".
+    Registry dan data harus berasal dari keadaan database yang sama: di luar snapshot() dicek lewat versi_data()
+    (tanpa commit di antaranya, registry ber-cache masih berlaku), selain itu dibaca dalam satu snapshot."""
+    if not database.dalam_snapshot():
+        versi = database.versi_data()
+        if versi[1] is not None:
+            partisi = pilih_partisi(_partisi_per_versi(versi), tanggal_mulai, tanggal_akhir, rentang_id)
+            hasil = _jalankan(sql, params, partisi, urut, batas, lewati, sebagai)
+            if database.versi_data() == versi: return hasil
+    with database.snapshot():
+        partisi = pilih_partisi(daftar_partisi(), tanggal_mulai, tanggal_akhir, rentang_id)
+        return _jalankan(sql, params, partisi, urut, batas, lewati, sebagai)
+
+
+def iter_baca(sql: str, params: tuple = (), *, tanggal_mulai=None, tanggal_akhir=None,
+              rentang_id: tuple | None = None, urut: tuple = (), batch_size: int = 5000):
+    """Seperti baca(), tetapi generator baris (fetchmany) untuk hasil besar (ekspor, ProblemBatch)."""
+    with database.snapshot():
+        partisi = pilih_partisi(daftar_partisi(), tanggal_mulai, tanggal_akhir, rentang_id)
+        if len(partisi) > ARSIP_MAKS_LAMPIRAN:
+            yield from _jalankan(sql, params, partisi, urut, None, 0, "baris")
+            return
+        teks, semua, lampiran = sql_gabungan(sql, params, partisi, urut)
+        yield from database.iter_query(teks, semua or None, batch_size=batch_size, lampiran=lampiran)
+
+
+# --- Menggulung partisi (dijalankan dari CLI/admin, bukan dari jalur request) ---
+
+def _koneksi(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, timeout=DB_POOL_TIMEOUT, isolation_level=None)
+    conn.execute(f"PRAGMA busy_timeout = {int(DB_PRAGMA.get('busy_timeout', 10000))}")
+    return conn
+
+
+def _rentang_tahun(tahun: int) -> tuple[int, int]:
+    return tanggal_ke_hari(datetime.date(tahun, 1, 1)), tanggal_ke_hari(datetime.date(tahun, 12, 31))
+
+
+def tahun_siap_arsip(conn: sqlite3.Connection, sebelum: int) -> list[int]:
+    """Tahun (< `sebelum`) yang masih punya tiket di database utama; dicek per tahun lewat indeks tanggal."""
+    row = conn.execute("SELECT MIN(tanggal_masuk) FROM problems_data").fetchone()
+    if row[0] is None: return []
+    hasil = []
+    for tahun in range(hari_ke_tanggal(row[0]).year, sebelum):
+        if conn.execute("SELECT 1 FROM problems_data WHERE tanggal_masuk BETWEEN ? AND ? LIMIT 1",
+                        _rentang_tahun(tahun)).fetchone():
+            hasil.append(tahun)
+    return hasil
+
+
+def _bangun_file(db_path: str, tujuan: str, tahun: int, path_lama: str | None) -> tuple[int, int]:
+    """Salin tiket `tahun` dari database utama (+ isi versi arsip sebelumnya) ke file baru, lalu bangun indeks,
+    FTS, statistik, dan VACUUM. Return: (seq change log saat disalin, jumlah baris dari database utama)."""
+    conn = _koneksi(tujuan)
+    try:
+        conn.execute("PRAGMA journal_mode = OFF")     # file sementara: kalau gagal, file dibuang
+        conn.execute("ATTACH ? AS sumber", (db_path,))
+        if path_lama: conn.execute("ATTACH ? AS lama", (uri_arsip(path_lama, "ro"),))
+        conn.execute("BEGIN")
+        for sql in _SKEMA_ARSIP: conn.execute(sql)
+        # Seq change log dan salinan baris dibaca dalam satu transaksi baca (snapshot yang sama).
+        row = conn.execute("SELECT seq FROM sumber.sqlite_sequence WHERE name = 'problems_changelog'").fetchone()
+        seq = row[0] if row else 0
+        jumlah = conn.execute("""
+            INSERT INTO problems (id, nama_problem, deskripsi_problem, kategori_problem, penyebab, solusi, tanggal_masuk)
+            SELECT d.id, katalog_problem.nama, d.deskripsi_problem, kategori.nama, d.penyebab, d.solusi, d.tanggal_masuk
+            FROM sumber.problems_data d
+            LEFT JOIN sumber.katalog_problem ON katalog_problem.id = d.katalog_id
+            LEFT JOIN sumber.kategori ON kategori.id = d.kategori_id
+            WHERE d.tanggal_masuk BETWEEN ? AND ?
+            ORDER BY d.id
+        """, _rentang_tahun(tahun)).rowcount
+        if path_lama:
+            conn.execute(f"INSERT OR IGNORE INTO problems ({KOLOM}) SELECT {KOLOM} FROM lama.problems ORDER BY id")
+        for sql in _INDEKS_ARSIP: conn.execute(sql)
+        conn.execute("COMMIT")
+        conn.execute("DETACH sumber")
+        if path_lama: conn.execute("DETACH lama")
+        conn.execute("ANALYZE")
+        conn.execute("PRAGMA journal_mode = DELETE")
+        conn.execute("VACUUM")
+        return seq, jumlah
+    finally:
+        conn.close()
+
+
+def _pindahkan(conn: sqlite3.Connection, tahun: int, path: str, berkas: str, versi: int, seq_bangun: int) -> int:
+    """Dalam satu transaksi tulis: hapus dari problems_data tiket yang sudah ada di file arsip baru dan daftarkan
+    file itu. Bagi pembaca ini perpindahan fisik, bukan perubahan data: rollup_harian dikembalikan (frekuensi &
+    tren tetap mencakup arsip) dan entri change log dari penghapusan ini dibuang. Return: jumlah tiket dipindah."""
+    awal, akhir = _rentang_tahun(tahun)
+    conn.execute("ATTACH ? AS arsip_baru", (uri_arsip(path, "ro"),))
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if conn.execute("""
+                SELECT 1 FROM problems_changelog
+                WHERE seq > ? AND problem_id IN (SELECT id FROM arsip_baru.problems) LIMIT 1
+            """, (seq_bangun,)).fetchone():
+                raise RuntimeError(f"Tiket tahun {tahun} berubah selama file arsip dibangun; ulangi penggulungan.")
+            seq_awal = conn.execute(
+                "SELECT seq FROM sqlite_sequence WHERE name = 'problems_changelog'").fetchone()[0]
+            pilih = "FROM problems_data WHERE tanggal_masuk BETWEEN ? AND ? AND id IN (SELECT id FROM arsip_baru.problems)"
+            conn.execute(f"""
+                CREATE TEMP TABLE rollup_arsip AS
+                SELECT tanggal_masuk AS tanggal, COALESCE(kategori_id, 0) AS kategori_id, katalog_id, COUNT(*) AS jumlah
+                {pilih} GROUP BY 1, 2, 3
+            """, (awal, akhir))
+            dipindah = conn.execute(f"DELETE {pilih}", (awal, akhir)).rowcount
+            conn.execute("""
+                INSERT INTO rollup_harian (tanggal, kategori_id, katalog_id, jumlah)
+                SELECT tanggal, kategori_id, katalog_id, jumlah FROM temp.rollup_arsip WHERE true
+                ON CONFLICT (tanggal, kategori_id, katalog_id) DO UPDATE SET jumlah = jumlah + excluded.jumlah
+            """)
+            conn.execute("DROP TABLE temp.rollup_arsip")
+            conn.execute("DELETE FROM problems_changelog WHERE seq > ?", (seq_awal,))
+            conn.execute("""
+                INSERT INTO arsip_partisi (tahun, versi, berkas, hari_awal, hari_akhir, id_min, id_max, jumlah)
+                SELECT ?, ?, ?, ?, ?, MIN(id), MAX(id), COUNT(*) FROM arsip_baru.problems WHERE true
+                ON CONFLICT (tahun) DO UPDATE SET
+                    versi = excluded.versi, berkas = excluded.berkas, id_min = excluded.id_min,
+                    id_max = excluded.id_max, jumlah = excluded.jumlah
+            """, (tahun, versi, berkas, awal, akhir))
+            conn.execute("COMMIT")
+            return dipindah
+        except BaseException:
+            if conn.in_transaction: conn.execute("ROLLBACK")
+            raise
+    finally:
+        conn.execute("DETACH arsip_baru")
+
+
+def _hapus_versi_lama(direktori: str, tahun: int, versi: int):
+    # Versi tepat sebelumnya disimpan: pembaca yang snapshot-nya dibuat sebelum commit masih merujuknya.
+    for nama in os.listdir(direktori):
+        cocok = re.fullmatch(rf"problems_{tahun}_v(\d+)\.db", nama)
+        if cocok and int(cocok.group(1)) < versi - 1:
+            try:
+                os.remove(os.path.join(direktori, nama))
+            except OSError:
+                pass    # mis. masih terbuka di Windows; dicoba lagi pada penggulungan berikutnya
+
+
+def gulung_tahun(db_path: str, tahun: int) -> dict:
+    """Pindahkan tiket `tahun` dari database utama ke file arsip tahun itu (versi baru; isi versi lama ikut)."""
+    mulai = time.perf_counter()
+    direktori = direktori_arsip(db_path)
+    os.makedirs(direktori, exist_ok=True)
+    conn = _koneksi(db_path)
+    try:
+        lama = conn.execute("SELECT versi, berkas FROM arsip_partisi WHERE tahun = ?", (tahun,)).fetchone()
+        versi = (lama[0] if lama else 0) + 1
+        berkas = f"problems_{tahun}_v{versi}.db"
+        path = os.path.join(direktori, berkas)
+        sementara = path + ".tmp"
+        if os.path.exists(sementara): os.remove(sementara)
+        try:
+            seq, jumlah = _bangun_file(db_path, sementara, tahun, os.path.join(direktori, lama[1]) if lama else None)
+        except BaseException:
+            if os.path.exists(sementara): os.remove(sementara)
+            raise
+        if jumlah == 0:
+            os.remove(sementara)
+            return {"tahun": tahun, "dipindah": 0, "berkas": lama[1] if lama else None}
+        os.replace(sementara, path)
+        try:
+            dipindah = _pindahkan(conn, tahun, path, berkas, versi, seq)
+        except BaseException:
+            os.remove(path)
+            raise
+    finally:
+        conn.close()
+    _hapus_versi_lama(direktori, tahun, versi)
+    return {"tahun": tahun, "dipindah": dipindah, "berkas": berkas, "versi": versi,
+            "ukuran_mb": round(os.path.getsize(path) / (1024 * 1024), 2),
+            "durasi_detik": round(time.perf_counter() - mulai, 2)}
+
+
+def gulung(db_path: str | None = None, sebelum: int | None = None, tahun: list[int] | None = None,
+           vacuum: bool = False) -> list[dict]:
+    """Arsipkan semua tahun < `sebelum` (default: tahun ini - ARSIP_TAHUN_AKTIF + 1), atau hanya `tahun`, lalu
+    optimize indeks FTS database utama (memegang lock tulis beberapa detik pada jutaan baris).
+    vacuum=True: VACUUM database utama sesudahnya supaya halaman yang kosong dikembalikan ke sistem."""
+    db_path = db_path or database.DB_PATH
+    if sebelum is None: sebelum = datetime.date.today().year - ARSIP_TAHUN_AKTIF + 1
+    if not tahun:
+        conn = _koneksi(db_path)
+        try: tahun = tahun_siap_arsip(conn, sebelum)
+        finally: conn.close()
+    hasil = [gulung_tahun(db_path, t) for t in sorted(tahun)]
+    if any(h["dipindah"] for h in hasil):
+        conn = _koneksi(db_path)
+        try:
+            # Hapus di FTS5 hanya menambah tombstone; tanpa optimize indeks tetap sebesar sebelum diarsipkan.
+            conn.execute("INSERT INTO problems_fts (problems_fts) VALUES ('optimize')")
+            if vacuum: conn.execute("VACUUM")
+        finally:
+            conn.close()
+    return hasil
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Arsip tiket per tahun (file SQLite terpisah, dibaca lewat ATTACH).")
+    parser.add_argument("--db", help="Path database utama (default: DB_PATH di konfigurasi.py)")
+    sub = parser.add_subparsers(dest="perintah", required=True)
+    p_gulung = sub.add_parser("gulung", help="Pindahkan tiket tahun-tahun lama ke file arsip")
+    p_gulung.add_argument("--sebelum", type=int, help=f"Arsipkan tahun < ini (default: tahun ini - {ARSIP_TAHUN_AKTIF - 1})")
+    p_gulung.add_argument("--tahun", type=int, action="append", help="Hanya tahun ini (boleh diulang)")
+    p_gulung.add_argument("--vacuum", action="store_true", help="VACUUM database utama setelah memindah")
+    sub.add_parser("daftar", help="Tampilkan partisi arsip yang terdaftar")
+    args = parser.parse_args(argv)
+
+    if args.db: database.atur_db_path(args.db)
+    if not database.setup_database_initial(): return 1
+    if args.perintah == "gulung":
+        for h in gulung(database.DB_PATH, args.sebelum, args.tahun, args.vacuum):
+            if h["dipindah"]:
+                print(f"Tahun {h['tahun']}: {h['dipindah']:,} tiket -> {h['berkas']} "
+                      f"({h['ukuran_mb']} MB, {h['durasi_detik']} s)")
+            else:
+                print(f"Tahun {h['tahun']}: tidak ada tiket di database utama.")
+        return 0
+
+    direktori = direktori_arsip()
+    for p in daftar_partisi():
+        path = os.path.join(direktori, p["berkas"])
+        ukuran = f"{os.path.getsize(path) / (1024 * 1024):.2f} MB" if os.path.exists(path) else "FILE HILANG"
+        print(f"{p['tahun']}  v{p['versi']}  {p['jumlah']:>10,} tiket  id {p['id_min']}-{p['id_max']}  "
+              f"{p['berkas']} ({ukuran})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,235 @@
+# benchmark.py
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import multiprocessing
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+SKALA_DEFAULT = [1_000, 10_000, 100_000]
+# Jumlah pengulangan per method: method yang membaca seluruh tabel diulang lebih sedikit.
+ULANG_DEFAULT = {
+    "tambah_problem": 200,
+    "get_semua_problems": 3,
+    "get_dataframe_problems": 3,
+    "get_frekuensi_problem": 20,
+    "get_tren_problem_harian": 20,
+    "get_tren_problem_bulanan": 20,
+    "get_problem_by_id": 500,
+    "hapus_problem": 200,
+}
+
+
+def _rss_puncak_mb() -> float | None:
+    try:
+        import resource
+    except ImportError:     # Windows
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux melaporkan KiB, macOS byte.
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _persentil(data: list[float], p: float) -> float:
+    urut = sorted(data)
+    k = (len(urut) - 1) * p / 100
+    bawah = int(k)
+    atas = min(bawah + 1, len(urut) - 1)
+    return urut[bawah] + (urut[atas] - urut[bawah]) * (k - bawah)
+
+
+def ringkas_latensi(durasi: list[float], baris: int | None = None) -> dict:
+    """Ringkasan latensi (ms) dari daftar durasi (detik) per operasi."""
+    total = sum(durasi)
+    hasil = {
+        "n": len(durasi),
+        "min_ms": round(min(durasi) * 1000, 4),
+        "p50_ms": round(_persentil(durasi, 50) * 1000, 4),
+        "p90_ms": round(_persentil(durasi, 90) * 1000, 4),
+        "p99_ms": round(_persentil(durasi, 99) * 1000, 4),
+        "maks_ms": round(max(durasi) * 1000, 4),
+        "rata_ms": round(statistics.fmean(durasi) * 1000, 4),
+        "ops_per_detik": round(len(durasi) / total, 2) if total > 0 else None,
+    }
+    if baris is not None:
+        hasil["baris"] = baris
+        hasil["baris_per_detik"] = round(baris * len(durasi) / total, 1) if total > 0 else None
+    return hasil
+
+
+def _ukur(fungsi, argumen: list, pemanasan: tuple | None = None) -> list[float]:
+    """Durasi tiap panggilan fungsi(*arg). `pemanasan`: argumen satu panggilan awal yang tidak diukur, supaya
+    import pandas/numpy, cache halaman SQLite, dan koneksi pool tidak masuk ke pengulangan pertama."""
+    if pemanasan is not None:
+        fungsi(*pemanasan)
+    durasi = []
+    for arg in argumen:
+        mulai = time.perf_counter()
+        fungsi(*arg)
+        durasi.append(time.perf_counter() - mulai)
+    return durasi
+
+
+def _ukuran_db_mb(path: str) -> float:
+    """Ukuran database di disk termasuk file -wal/-shm (isi yang belum di-checkpoint masih ada di -wal)."""
+    total = sum(os.path.getsize(f) for f in (path, path + "-wal", path + "-shm") if os.path.exists(f))
+    return round(total / (1024 * 1024), 2)
+
+
+def jalankan_skala(skala: int, seed: int = 42, ulang: dict | None = None, metode: list[str] | None = None) -> dict:
+    """Satu skala benchmark di database sementara. Dijalankan di proses terpisah supaya RSS puncak per skala."""
+    ulang = {**ULANG_DEFAULT, **(ulang or {})}
+    metode = metode or list(ULANG_DEFAULT)
+    with tempfile.TemporaryDirectory(prefix="bench_diagnosis_") as direktori, \
+            contextlib.redirect_stdout(io.StringIO()):
+        import database
+        database.atur_db_path(os.path.join(direktori, "bench.db"))
+        from manajer_diagnosis import HardwareDiagnoser
+        from data_sintetis import GeneratorProblem, isi_database
+
+        # Cache query dimatikan: yang diukur adalah query ke database, bukan hit cache.
+        diagnoser = HardwareDiagnoser(gunakan_cache=False)
+        muat = isi_database(diagnoser, skala, seed=seed)
+        database.kirim_tulis(lambda conn: conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone(),
+                             eksklusif=True).result()
+        hasil = {
+            "skala": skala,
+            "muat_detik": muat["durasi_detik"],
+            "muat_baris_per_detik": muat["baris_per_detik"],
+            "ukuran_db_mb": _ukuran_db_mb(database.DB_PATH),
+            "rss_setelah_muat_mb": _rss_puncak_mb(),
+            "metode": {},
+        }
+
+        rnd = random.Random(seed)
+        ids = [row[0] for row in database.fetch_query("SELECT id FROM problems") or []]
+        generator = GeneratorProblem(seed=seed + 1)
+        rentang = (generator.tanggal_akhir - datetime.timedelta(days=365), generator.tanggal_akhir)
+
+        def ukur(nama, fungsi, argumen, baris=None, pemanasan=None):
+            # Method baca dipanaskan dengan argumen pertamanya; method tulis memakai argumen cadangan sendiri.
+            if nama in metode and argumen:
+                hasil["metode"][nama] = ringkas_latensi(_ukur(fungsi, argumen, pemanasan or argumen[0]), baris)
+
+        ukur("get_problem_by_id", diagnoser.get_problem_by_id,
+             [(rnd.choice(ids),) for _ in range(ulang["get_problem_by_id"])])
+        ukur("get_semua_problems", diagnoser.get_semua_problems,
+             [()] * ulang["get_semua_problems"], baris=len(ids))
+        ukur("get_dataframe_problems", diagnoser.get_dataframe_problems,
+             [()] * ulang["get_dataframe_problems"], baris=len(ids))
+        ukur("get_frekuensi_problem", diagnoser.get_frekuensi_problem,
+             [rentang] * ulang["get_frekuensi_problem"])
+        ukur("get_tren_problem_harian", diagnoser.get_tren_problem_harian,
+             [(None,)] * ulang["get_tren_problem_harian"])
+        ukur("get_tren_problem_bulanan", diagnoser.get_tren_problem_bulanan,
+             [(None,)] * ulang["get_tren_problem_bulanan"])
+        baru = [(p,) for p in generator.buat(ulang["tambah_problem"] + 1, mulai=skala)]
+        ukur("tambah_problem", diagnoser.tambah_problem, baru[1:], pemanasan=baru[0])
+        dihapus = [(i,) for i in rnd.sample(ids, min(len(ids), ulang["hapus_problem"] + 1))]
+        ukur("hapus_problem", diagnoser.hapus_problem, dihapus[1:], pemanasan=dihapus[0])
+
+        hasil["rss_puncak_mb"] = _rss_puncak_mb()
+        database.tutup_pool()
+    return hasil
+
+
+def _metadata() -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "waktu": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "cpu": os.cpu_count(),
+    }
+
+
+def jalankan_benchmark(skala: list[int] = None, seed: int = 42, ulang: dict | None = None,
+                       metode: list[str] | None = None, verbose: bool = True) -> dict:
+    """Jalankan semua skala (masing-masing di proses baru) dan kembalikan hasil siap ditulis ke JSON."""
+    hasil = {"meta": {**_metadata(), "seed": seed}, "hasil": []}
+    konteks = multiprocessing.get_context("spawn")
+    for n in skala or SKALA_DEFAULT:
+        if verbose: print(f"[benchmark] skala {n:,} baris...", flush=True)
+        with konteks.Pool(1) as pool:
+            hasil_skala = pool.apply(jalankan_skala, (n, seed, ulang, metode))
+        hasil["hasil"].append(hasil_skala)
+        if verbose: tampilkan_skala(hasil_skala)
+    return hasil
+
+
+def tampilkan_skala(hasil_skala: dict):
+    print(f"  muat {hasil_skala['muat_baris_per_detik']:,.0f} baris/detik, DB {hasil_skala['ukuran_db_mb']} MB, "
+          f"RSS puncak {hasil_skala['rss_puncak_mb']} MB")
+    for nama, r in hasil_skala["metode"].items():
+        print(f"  {nama:<26} p50 {r['p50_ms']:>10.3f} ms  p90 {r['p90_ms']:>10.3f} ms  "
+              f"p99 {r['p99_ms']:>10.3f} ms  {r['ops_per_detik'] or 0:>10.1f} ops/s")
+
+
+def bandingkan(lama: dict, baru: dict, ambang: float = 1.2) -> list[str]:
+    """Bandingkan p50 dua file hasil; return daftar baris laporan. Rasio > `ambang` ditandai LEBIH LAMBAT."""
+    laporan = []
+    lama_per_skala = {h["skala"]: h for h in lama["hasil"]}
+    for h in baru["hasil"]:
+        acuan = lama_per_skala.get(h["skala"])
+        if not acuan: continue
+        for nama, r in h["metode"].items():
+            r_lama = acuan["metode"].get(nama)
+            if not r_lama or not r_lama["p50_ms"]: continue
+            rasio = r["p50_ms"] / r_lama["p50_ms"]
+            tanda = "LEBIH LAMBAT" if rasio > ambang else ("lebih cepat" if rasio < 1 / ambang else "")
+            laporan.append(f"{h['skala']:>10,} {nama:<26} {r_lama['p50_ms']:>10.3f} -> {r['p50_ms']:>10.3f} ms "
+                           f"(x{rasio:.2f}) {tanda}")
+    return laporan
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark HardwareDiagnoser dengan data sintetis (offline).")
+    parser.add_argument("--skala", default=",".join(map(str, SKALA_DEFAULT)),
+                        help="Daftar jumlah baris, dipisah koma (mis. 10000,1000000,10000000)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--metode", help="Hanya ukur method ini (dipisah koma)")
+    parser.add_argument("--ulang", action="append", metavar="METODE=N", help="Ganti jumlah pengulangan per method")
+    parser.add_argument("--output", "-o", help="Tulis hasil ke file JSON")
+    parser.add_argument("--bandingkan", metavar="JSON_LAMA", help="Bandingkan hasil dengan file JSON sebelumnya")
+    args = parser.parse_args(argv)
+
+    ulang = {}
+    for item in args.ulang or []:
+        nama, _, n = item.partition("=")
+        if nama not in ULANG_DEFAULT or not n.isdigit():
+            raise SystemExit(f"--ulang tidak valid: '{item}'")
+        ulang[nama] = int(n)
+    metode = args.metode.split(",") if args.metode else None
+    skala = [int(s.replace("_", "")) for s in args.skala.split(",") if s.strip()]
+
+    hasil = jalankan_benchmark(skala, seed=args.seed, ulang=ulang, metode=metode)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(hasil, f, indent=2)
+        print(f"[benchmark] Hasil ditulis ke {args.output}")
+    if args.bandingkan:
+        with open(args.bandingkan, encoding="utf-8") as f:
+            lama = json.load(f)
+        print(f"\n--- Perbandingan p50 dengan {args.bandingkan} (commit {lama['meta'].get('commit')}) ---")
+        for baris in bandingkan(lama, hasil):
+            print(baris)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+# benchmark_impor.py
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Ambang waktu import kumulatif (ms, median) per modul. Jalur inti tidak boleh memuat pandas/numpy,
+# jadi ambangnya jauh di bawah waktu import pandas (~500+ ms).
+AMBANG_MS = {
+    "konfigurasi": 20,
+    "model": 30,
+    "database": 80,
+    "manajer_diagnosis": 120,
+    "impor_ekspor": 120,
+    "layanan_http": 200,
+}
+MODUL_BERAT = ("pandas", "numpy")
+
+# Jalur inti dijalankan sungguhan (DB sementara): setelah tambah/ambil/hapus, pandas & numpy tetap belum dimuat.
+_SKRIP_JALUR_INTI = """
+import datetime, json, os, sys, tempfile
+import database
+database.atur_db_path(os.path.join(tempfile.mkdtemp(), "impor.db"))
+from manajer_diagnosis import HardwareDiagnoser
+from model import Problem
+d = HardwareDiagnoser(gunakan_cache=False)
+d.tambah_problem(Problem("Layar berkedip", "Kabel longgar", "Ganti kabel", tanggal_masuk=datetime.date(2024, 1, 1)))
+d.get_problem_by_id(1)
+d.hitung_problems()
+d.hapus_problem(1)
+database.tutup_pool()
+print(json.dumps([m for m in %r if m in sys.modules]))
+"""
+
+_DIREKTORI = os.path.dirname(os.path.abspath(__file__))
+
+
+def parse_importtime(stderr: str) -> list[tuple[str, int, int]]:
+    """Baris '-X importtime' -> [(nama, kedalaman, kumulatif µs)] sesuai urutan output (anak sebelum induk)."""
+    hasil = []
+    for baris in stderr.splitlines():
+        if not baris.startswith("import time:") or "|" not in baris: continue
+        try:
+            _, kumulatif_us, nama = baris[len("import time:"):].split("|", 2)
+            hasil.append((nama.strip(), (len(nama) - len(nama.lstrip())) // 2, int(kumulatif_us)))
+        except ValueError:
+            continue    # baris judul
+    return hasil
+
+
+def _rincian_modul(data: list[tuple[str, int, int]], modul: str) -> tuple[float, list[tuple[float, str]]]:
+    """Waktu kumulatif `modul` (ms) + import langsung di bawahnya, terberat dulu. Import saat startup
+    interpreter (site, .pth) tidak ikut karena tidak berada di subtree `modul`."""
+    posisi = next(i for i, (nama, kedalaman, _) in enumerate(data) if nama == modul and kedalaman == 0)
+    anak = []
+    for nama, kedalaman, us in reversed(data[:posisi]):
+        if kedalaman == 0: break
+        if kedalaman == 1: anak.append((us / 1000, nama))
+    return data[posisi][2] / 1000, sorted(anak, reverse=True)
+
+
+def ukur_modul(modul: str, ulang: int = 5) -> dict:
+    """Import `modul` di interpreter baru `ulang` kali; waktu kumulatif diambil dari -X importtime."""
+    waktu, terberat = [], []
+    for _ in range(ulang):
+        proses = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {modul}"], cwd=_DIREKTORI,
+                                capture_output=True, text=True)
+        if proses.returncode != 0:
+            raise RuntimeError(f"Import {modul} gagal:\n{proses.stderr[-2000:]}")
+        total_ms, anak = _rincian_modul(parse_importtime(proses.stderr), modul)
+        waktu.append(total_ms)
+        terberat = anak[:5]
+    return {"median_ms": round(statistics.median(waktu), 2), "min_ms": round(min(waktu), 2),
+            "terberat": [(nama, round(ms, 2)) for ms, nama in terberat]}
+
+
+def modul_berat_jalur_inti() -> list[str]:
+    proses = subprocess.run([sys.executable, "-c", _SKRIP_JALUR_INTI % (MODUL_BERAT,)], cwd=_DIREKTORI,
+                            capture_output=True, text=True)
+    if proses.returncode != 0:
+        raise RuntimeError(f"Skrip jalur inti gagal:\n{proses.stderr[-2000:]}")
+    return json.loads(proses.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark waktu import (cold start) dengan ambang regresi.")
+    parser.add_argument("--modul", help="Hanya ukur modul ini (dipisah koma)")
+    parser.add_argument("--ulang", type=int, default=5)
+    parser.add_argument("--faktor", type=float, default=1.0, help="Kalikan semua ambang (mis. 2 untuk mesin lambat)")
+    parser.add_argument("--output", "-o", help="Tulis hasil ke file JSON")
+    args = parser.parse_args(argv)
+
+    daftar = args.modul.split(",") if args.modul else list(AMBANG_MS)
+    hasil, regresi = {"modul": {}}, []
+    for modul in daftar:
+        r = ukur_modul(modul, args.ulang)
+        ambang = AMBANG_MS.get(modul)
+        r["ambang_ms"] = ambang * args.faktor if ambang else None
+        hasil["modul"][modul] = r
+        lewat = r["ambang_ms"] is not None and r["median_ms"] > r["ambang_ms"]
+        if lewat: regresi.append(f"{modul}: {r['median_ms']} ms > ambang {r['ambang_ms']} ms")
+        print(f"{modul:<20} median {r['median_ms']:>8.1f} ms  (ambang {r['ambang_ms'] or '-'})"
+              f"{'  LEWAT AMBANG' if lewat else ''}")
+        print("    terberat: " + ", ".join(f"{nama} {ms} ms" for nama, ms in r["terberat"]))
+
+    berat = modul_berat_jalur_inti()
+    hasil["modul_berat_jalur_inti"] = berat
+    if berat: regresi.append(f"Jalur inti memuat {', '.join(berat)}")
+    print(f"Jalur inti (tambah/ambil/hapus problem) memuat: {', '.join(berat) or 'tidak ada modul berat'}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(hasil, f, indent=2)
+    for pesan in regresi:
+        print(f"REGRESI: {pesan}")
+    return 1 if regresi else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+# cache_query.py
+import threading
+import time
+from collections import OrderedDict
+
+
+class QueryCache:
+    """Cache LRU + TTL untuk hasil query. Setiap entri diberi 'generasi' data saat dihitung;
+    entri dengan generasi lama dianggap basi begitu database berubah. Entri basi tetap dikembalikan
+    (status "basi") bersama info-nya (mis. seq change log), supaya pemanggil bisa mem-patch-nya."""
+
+    def __init__(self, maks_entri: int = 256, ttl_detik: float = 300):
+        self.maks_entri = max(1, int(maks_entri))
+        self.ttl_detik = ttl_detik
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._stat = {"hit": 0, "miss": 0, "eviksi": 0, "kedaluwarsa": 0, "invalidasi": 0, "patch": 0}
+
+    def ambil(self, kunci, generasi) -> tuple[str, object, object]:
+        """Return (status, nilai, info) dengan status "hit", "basi", atau "miss"."""
+        with self._lock:
+            entri = self._data.get(kunci)
+            if entri is None:
+                self._stat["miss"] += 1
+                return "miss", None, None
+            generasi_entri, waktu, nilai, info = entri
+            if self.ttl_detik and time.monotonic() - waktu > self.ttl_detik:
+                del self._data[kunci]
+                self._stat["kedaluwarsa"] += 1
+                self._stat["miss"] += 1
+                return "miss", None, None
+            if generasi_entri != generasi:
+                self._stat["invalidasi"] += 1
+                self._stat["miss"] += 1
+                return "basi", nilai, info
+            self._data.move_to_end(kunci)
+            self._stat["hit"] += 1
+            return "hit", nilai, info
+
+    def catat_patch(self):
+        with self._lock:
+            self._stat["patch"] += 1
+
+    def simpan(self, kunci, generasi, nilai, info=None):
+        with self._lock:
+            self._data[kunci] = (generasi, time.monotonic(), nilai, info)
+            self._data.move_to_end(kunci)
+            while len(self._data) > self.maks_entri:
+                self._data.popitem(last=False)
+                self._stat["eviksi"] += 1
+
+    def kosongkan(self):
+        with self._lock:
+            self._data.clear()
+
+    def statistik(self) -> dict:
+        with self._lock:
+            return {**self._stat, "entri": len(self._data), "maks_entri": self.maks_entri}
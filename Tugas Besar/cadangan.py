@@ -0,0 +1,364 @@
+# cadangan.py
+import argparse
+import datetime
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import time
+import urllib.parse
+import arsip
+import database
+import migrasi
+from konfigurasi import (CADANGAN_DIREKTORI, CADANGAN_SIMPAN, CADANGAN_HALAMAN_PER_LANGKAH, CADANGAN_JEDA_MS,
+                         CADANGAN_MAKS_ULANG, DB_POOL_TIMEOUT, DB_PRAGMA)
+
+# Satu cadangan = satu folder <nama db>_<stempel>/ berisi salinan database (journal_mode DELETE, berdiri sendiri),
+# file arsip yang terdaftar di salinan itu (<nama db>_arsip/, tata letak sama dengan aslinya sehingga salinan bisa
+# langsung dibuka aplikasi) dan manifest.json (ukuran, sha256, hasil cek integritas).
+# Folder ditulis sebagai <nama>.tmp dan baru di-rename setelah salinannya lolos cek integritas, jadi folder tanpa
+# akhiran .tmp selalu cadangan yang lengkap.
+MANIFEST = "manifest.json"
+
+
+class _TerlaluSeringUlang(Exception):
+    pass
+
+
+def direktori_cadangan(db_path: str | None = None) -> str:
+    return CADANGAN_DIREKTORI or os.path.splitext(db_path or database.DB_PATH)[0] + "_cadangan"
+
+
+def _koneksi(path: str, baca_saja: bool = False) -> sqlite3.Connection:
+    if baca_saja:
+        conn = sqlite3.connect(f"file:{urllib.parse.quote(os.path.abspath(path))}?mode=ro", uri=True,
+                               timeout=DB_POOL_TIMEOUT, isolation_level=None)
+    else:
+        conn = sqlite3.connect(path, timeout=DB_POOL_TIMEOUT, isolation_level=None)
+    conn.execute(f"PRAGMA busy_timeout = {int(DB_PRAGMA.get('busy_timeout', 10000))}")
+    return conn
+
+
+def _sha256(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def _info_progres(tahap: str, selesai: int, total: int, ukuran_halaman: int, mulai: float, ulang: int) -> dict:
+    durasi = time.perf_counter() - mulai
+    mb = selesai * ukuran_halaman / (1024 * 1024)
+    return {"tahap": tahap, "halaman": selesai, "total": total,
+            "persen": round(100 * selesai / total, 1) if total else 100.0, "mb": round(mb, 2),
+            "mb_per_detik": round(mb / durasi, 1) if durasi > 0 else None, "ulang": ulang}
+
+
+def salin_online(db_path: str, tujuan: str, halaman: int = CADANGAN_HALAMAN_PER_LANGKAH,
+                 jeda_ms: float = CADANGAN_JEDA_MS, maks_ulang: int = CADANGAN_MAKS_ULANG, laporan=None) -> dict:
+    """Salin database `db_path` ke file baru `tujuan` lewat API backup SQLite: `halaman` halaman per langkah,
+    `jeda_ms` di antara langkah. laporan(info) dipanggil tiap langkah (persen, MB, MB/s).
+
+    WAL: koneksi sumber menahan satu transaksi baca, jadi salinan adalah snapshot saat mulai dan tidak pernah
+    diulang walau ada commit (penulis tetap jalan; checkpoint tertahan di snapshot itu, WAL bisa membesar sampai
+    selesai). Mode journal lain: menahan transaksi baca akan memblokir penulis, jadi salinan diulang dari awal tiap
+    kali sumber berubah; setelah `maks_ulang` kali diulang, disalin dalam satu langkah (penulis menunggu selama itu)."""
+    sumber = _koneksi(db_path, baca_saja=True)
+    hasil = sqlite3.connect(tujuan, isolation_level=None)
+    try:
+        ukuran_halaman = sumber.execute("PRAGMA page_size").fetchone()[0]
+        wal = sumber.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        if wal:
+            sumber.execute("BEGIN")
+            sumber.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()    # transaksi baca dimulai di sini
+        mulai = time.perf_counter()
+        status = {"sisa": None, "ulang": 0}
+
+        def progres(_, sisa, total):
+            if status["sisa"] is not None and sisa > status["sisa"]:
+                status["ulang"] += 1
+                if status["ulang"] > maks_ulang: raise _TerlaluSeringUlang
+            status["sisa"] = sisa
+            if laporan: laporan(_info_progres("salin", total - sisa, total, ukuran_halaman, mulai, status["ulang"]))
+            if sisa and jeda_ms: time.sleep(jeda_ms / 1000)
+
+        mode = "snapshot WAL" if wal else "bertahap"
+        try:
+            sumber.backup(hasil, pages=halaman, progress=progres)
+        except _TerlaluSeringUlang:
+            mode = "satu langkah"
+            sumber.backup(hasil, pages=-1, progress=progres)
+        if wal: sumber.execute("COMMIT")
+        # Salinan tidak ikut mode WAL sumber: satu file tanpa -wal/-shm, aman disalin/dipindah apa adanya.
+        hasil.execute("PRAGMA journal_mode = DELETE")
+        total = hasil.execute("PRAGMA page_count").fetchone()[0]
+        info = _info_progres("salin", total, total, ukuran_halaman, mulai, status["ulang"])
+        return {"mode": mode, "halaman": total, "ukuran_halaman": ukuran_halaman, "ulang": status["ulang"],
+                "versi_skema": migrasi.versi_skema(hasil), "mb_per_detik": info["mb_per_detik"],
+                "durasi_detik": round(time.perf_counter() - mulai, 2)}
+    finally:
+        hasil.close()
+        sumber.close()
+
+
+def periksa_integritas(path: str, cepat: bool = False) -> list[str]:
+    """Cek integritas satu file database: integrity_check (atau quick_check), foreign key, dan indeks FTS5
+    terhadap tabel kontennya. Return: daftar masalah (kosong = sehat)."""
+    masalah = []
+    conn = sqlite3.connect(path, isolation_level=None)
+    try:
+        cek = "quick_check" if cepat else "integrity_check"
+        masalah += [row[0] for row in conn.execute(f"PRAGMA {cek}") if row[0] != "ok"]
+        masalah += [f"foreign key: {tuple(row)}" for row in conn.execute("PRAGMA foreign_key_check")]
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'problems_fts'").fetchone():
+            try:
+                conn.execute("INSERT INTO problems_fts (problems_fts) VALUES ('integrity-check')")
+            except sqlite3.DatabaseError as e:
+                masalah.append(f"problems_fts: {e}")
+    except sqlite3.DatabaseError as e:
+        masalah.append(str(e))
+    finally:
+        conn.close()
+    return masalah
+
+
+def daftar_cadangan(direktori: str | None = None) -> list[dict]:
+    """Manifest semua cadangan lengkap di `direktori`, terbaru dulu (key 'path' = folder cadangan)."""
+    direktori = direktori or direktori_cadangan()
+    hasil = []
+    if not os.path.isdir(direktori): return hasil
+    for nama in sorted(os.listdir(direktori), reverse=True):
+        path = os.path.join(direktori, nama, MANIFEST)
+        if nama.endswith(".tmp") or not os.path.isfile(path): continue
+        with open(path, encoding="utf-8") as f:
+            hasil.append({**json.load(f), "path": os.path.join(direktori, nama)})
+    return hasil
+
+
+def cari_cadangan(nama: str | None = None, direktori: str | None = None) -> str:
+    """Folder cadangan dari nama (di `direktori`) atau path; None = cadangan terbaru."""
+    if nama and os.path.isfile(os.path.join(nama, MANIFEST)): return nama
+    semua = daftar_cadangan(direktori)
+    for c in semua:
+        if nama is None or os.path.basename(c["path"]) == nama: return c["path"]
+    raise FileNotFoundError(f"Cadangan '{nama}' tidak ditemukan" if nama else "Belum ada cadangan")
+
+
+def _salin_arsip(sumber: str, tmp: str, relatif: str, sebelumnya: list[dict]) -> bool:
+    """Salin satu file arsip ke folder cadangan `tmp`. File arsip tidak pernah ditimpa (nama berversi), jadi jika
+    cadangan sebelumnya punya file yang sama, cukup di-hardlink. Return: True jika di-hardlink."""
+    tujuan = os.path.join(tmp, relatif)
+    ukuran = os.path.getsize(sumber)
+    for c in sebelumnya:
+        lama = c.get("berkas", {}).get(relatif)
+        if lama and lama["ukuran"] == ukuran:
+            try:
+                os.link(os.path.join(c["path"], relatif), tujuan)
+                return True
+            except OSError:
+                break
+    shutil.copyfile(sumber, tujuan)
+    return False
+
+
+def rotasi(direktori: str | None = None, simpan: int = CADANGAN_SIMPAN) -> list[str]:
+    """Hapus cadangan lengkap yang lebih lama dari `simpan` cadangan terbaru. Return: nama folder yang dihapus."""
+    dihapus = []
+    for c in daftar_cadangan(direktori)[max(int(simpan), 1):]:
+        shutil.rmtree(c["path"], ignore_errors=True)
+        dihapus.append(os.path.basename(c["path"]))
+    return dihapus
+
+
+def buat_cadangan(db_path: str | None = None, direktori: str | None = None, simpan: int | None = CADANGAN_SIMPAN,
+                  halaman: int = CADANGAN_HALAMAN_PER_LANGKAH, jeda_ms: float = CADANGAN_JEDA_MS, cepat: bool = False,
+                  label: str | None = None, lengkap: bool = True, laporan=None) -> dict:
+    """Cadangkan database (online, lihat salin_online) beserta file arsip yang terdaftar di salinannya, cek
+    integritas semua salinan, tulis manifest, lalu rotasi (simpan=None: tanpa rotasi). Gagal cek integritas atau
+    file arsip hilang -> RuntimeError dan folder sementara dihapus; lengkap=False: file arsip yang hilang dilewati
+    dan dicatat di manifest ('arsip_hilang'). Return: manifest + 'path'."""
+    db_path = os.path.abspath(db_path or database.DB_PATH)
+    direktori = direktori or direktori_cadangan(db_path)
+    nama_db = os.path.basename(db_path)
+    sekarang = datetime.datetime.now()
+    nama = f"{os.path.splitext(nama_db)[0]}_{sekarang:%Y%m%d-%H%M%S}" + (f"_{label}" if label else "")
+    tmp = os.path.join(direktori, nama + ".tmp")
+    os.makedirs(tmp)
+    try:
+        info = salin_online(db_path, os.path.join(tmp, nama_db), halaman, jeda_ms, laporan=laporan)
+        # Registry dibaca dari salinan, jadi file arsip yang ikut tepat yang dirujuk snapshot itu.
+        conn = sqlite3.connect(os.path.join(tmp, nama_db))
+        try:
+            ada_registry = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'arsip_partisi'").fetchone()
+            berkas_arsip = [row[0] for row in conn.execute("SELECT berkas FROM arsip_partisi")] if ada_registry else []
+        finally:
+            conn.close()
+        folder_arsip = os.path.basename(arsip.direktori_arsip(os.path.join(tmp, nama_db)))
+        hilang = [b for b in berkas_arsip if not os.path.isfile(os.path.join(arsip.direktori_arsip(db_path), b))]
+        if hilang and lengkap:
+            raise RuntimeError(f"File arsip hilang: {', '.join(hilang)}")
+        berkas_arsip = [b for b in berkas_arsip if b not in hilang]
+        relatif = [nama_db] + [f"{folder_arsip}/{b}" for b in berkas_arsip]
+        sebelumnya, ditautkan = daftar_cadangan(direktori), 0
+        if berkas_arsip: os.makedirs(os.path.join(tmp, folder_arsip))
+        for berkas, r in zip(berkas_arsip, relatif[1:]):
+            ditautkan += _salin_arsip(os.path.join(arsip.direktori_arsip(db_path), berkas), tmp, r, sebelumnya)
+
+        masalah = [f"{r}: {m}" for r in relatif for m in periksa_integritas(os.path.join(tmp, r), cepat)]
+        if masalah:
+            raise RuntimeError("Cek integritas cadangan gagal:\n  " + "\n  ".join(masalah[:20]))
+        manifest = {"dibuat": sekarang.isoformat(timespec="seconds"), "sumber": db_path,
+                    "database": nama_db, **info, "arsip_ditautkan": ditautkan, "arsip_hilang": hilang,
+                    "integritas": "quick_check" if cepat else "integrity_check",
+                    "berkas": {r: {"ukuran": os.path.getsize(os.path.join(tmp, r)),
+                                   "sha256": _sha256(os.path.join(tmp, r))} for r in relatif}}
+        with open(os.path.join(tmp, MANIFEST), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        path = os.path.join(direktori, nama)
+        os.rename(tmp, path)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    manifest["path"] = path
+    manifest["dirotasi"] = rotasi(direktori, simpan) if simpan else []
+    return manifest
+
+
+def periksa_cadangan(path: str, cepat: bool = False) -> list[str]:
+    """Cocokkan ukuran & sha256 tiap file dengan manifest, lalu cek integritas. Return: daftar masalah."""
+    with open(os.path.join(path, MANIFEST), encoding="utf-8") as f:
+        manifest = json.load(f)
+    masalah = []
+    for relatif, data in manifest["berkas"].items():
+        file = os.path.join(path, relatif)
+        if not os.path.isfile(file):
+            masalah.append(f"{relatif}: file hilang")
+        elif os.path.getsize(file) != data["ukuran"] or _sha256(file) != data["sha256"]:
+            masalah.append(f"{relatif}: isi berbeda dari manifest")
+        else:
+            masalah += [f"{relatif}: {m}" for m in periksa_integritas(file, cepat)]
+    return masalah
+
+
+def pulihkan(path: str, db_path: str | None = None, pengaman: bool = True, direktori: str | None = None,
+             halaman: int = CADANGAN_HALAMAN_PER_LANGKAH, laporan=None) -> dict:
+    """Pulihkan database & file arsip dari folder cadangan `path` (diperiksa dulu; gagal -> RuntimeError).
+    pengaman=True: database sekarang dicadangkan dulu ke `direktori` (label 'sebelum_pulih', tidak ikut rotasi;
+    file arsip yang hilang dilewati).
+
+    Isi ditulis lewat API backup dalam satu transaksi tulis, jadi pembaca lain melihat isi lama atau isi baru,
+    tidak pernah campuran; skema lalu dimigrasikan ke versi terbaru. Change log dikosongkan dan nomor urutnya
+    dinaikkan melewati nilai sebelum pemulihan, supaya cache & detektor proses yang masih berjalan memuat ulang
+    penuh. Tetap sebaiknya hentikan aplikasi: tulisan yang masuk selama pemulihan ikut tertimpa."""
+    masalah = periksa_cadangan(path, cepat=True)
+    if masalah:
+        raise RuntimeError("Cadangan rusak, pemulihan dibatalkan:\n  " + "\n  ".join(masalah[:20]))
+    with open(os.path.join(path, MANIFEST), encoding="utf-8") as f:
+        manifest = json.load(f)
+    db_path = os.path.abspath(db_path or database.DB_PATH)
+    pengaman = buat_cadangan(db_path, direktori, simpan=None, label="sebelum_pulih", lengkap=False)["path"] \
+        if pengaman and os.path.exists(db_path) else None
+
+    folder_arsip = arsip.direktori_arsip(db_path)
+    for relatif, data in manifest["berkas"].items():
+        if relatif == manifest["database"]: continue
+        tujuan = os.path.join(folder_arsip, os.path.basename(relatif))
+        if os.path.isfile(tujuan) and os.path.getsize(tujuan) == data["ukuran"] and _sha256(tujuan) == data["sha256"]:
+            continue
+        os.makedirs(folder_arsip, exist_ok=True)
+        shutil.copyfile(os.path.join(path, relatif), tujuan + ".tmp")
+        os.replace(tujuan + ".tmp", tujuan)
+
+    sumber = _koneksi(os.path.join(path, manifest["database"]), baca_saja=True)
+    conn = _koneksi(db_path)
+    try:
+        row = None
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_sequence'").fetchone():
+            row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'problems_changelog'").fetchone()
+        seq_lama = row[0] if row else 0
+        ukuran_halaman = sumber.execute("PRAGMA page_size").fetchone()[0]
+        mulai = time.perf_counter()
+        sumber.backup(conn, pages=halaman, progress=None if laporan is None else
+                      lambda _, sisa, total: laporan(_info_progres("pulihkan", total - sisa, total, ukuran_halaman,
+                                                                   mulai, 0)))
+        durasi = round(time.perf_counter() - mulai, 2)
+        if DB_PRAGMA.get("journal_mode"):
+            conn.execute(f"PRAGMA journal_mode = {DB_PRAGMA['journal_mode']}")
+        versi = migrasi.jalankan_migrasi(conn)
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("DELETE FROM problems_changelog")
+        if not conn.execute("UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = 'problems_changelog'",
+                            (seq_lama + 1,)).rowcount:
+            conn.execute("INSERT INTO sqlite_sequence (name, seq) VALUES ('problems_changelog', ?)", (seq_lama + 1,))
+        conn.execute("COMMIT")
+    finally:
+        conn.close()
+        sumber.close()
+    return {"cadangan": path, "dibuat": manifest["dibuat"], "pengaman": pengaman, "versi_skema": versi,
+            "durasi_detik": durasi}
+
+
+def _cetak_progres(info: dict):
+    kecepatan = f"{info['mb_per_detik']:.1f} MB/s" if info["mb_per_detik"] is not None else "-"
+    ulang = f", diulang {info['ulang']}x" if info["ulang"] else ""
+    print(f"\r  {info['tahap']}: {info['persen']:5.1f}%  {info['halaman']:,}/{info['total']:,} halaman  "
+          f"{info['mb']:.1f} MB  {kecepatan}{ulang}   ", end="" if info["halaman"] < info["total"] else "\n",
+          file=sys.stderr, flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cadangan online database diagnosis (API backup SQLite).")
+    parser.add_argument("--db", help="Path database utama (default: DB_PATH di konfigurasi.py)")
+    parser.add_argument("--direktori", help="Folder cadangan (default: '<nama db>_cadangan')")
+    sub = parser.add_subparsers(dest="perintah", required=True)
+    p_buat = sub.add_parser("buat", help="Buat cadangan baru, cek integritasnya, lalu rotasi")
+    p_buat.add_argument("--simpan", type=int, default=CADANGAN_SIMPAN, help="Jumlah cadangan terbaru yang disimpan")
+    p_buat.add_argument("--halaman", type=int, default=CADANGAN_HALAMAN_PER_LANGKAH, help="Halaman per langkah")
+    p_buat.add_argument("--jeda-ms", type=float, default=CADANGAN_JEDA_MS, help="Jeda antar langkah (ms)")
+    p_buat.add_argument("--cepat", action="store_true", help="quick_check alih-alih integrity_check")
+    sub.add_parser("daftar", help="Tampilkan cadangan yang ada")
+    p_periksa = sub.add_parser("periksa", help="Cek sha256 & integritas satu cadangan")
+    p_periksa.add_argument("cadangan", nargs="?", help="Nama folder/path cadangan (default: terbaru)")
+    p_periksa.add_argument("--cepat", action="store_true", help="quick_check alih-alih integrity_check")
+    p_pulih = sub.add_parser("pulihkan", help="Timpa database (dan file arsip) dengan isi cadangan")
+    p_pulih.add_argument("cadangan", nargs="?", help="Nama folder/path cadangan (default: terbaru)")
+    p_pulih.add_argument("--tanpa-pengaman", action="store_true", help="Jangan cadangkan database sekarang dulu")
+    args = parser.parse_args(argv)
+
+    db_path = os.path.abspath(args.db or database.DB_PATH)
+    direktori = args.direktori or direktori_cadangan(db_path)
+    try:
+        if args.perintah == "buat":
+            m = buat_cadangan(db_path, direktori, args.simpan, args.halaman, args.jeda_ms, args.cepat,
+                              laporan=_cetak_progres)
+            ukuran = sum(b["ukuran"] for b in m["berkas"].values()) / (1024 * 1024)
+            print(f"Cadangan {os.path.basename(m['path'])}: {ukuran:.1f} MB ({m['mode']}, {m['durasi_detik']} s, "
+                  f"{m['mb_per_detik']} MB/s), {len(m['berkas']) - 1} file arsip "
+                  f"({m['arsip_ditautkan']} di-hardlink), {m['integritas']} ok")
+            for nama in m["dirotasi"]: print(f"  dirotasi: {nama}")
+        elif args.perintah == "daftar":
+            for c in daftar_cadangan(direktori):
+                ukuran = sum(b["ukuran"] for b in c["berkas"].values()) / (1024 * 1024)
+                hilang = f" ({len(c['arsip_hilang'])} hilang)" if c.get("arsip_hilang") else ""
+                print(f"{os.path.basename(c['path'])}  {c['dibuat']}  skema v{c['versi_skema']}  {ukuran:8.1f} MB  "
+                      f"{len(c['berkas']) - 1} arsip{hilang}")
+        elif args.perintah == "periksa":
+            path = cari_cadangan(args.cadangan, direktori)
+            masalah = periksa_cadangan(path, args.cepat)
+            for m in masalah: print(f"  {m}")
+            print(f"{os.path.basename(path)}: {'RUSAK' if masalah else 'ok'}")
+            return 1 if masalah else 0
+        else:
+            h = pulihkan(cari_cadangan(args.cadangan, direktori), db_path, not args.tanpa_pengaman, direktori,
+                         laporan=_cetak_progres)
+            if h["pengaman"]: print(f"Database sebelumnya dicadangkan ke {os.path.basename(h['pengaman'])}")
+            print(f"Dipulihkan dari {os.path.basename(h['cadangan'])} ({h['dibuat']}), skema v{h['versi_skema']}, "
+                  f"{h['durasi_detik']} s. Muat ulang aplikasi yang sedang berjalan.")
+    except (RuntimeError, OSError, sqlite3.Error) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,163 @@
+# data_sintetis.py
+import argparse
+import datetime
+import itertools
+import random
+import sys
+from model import Problem
+from konfigurasi import KATEGORI_PROBLEM
+
+# Katalog masalah per kategori: (nama_problem, penyebab umum, solusi umum).
+# Urutan di dalam kategori = urutan popularitas (dipakai untuk distribusi Zipf).
+KATALOG_PROBLEM = {
+    "Performa (Lambat/Hang)": [
+        ("Laptop lambat saat booting", "Terlalu banyak program startup", "Nonaktifkan program startup di Task Manager"),
+        ("Aplikasi sering not responding", "RAM penuh", "Tutup aplikasi berat atau tambah RAM"),
+        ("Disk usage 100%", "Windows Search/Superfetch membebani HDD", "Ganti ke SSD atau matikan layanan indexing"),
+        ("Komputer hang saat membuka browser", "Terlalu banyak tab dan ekstensi", "Kurangi ekstensi dan tab aktif"),
+        ("Game patah-patah (FPS drop)", "Driver VGA usang", "Update driver VGA"),
+    ],
+    "Tampilan (Layar/Grafis)": [
+        ("Layar berkedip", "Kabel fleksibel LCD longgar", "Pasang ulang atau ganti kabel fleksibel"),
+        ("Layar blank tapi lampu power menyala", "RAM kotor", "Bersihkan pin RAM dengan penghapus"),
+        ("Resolusi layar tidak bisa diubah", "Driver display belum terpasang", "Instal driver VGA dari situs vendor"),
+        ("Muncul garis vertikal di layar", "Panel LCD rusak", "Ganti panel LCD"),
+        ("Warna layar pudar", "Backlight melemah", "Ganti backlight atau panel"),
+    ],
+    "Jaringan (WiFi/LAN)": [
+        ("WiFi tidak terdeteksi", "Driver WiFi hilang setelah update", "Instal ulang driver WiFi"),
+        ("Koneksi internet sering putus", "Power saving adapter aktif", "Matikan power saving di Device Manager"),
+        ("Limited connectivity", "Konflik IP address", "Jalankan ipconfig /release dan /renew"),
+        ("LAN tidak terbaca", "Kabel UTP rusak", "Ganti kabel UTP"),
+        ("Sinyal WiFi lemah", "Antena WiFi lepas", "Pasang ulang konektor antena"),
+    ],
+    "Penyimpanan (HDD/SSD)": [
+        ("Hardisk bunyi klik", "Head hardisk rusak", "Backup data dan ganti hardisk"),
+        ("SSD tidak terdeteksi di BIOS", "Mode SATA salah", "Ubah mode SATA ke AHCI"),
+        ("Bad sector terdeteksi", "Umur hardisk", "Jalankan chkdsk lalu ganti hardisk"),
+        ("Kapasitas drive C penuh", "File sementara menumpuk", "Jalankan Disk Cleanup"),
+    ],
+    "Suhu (Overheating)": [
+        ("Laptop cepat panas", "Kipas berdebu", "Bersihkan kipas dan heatsink"),
+        ("Laptop mati sendiri saat panas", "Thermal paste kering", "Ganti thermal paste"),
+        ("Kipas berisik", "Bearing kipas aus", "Ganti kipas"),
+    ],
+    "Booting (Tidak Nyala/BSOD)": [
+        ("Blue screen saat startup", "Driver bermasalah", "Masuk Safe Mode dan rollback driver"),
+        ("Laptop tidak mau menyala", "Adaptor rusak", "Ganti adaptor"),
+        ("Stuck di logo BIOS", "Baterai CMOS habis", "Ganti baterai CMOS"),
+        ("Restart terus-menerus", "File sistem korup", "Jalankan Startup Repair"),
+        ("No bootable device", "Urutan boot salah", "Atur ulang urutan boot di BIOS"),
+    ],
+    "Audio": [
+        ("Tidak ada suara", "Driver audio error", "Instal ulang driver audio"),
+        ("Suara speaker pecah", "Speaker rusak", "Ganti speaker internal"),
+        ("Mikrofon tidak berfungsi", "Izin mikrofon dinonaktifkan", "Aktifkan izin mikrofon di pengaturan privasi"),
+    ],
+    "Peripheral (USB/Keyboard/Mouse)": [
+        ("USB tidak terbaca", "Port USB longgar", "Gunakan port lain atau servis port"),
+        ("Keyboard beberapa tombol mati", "Keyboard terkena cairan", "Ganti keyboard"),
+        ("Touchpad tidak berfungsi", "Touchpad dinonaktifkan", "Aktifkan touchpad dengan tombol Fn"),
+        ("Mouse bergerak sendiri", "Sensor mouse kotor", "Bersihkan sensor mouse"),
+    ],
+    "Power (Baterai/Charger)": [
+        ("Baterai tidak mengisi", "Charger rusak", "Ganti charger"),
+        ("Baterai cepat habis", "Sel baterai drop", "Ganti baterai"),
+        ("Plugged in, not charging", "Driver ACPI bermasalah", "Uninstall driver baterai lalu restart"),
+    ],
+    "Lainnya": [
+        ("Engsel laptop patah", "Benturan", "Ganti engsel"),
+        ("Casing retak", "Jatuh", "Ganti casing"),
+        ("Webcam tidak terdeteksi", "Driver webcam hilang", "Instal ulang driver webcam"),
+    ],
+}
+
+# Bobot kategori (kira-kira proporsi tiket bengkel servis); kategori di luar tabel ini mendapat bobot 1.
+BOBOT_KATEGORI = {
+    "Performa (Lambat/Hang)": 22, "Tampilan (Layar/Grafis)": 10, "Jaringan (WiFi/LAN)": 14,
+    "Penyimpanan (HDD/SSD)": 12, "Suhu (Overheating)": 10, "Booting (Tidak Nyala/BSOD)": 12,
+    "Audio": 5, "Peripheral (USB/Keyboard/Mouse)": 7, "Power (Baterai/Charger)": 6, "Lainnya": 2,
+}
+
+_KALIMAT_DESKRIPSI = [
+    "Pelanggan melaporkan masalah muncul sejak beberapa hari terakhir.",
+    "Masalah terjadi setelah update Windows.",
+    "Perangkat sempat terjatuh minggu lalu.",
+    "Gejala hilang sementara setelah restart.",
+    "Sudah dicoba instal ulang sistem operasi tetapi masalah tetap ada.",
+    "Perangkat dipakai untuk kerja kantor sehari-hari.",
+    "Perangkat dipakai untuk gaming dan editing video.",
+    "Masalah hanya muncul saat menggunakan baterai.",
+    "Terdengar bunyi aneh dari dalam casing.",
+    "Garansi resmi sudah habis.",
+]
+
+
+def _bobot_zipf(n: int, s: float = 1.1) -> list[float]:
+    return [1.0 / (i ** s) for i in range(1, n + 1)]
+
+
+class GeneratorProblem:
+    """Generator tiket sintetis yang deterministik (seed yang sama -> data yang sama).
+
+    - kategori mengikuti BOBOT_KATEGORI, nama_problem di dalam kategori mengikuti distribusi Zipf;
+    - tanggal_masuk tersebar selama `tahun` tahun terakhir sebelum `tanggal_akhir`, dengan volume
+      yang naik dari tahun ke tahun dan lebih sedikit di akhir pekan;
+    - panjang deskripsi bervariasi (kosong s/d belasan kalimat), penyebab/solusi kadang diberi catatan."""
+
+    def __init__(self, seed: int = 42, tahun: int = 5, tanggal_akhir: datetime.date | None = None):
+        self.seed = seed
+        self.tanggal_akhir = tanggal_akhir or datetime.date(2025, 12, 31)
+        self.tanggal_awal = self.tanggal_akhir - datetime.timedelta(days=365 * tahun)
+        self._kategori = [k for k in KATEGORI_PROBLEM if KATALOG_PROBLEM.get(k)]
+        self._bobot_kategori = list(itertools.accumulate(BOBOT_KATEGORI.get(k, 1) for k in self._kategori))
+        self._bobot_nama = {k: list(itertools.accumulate(_bobot_zipf(len(KATALOG_PROBLEM[k]))))
+                            for k in self._kategori}
+        # Bobot per hari: tren naik linear + efek akhir pekan, dipakai sebagai distribusi kumulatif.
+        jumlah_hari = (self.tanggal_akhir - self.tanggal_awal).days + 1
+        self._hari = [self.tanggal_awal + datetime.timedelta(days=i) for i in range(jumlah_hari)]
+        self._bobot_hari = list(itertools.accumulate(
+            (1.0 + i / jumlah_hari) * (0.5 if h.weekday() >= 5 else 1.0) for i, h in enumerate(self._hari)))
+
+    def _deskripsi(self, rnd: random.Random) -> str:
+        jumlah_kalimat = min(15, int(rnd.expovariate(0.4)))
+        return " ".join(rnd.choice(_KALIMAT_DESKRIPSI) for _ in range(jumlah_kalimat))
+
+    def buat(self, jumlah: int, mulai: int = 0):
+        """Yield `jumlah` Problem. `mulai` menggeser urutan (untuk melanjutkan data yang sama secara bertahap)."""
+        for i in range(mulai, mulai + jumlah):
+            rnd = random.Random(self.seed * 1_000_003 + i)
+            kategori = rnd.choices(self._kategori, cum_weights=self._bobot_kategori)[0]
+            nama, penyebab, solusi = rnd.choices(KATALOG_PROBLEM[kategori], cum_weights=self._bobot_nama[kategori])[0]
+            if rnd.random() < 0.3: penyebab += f" (kasus #{rnd.randint(1, 9999)})"
+            if rnd.random() < 0.2: solusi += ". Sudah diuji ulang dan berfungsi normal."
+            yield Problem(
+                nama_problem=nama,
+                deskripsi_problem=self._deskripsi(rnd),
+                kategori_problem=kategori,
+                penyebab=penyebab,
+                solusi=solusi,
+                tanggal_masuk=rnd.choices(self._hari, cum_weights=self._bobot_hari)[0],
+            )
+
+
+def isi_database(diagnoser, jumlah: int, seed: int = 42, chunk_size: int = 20000, tahun: int = 5) -> dict:
+    """Isi database lewat HardwareDiagnoser.tambah_problem_batch dengan `jumlah` tiket sintetis."""
+    generator = GeneratorProblem(seed=seed, tahun=tahun)
+    return diagnoser.tambah_problem_batch(generator.buat(jumlah), chunk_size=chunk_size)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Isi database dengan tiket problem sintetis (deterministik).")
+    parser.add_argument("jumlah", type=int)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--tahun", type=int, default=5)
+    parser.add_argument("--db", help="Path database tujuan (default: DB_PATH di konfigurasi.py)")
+    args = parser.parse_args()
+
+    import database
+    if args.db: database.atur_db_path(args.db)
+    from manajer_diagnosis import HardwareDiagnoser
+    hasil = isi_database(HardwareDiagnoser(gunakan_cache=False), args.jumlah, seed=args.seed, tahun=args.tahun)
+    print(f"{hasil['berhasil']} tiket sintetis ditambahkan ({hasil['baris_per_detik']} baris/detik).")
+    sys.exit(0 if hasil["gagal"] == 0 else 1)
@@ -1,79 +1,504 @@
 # database.py
+from __future__ import annotations
+import atexit
+import contextlib
+import logging
+import os
+import queue
 import sqlite3
-import pandas as pd
-from konfigurasi import DB_PATH
+import threading
+import time
+import urllib.parse
+from concurrent.futures import Future
+import migrasi
+from impor_lambat import pd, adalah_dataframe
+from instrumentasi import get_logger, get_instrumentasi, perkiraan_byte_rows, perkiraan_byte_dataframe
+from penulis import PenulisTunggal
+from model import parse_tanggal
+from konfigurasi import (DB_PATH, DB_POOL_UKURAN, DB_POOL_BACA_UKURAN, DB_POOL_TIMEOUT, DB_PRAGMA, DB_PENULIS_TUNGGAL,
+                         DB_PENULIS_MAKS_BATCH, DB_PENULIS_JEDA_MS)
 
-def get_db_connection():
-    try:
-        conn = sqlite3.connect(DB_PATH, timeout=10, detect_types=sqlite3.PARSE_DECLTYPES)
+# Kolom bertipe DATE dikonversi lewat parser ber-cache: objek date yang sama dipakai ulang antar baris.
+sqlite3.register_converter("DATE", parse_tanggal)
+
+log = get_logger("database")
+_instrumentasi = get_instrumentasi()
+
+
+def _catat(jenis: str, query: str, params, mulai: float, conn=None, hasil=None, error: str | None = None):
+    """Kirim metrik satu query ke instrumentasi. Query lambat dilengkapi EXPLAIN QUERY PLAN (pakai `conn`)."""
+    if not _instrumentasi.aktif: return
+    durasi = time.perf_counter() - mulai
+    if adalah_dataframe(hasil):
+        baris, byte = len(hasil), perkiraan_byte_dataframe(hasil)
+    elif isinstance(hasil, list):
+        baris, byte = len(hasil), perkiraan_byte_rows(hasil)
+    elif isinstance(hasil, int):
+        baris, byte = max(hasil, 0), 0
+    else:
+        baris, byte = (0 if hasil is None else 1), 0
+    plan = None
+    if conn is not None and error is None and _instrumentasi.lambat(durasi, jenis, baris):
+        try:
+            plan = migrasi.explain_query_plan(conn, query, params)
+        except sqlite3.Error:
+            pass
+    _instrumentasi.catat(jenis, query, durasi, baris, byte, plan, error)
+
+
+def _level_gagal(e: Exception) -> int:
+    """Query baca yang dihentikan lewat Connection.interrupt() (task async dibatalkan) bukan error aplikasi."""
+    return logging.DEBUG if "interrupted" in str(e) else logging.ERROR
+
+
+class ConnectionPool:
+    """Pool koneksi SQLite terbatas. Koneksi dibuka sekali (mode WAL + pragma), lalu dipakai ulang.
+    hanya_baca=True: koneksi dibuka dengan URI mode=ro + PRAGMA query_only, khusus untuk query baca."""
+
+    def __init__(self, db_path: str, ukuran: int = DB_POOL_UKURAN, pragma: dict | None = None,
+                 timeout: float = DB_POOL_TIMEOUT, hanya_baca: bool = False):
+        self.db_path = db_path
+        self.ukuran = max(1, int(ukuran))
+        self.pragma = dict(DB_PRAGMA if pragma is None else pragma)
+        self.hanya_baca = hanya_baca
+        if hanya_baca:
+            # journal_mode tidak bisa diubah dari koneksi read-only (WAL sudah diatur oleh koneksi tulis).
+            self.pragma.pop("journal_mode", None)
+            self.pragma["query_only"] = "ON"
+        self.timeout = timeout
+        self._idle = queue.LifoQueue(maxsize=self.ukuran)
+        self._lock = threading.Lock()
+        self._jumlah_koneksi = 0
+        self._ditutup = False
+        self._stat = {"hit": 0, "miss": 0, "tunggu": 0, "dibuang": 0}
+
+    def _buat_koneksi(self) -> sqlite3.Connection:
+        if self.hanya_baca:
+            uri = f"file:{urllib.parse.quote(os.path.abspath(self.db_path))}?mode=ro"
+            try:
+                conn = sqlite3.connect(uri, uri=True, timeout=self.timeout, detect_types=sqlite3.PARSE_DECLTYPES,
+                                       check_same_thread=False)
+            except sqlite3.OperationalError as e:
+                # Mis. file -shm WAL belum ada dan direktori tidak bisa ditulis: cukup andalkan query_only.
+                # Tetap dibuka sebagai URI supaya ATTACH file arsip (URI mode=ro/immutable) dikenali.
+                log.warning("Koneksi mode=ro gagal (%s), memakai koneksi biasa + query_only.", e)
+                conn = sqlite3.connect(f"file:{urllib.parse.quote(os.path.abspath(self.db_path))}", uri=True,
+                                       timeout=self.timeout, detect_types=sqlite3.PARSE_DECLTYPES,
+                                       check_same_thread=False)
+        else:
+            conn = sqlite3.connect(self.db_path, timeout=self.timeout, detect_types=sqlite3.PARSE_DECLTYPES,
+                                   check_same_thread=False)
         conn.row_factory = sqlite3.Row
+        for nama, nilai in self.pragma.items():
+            conn.execute(f"PRAGMA {nama} = {nilai}")
         return conn
-    except sqlite3.Error as e:
-        print(f"ERROR [database.py] Koneksi DB gagal: {e}")
-        return None
 
-def execute_query(query: str, params: tuple | None = None) -> bool:
-    conn = get_db_connection()
-    if not conn: return False
+    def ambil(self) -> sqlite3.Connection:
+        if self._ditutup:
+            raise sqlite3.ProgrammingError("Pool koneksi sudah ditutup.")
+        try:
+            conn = self._idle.get_nowait()
+            with self._lock: self._stat["hit"] += 1
+            return conn
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            boleh_buat = self._jumlah_koneksi < self.ukuran
+            if boleh_buat:
+                self._jumlah_koneksi += 1
+                self._stat["miss"] += 1
+            else:
+                self._stat["tunggu"] += 1
+        if boleh_buat:
+            try:
+                return self._buat_koneksi()
+            except sqlite3.Error:
+                with self._lock: self._jumlah_koneksi -= 1
+                raise
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise sqlite3.OperationalError(f"Tidak ada koneksi bebas dalam {self.timeout} detik.")
+
+    def kembalikan(self, conn: sqlite3.Connection, rusak: bool = False):
+        if not rusak and not self._ditutup:
+            try:
+                if conn.in_transaction: conn.rollback()
+                self._idle.put_nowait(conn)
+                return
+            except (sqlite3.Error, queue.Full):
+                pass
+        self._buang(conn)
+
+    def _buang(self, conn: sqlite3.Connection):
+        with contextlib.suppress(sqlite3.Error):
+            conn.close()
+        with self._lock:
+            self._jumlah_koneksi -= 1
+            self._stat["dibuang"] += 1
+
+    @contextlib.contextmanager
+    def koneksi(self):
+        conn = self.ambil()
+        rusak = False
+        try:
+            yield conn
+        except (sqlite3.ProgrammingError, sqlite3.DatabaseError) as e:
+            rusak = _koneksi_rusak(conn, e)
+            raise
+        finally:
+            self.kembalikan(conn, rusak=rusak)
+
+    def cek_kesehatan(self) -> bool:
+        """Jalankan SELECT 1 pada semua koneksi idle; koneksi yang gagal dibuang."""
+        sehat = []
+        while True:
+            try: conn = self._idle.get_nowait()
+            except queue.Empty: break
+            try:
+                conn.execute("SELECT 1").fetchone()
+                sehat.append(conn)
+            except sqlite3.Error:
+                self._buang(conn)
+        for conn in sehat:
+            self.kembalikan(conn)
+        try:
+            with self.koneksi() as conn:
+                return conn.execute("SELECT 1").fetchone()[0] == 1
+        except sqlite3.Error as e:
+            log.error("Health check pool gagal: %s", e)
+            return False
+
+    def statistik(self) -> dict:
+        with self._lock:
+            return {**self._stat, "terbuka": self._jumlah_koneksi, "idle": self._idle.qsize(), "ukuran": self.ukuran}
+
+    def tutup(self):
+        self._ditutup = True
+        while True:
+            try: conn = self._idle.get_nowait()
+            except queue.Empty: break
+            self._buang(conn)
+
+
+def _koneksi_rusak(conn: sqlite3.Connection, e: Exception) -> bool:
+    if isinstance(e, sqlite3.ProgrammingError):
+        return True
     try:
-        cursor = conn.cursor()
-        cursor.execute(query, params) if params else cursor.execute(query)
-        conn.commit()
+        conn.execute("SELECT 1")
+        return False
+    except sqlite3.Error:
         return True
+
+
+_pool: ConnectionPool | None = None
+_pool_baca: ConnectionPool | None = None
+_pool_lock = threading.Lock()
+
+# Penanda perubahan data: counter tulis lokal + PRAGMA data_version dari koneksi pengamat khusus
+# (data_version berubah setiap kali koneksi LAIN -- termasuk koneksi pool & proses lain -- melakukan commit).
+_generasi_tulis = 0
+_pengamat: sqlite3.Connection | None = None
+_pengamat_lock = threading.Lock()
+_penulis: PenulisTunggal | None = None
+
+
+def get_pool() -> ConnectionPool:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(DB_PATH)
+    return _pool
+
+
+def get_pool_baca() -> ConnectionPool:
+    """Pool koneksi read-only untuk semua fetch (fetch_query/iter_query/get_dataframe/snapshot)."""
+    global _pool_baca
+    if _pool_baca is None:
+        with _pool_lock:
+            if _pool_baca is None:
+                _pool_baca = ConnectionPool(DB_PATH, ukuran=DB_POOL_BACA_UKURAN, hanya_baca=True)
+    return _pool_baca
+
+
+def get_penulis() -> PenulisTunggal:
+    """Thread penulis tunggal (dibuat saat pertama dipakai) yang memegang satu-satunya koneksi tulis."""
+    global _penulis
+    if _penulis is None:
+        with _pool_lock:
+            if _penulis is None:
+                _penulis = PenulisTunggal(DB_PATH, DB_PRAGMA, maks_batch=DB_PENULIS_MAKS_BATCH,
+                                          jeda_detik=DB_PENULIS_JEDA_MS / 1000, timeout=DB_POOL_TIMEOUT,
+                                          setelah_commit=_naikkan_generasi)
+    return _penulis
+
+
+def tutup_pool():
+    global _pool, _pool_baca, _pengamat, _penulis
+    with _pool_lock:
+        # Penulis ditutup dulu supaya semua tulisan yang masih antre sempat di-commit.
+        if _penulis is not None:
+            _penulis.tutup()
+            _penulis = None
+        if _pool is not None:
+            _pool.tutup()
+            _pool = None
+        if _pool_baca is not None:
+            _pool_baca.tutup()
+            _pool_baca = None
+    with _pengamat_lock:
+        if _pengamat is not None:
+            with contextlib.suppress(sqlite3.Error):
+                _pengamat.close()
+            _pengamat = None
+
+
+def _naikkan_generasi():
+    global _generasi_tulis
+    with _pengamat_lock:
+        _generasi_tulis += 1
+
+
+def versi_data() -> tuple[int, int]:
+    """(counter tulis proses ini, PRAGMA data_version). Berubah jika dan hanya jika ada commit baru.
+    data_version None berarti versi tidak bisa dibaca (jangan pakai cache)."""
+    global _pengamat
+    with _pengamat_lock:
+        try:
+            if _pengamat is None:
+                _pengamat = sqlite3.connect(DB_PATH, timeout=DB_POOL_TIMEOUT, check_same_thread=False)
+            return _generasi_tulis, _pengamat.execute("PRAGMA data_version").fetchone()[0]
+        except sqlite3.Error as e:
+            log.error("Gagal membaca data_version: %s", e)
+            return _generasi_tulis, None
+
+
+def atur_db_path(path: str):
+    """Ganti file database yang dipakai modul ini (mis. untuk database sementara)."""
+    global DB_PATH
+    tutup_pool()
+    DB_PATH = path
+
+
+def statistik_pool() -> dict:
+    return {**get_pool().statistik(), "baca": get_pool_baca().statistik()}
+
+
+def statistik_penulis() -> dict:
+    return _penulis.statistik() if _penulis is not None else {}
+
+
+atexit.register(tutup_pool)
+
+
+_lokal = threading.local()
+
+
+def _pasang_lampiran(conn: sqlite3.Connection, lampiran: dict[str, str]):
+    """ATTACH file lain (nama skema -> URI) yang belum terpasang di koneksi ini. Lampiran tetap terpasang untuk
+    query berikutnya; jika batas ATTACH SQLite akan terlampaui, lampiran yang tidak diminta dilepas dulu
+    (di dalam transaksi, lampiran yang sudah dibaca transaksi itu tidak bisa dilepas)."""
+    terpasang = [row[1] for row in conn.execute("PRAGMA database_list") if row[1] not in ("main", "temp")]
+    kurang = [skema for skema in lampiran if skema not in terpasang]
+    if not kurang: return
+    batas = conn.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED) if hasattr(conn, "getlimit") else 10
+    for skema in list(terpasang):
+        if len(terpasang) + len(kurang) <= batas: break
+        if skema in lampiran: continue
+        with contextlib.suppress(sqlite3.OperationalError):
+            conn.execute(f'DETACH DATABASE "{skema}"')
+            terpasang.remove(skema)
+    for skema in kurang:
+        conn.execute(f'ATTACH DATABASE ? AS "{skema}"', (lampiran[skema],))
+
+
+@contextlib.contextmanager
+def _koneksi_baca(lampiran: dict[str, str] | None = None):
+    """Koneksi untuk fetch: koneksi snapshot() milik thread ini jika ada, selain itu pinjam dari pool read-only.
+    `lampiran`: file arsip yang harus ter-ATTACH (lihat arsip.py)."""
+    conn = getattr(_lokal, "conn", None)
+    if conn is not None:
+        if lampiran: _pasang_lampiran(conn, lampiran)
+        yield conn
+        return
+    with get_pool_baca().koneksi() as conn:
+        if lampiran: _pasang_lampiran(conn, lampiran)
+        yield conn
+
+
+def dalam_snapshot() -> bool:
+    """True jika thread ini sedang berada di dalam blok snapshot()."""
+    return getattr(_lokal, "conn", None) is not None
+
+
+@contextlib.contextmanager
+def snapshot(pool: ConnectionPool | None = None):
+    """Semua fetch_query/iter_query/get_dataframe di dalam blok ini (di thread yang sama) membaca
+    snapshot database yang sama (satu transaksi baca), jadi hasil-hasilnya konsisten satu sama lain.
+    `pool`: pool asal koneksi snapshot (default: pool read-only bersama)."""
+    if getattr(_lokal, "conn", None) is not None:
+        yield _lokal.conn
+        return
+    with (pool or get_pool_baca()).koneksi() as conn:
+        conn.execute("BEGIN")
+        _lokal.conn = conn
+        try:
+            yield conn
+        finally:
+            _lokal.conn = None
+            conn.rollback()
+
+
+@contextlib.contextmanager
+def transaksi():
+    """Pinjam koneksi dari pool dalam satu transaksi eksplisit: COMMIT jika blok selesai, ROLLBACK jika error."""
+    with get_pool().koneksi() as conn:
+        conn.execute("BEGIN")
+        try:
+            yield conn
+            conn.commit()
+            _naikkan_generasi()
+        except BaseException:
+            conn.rollback()
+            raise
+
+
+def kirim_tulis(fungsi, eksklusif: bool = False) -> Future:
+    """Jalankan fungsi(conn) sebagai satu unit tulis atomik. Dengan DB_PENULIS_TUNGGAL, fungsi diantrekan ke
+    thread penulis (group commit) dan Future langsung dikembalikan; tanpa itu, fungsi dijalankan sekarang
+    dalam transaksi koneksi pool dan Future yang dikembalikan sudah selesai.
+    eksklusif=True: fungsi dipanggil tanpa transaksi aktif dan mengatur BEGIN/COMMIT sendiri."""
+    if DB_PENULIS_TUNGGAL:
+        return get_penulis().kirim(fungsi, eksklusif)
+    future = Future()
+    future.set_running_or_notify_cancel()
+    try:
+        if eksklusif:
+            with get_pool().koneksi() as conn:
+                future.set_result(fungsi(conn))
+            _naikkan_generasi()
+        else:
+            with transaksi() as conn:
+                future.set_result(fungsi(conn))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+
+def kirim_query(query: str, params: tuple | None = None) -> Future:
+    """Antrekan satu statement tulis. Hasil Future: rowcount."""
+    return kirim_tulis(lambda conn: conn.execute(query, params or ()).rowcount)
+
+
+def _tulis_many(conn: sqlite3.Connection, query: str, rows: list) -> tuple[int, list[tuple[int, str]]]:
+    """executemany dalam transaksi sendiri; jika ada baris yang ditolak, diulang per baris dengan SAVEPOINT.
+    Jalur normal sengaja tanpa SAVEPOINT: savepoint yang membungkus ribuan baris + temp_store=MEMORY
+    membuat sub-journal SQLite melambat kuadratik."""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.executemany(query, rows)
+        conn.execute("COMMIT")
+        return len(rows), []
+    except (sqlite3.IntegrityError, sqlite3.InterfaceError):
+        conn.execute("ROLLBACK")
+    except BaseException:
+        if conn.in_transaction: conn.execute("ROLLBACK")
+        raise
+
+    sukses, gagal = 0, []
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        for posisi, params in enumerate(rows):
+            conn.execute("SAVEPOINT baris")
+            try:
+                conn.execute(query, params)
+                sukses += 1
+            except (sqlite3.IntegrityError, sqlite3.InterfaceError) as e:
+                conn.execute("ROLLBACK TO baris")
+                gagal.append((posisi, str(e)))
+            conn.execute("RELEASE baris")
+        conn.execute("COMMIT")
+    except BaseException:
+        if conn.in_transaction: conn.execute("ROLLBACK")
+        raise
+    return sukses, gagal
+
+
+def execute_query(query: str, params: tuple | None = None) -> bool:
+    mulai = time.perf_counter()
+    try:
+        rowcount = kirim_query(query, params).result()
     except sqlite3.Error as e:
-        print(f"ERROR [database.py] Query gagal: {e} | Query: {query[:100]}...")
-        conn.rollback()
+        _catat("execute", query, params, mulai, error=str(e))
+        log.error("Query gagal: %s | Query: %s...", e, query[:100])
         return False
-    finally:
-        if conn: conn.close()
+    _catat("execute", query, params, mulai, hasil=rowcount)
+    return True
 
-def fetch_query(query: str, params: tuple | None = None, fetch_all: bool = True) -> list | tuple | None:
-    conn = get_db_connection()
-    if not conn: return None
+def execute_many(query: str, seq_params) -> tuple[int, list[tuple[int, str]]]:
+    """executemany dalam satu transaksi. Jika ada baris yang ditolak DB, chunk diulang per baris
+    dengan SAVEPOINT supaya baris lain tetap masuk. Return: (jumlah sukses, [(posisi, pesan error)])."""
+    rows = seq_params if isinstance(seq_params, list) else list(seq_params)
+    if not rows: return 0, []
+    mulai = time.perf_counter()
     try:
-        cursor = conn.cursor()
-        cursor.execute(query, params) if params else cursor.execute(query)
-        return cursor.fetchall() if fetch_all else cursor.fetchone()
+        sukses, gagal = kirim_tulis(lambda conn: _tulis_many(conn, query, rows), eksklusif=True).result()
+    except sqlite3.Error as e:
+        _catat("execute_many", query, rows[0], mulai, error=str(e))
+        log.error("Batch gagal: %s | Query: %s...", e, query[:100])
+        return 0, [(posisi, str(e)) for posisi in range(len(rows))]
+    _catat("execute_many", query, rows[0], mulai, hasil=sukses)
+    return sukses, gagal
+
+def fetch_query(query: str, params: tuple | None = None, fetch_all: bool = True,
+                lampiran: dict[str, str] | None = None) -> list | tuple | None:
+    mulai = time.perf_counter()
+    try:
+        with _koneksi_baca(lampiran) as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, params) if params else cursor.execute(query)
+            hasil = cursor.fetchall() if fetch_all else cursor.fetchone()
+            _catat("fetch", query, params, mulai, conn, hasil)
+            return hasil
     except sqlite3.Error as e:
-        print(f"ERROR [database.py] Fetch gagal: {e} | Query: {query[:100]}...")
+        _catat("fetch", query, params, mulai, error=str(e))
+        log.log(_level_gagal(e), "Fetch gagal: %s | Query: %s...", e, query[:100])
         return None
-    finally:
-        if conn: conn.close()
 
-def get_dataframe(query: str, params: tuple | None = None) -> pd.DataFrame:
-    conn = get_db_connection()
-    if not conn: return pd.DataFrame()
+def iter_query(query: str, params: tuple | None = None, batch_size: int = 5000,
+               lampiran: dict[str, str] | None = None):
+    """Generator baris hasil query via fetchmany; koneksi dipinjam dari pool selama iterasi berjalan."""
+    with _koneksi_baca(lampiran) as conn:
+        cursor = conn.cursor()
+        cursor.execute(query, params) if params else cursor.execute(query)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows: break
+            yield from rows
+
+def get_dataframe(query: str, params: tuple | None = None,
+                  lampiran: dict[str, str] | None = None) -> pd.DataFrame:
+    read_sql_query = pd.read_sql_query      # import pandas (pertama kali) tidak ikut terhitung sebagai waktu query
+    mulai = time.perf_counter()
     try:
-        return pd.read_sql_query(query, conn, params=params)
+        with _koneksi_baca(lampiran) as conn:
+            df = read_sql_query(query, conn, params=params)
+            _catat("dataframe", query, params, mulai, conn, df)
+            return df
     except Exception as e:
-        print(f"ERROR [database.py] Gagal baca ke DataFrame: {e} | Query: {query[:100]}...")
+        _catat("dataframe", query, params, mulai, error=str(e))
+        log.log(_level_gagal(e), "Gagal baca ke DataFrame: %s | Query: %s...", e, query[:100])
         return pd.DataFrame()
-    finally:
-        if conn: conn.close()
 
 def setup_database_initial() -> bool:
     print(f"Memeriksa/membuat tabel di database (via database.py): {DB_PATH}")
-    conn = get_db_connection()
-    if not conn: return False
     try:
-        cursor = conn.cursor()
-        sql_create_table = """
-        CREATE TABLE IF NOT EXISTS problems (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            nama_problem TEXT NOT NULL,
-            deskripsi_problem TEXT,
-            kategori_problem TEXT,
-            penyebab TEXT NOT NULL,
-            solusi TEXT NOT NULL,
-            tanggal_masuk DATE NOT NULL
-        );
-        """
-        cursor.execute(sql_create_table)
-        conn.commit()
-        print(" -> Tabel 'problems' siap (dari database.py).")
-        return True
+        with get_pool().koneksi() as conn:
+            versi = migrasi.jalankan_migrasi(conn)
+            print(f" -> Tabel 'problems' siap (dari database.py, skema versi {versi}).")
+            return True
     except sqlite3.Error as e:
         print(f"Error SQLite saat setup tabel (dari database.py): {e}")
         return False
-    finally:
-        if conn: conn.close()
\ No newline at end of file
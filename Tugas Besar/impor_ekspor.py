@@ -0,0 +1,267 @@
+# impor_ekspor.py
+import argparse
+import csv
+import datetime
+import itertools
+import json
+import os
+import sys
+import time
+import arsip
+from model import Problem, hari_ke_tanggal, tanggal_ke_hari
+from konfigurasi import KATEGORI_PROBLEM, KATEGORI_DEFAULT
+
+KOLOM_PROBLEM = ["nama_problem", "deskripsi_problem", "kategori_problem", "penyebab", "solusi", "tanggal_masuk"]
+KOLOM_EKSPOR = ["id"] + KOLOM_PROBLEM
+
+# Nama kolom alternatif yang langsung dikenali (mis. hasil ekspor tabel dari aplikasi Streamlit).
+PETA_KOLOM_DEFAULT = {
+    "masalah": "nama_problem", "nama": "nama_problem",
+    "deskripsi": "deskripsi_problem",
+    "kategori": "kategori_problem",
+    "tanggal": "tanggal_masuk",
+}
+
+csv.field_size_limit(min(sys.maxsize, 2 ** 31 - 1))
+
+
+def deteksi_format(path: str) -> str:
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".jsonl", ".ndjson", ".json"): return "jsonl"
+    if ext == ".parquet": return "parquet"
+    return "csv"
+
+
+def baca_csv(path: str):
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        yield from csv.DictReader(f)
+
+
+def baca_ndjson(baris_baris):
+    """Record dari baris-baris NDJSON (str/bytes). Baris yang rusak di-yield sebagai ValueError."""
+    for baris in baris_baris:
+        baris = baris.strip()
+        if not baris: continue
+        try:
+            record = json.loads(baris)
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            yield ValueError(f"JSON tidak valid: {e}")
+            continue
+        yield record if isinstance(record, dict) else ValueError("record bukan objek JSON")
+
+
+def baca_jsonl(path: str):
+    with open(path, encoding="utf-8-sig") as f:
+        yield from baca_ndjson(f)
+
+
+def _normalisasi_kolom(record: dict, peta_kolom: dict) -> dict:
+    hasil = {}
+    for kunci, nilai in record.items():
+        if kunci is None: continue
+        k = str(kunci).strip()
+        k = peta_kolom.get(k, PETA_KOLOM_DEFAULT.get(k.lower(), k.lower()))
+        hasil[k] = nilai
+    return hasil
+
+
+def record_ke_problem(record: dict, peta_kolom: dict | None = None, kategori_tidak_dikenal: str = "tolak") -> Problem:
+    """Ubah satu record (dict) menjadi Problem. Raise ValueError jika datanya tidak valid."""
+    if not isinstance(record, dict): raise ValueError("record bukan objek JSON")
+    data = _normalisasi_kolom(record, peta_kolom or {})
+    for kolom in ("nama_problem", "penyebab", "solusi", "tanggal_masuk"):
+        if not str(data.get(kolom) or "").strip():
+            raise ValueError(f"Kolom '{kolom}' kosong")
+
+    kategori = str(data.get("kategori_problem") or "").strip() or KATEGORI_DEFAULT
+    if kategori not in KATEGORI_PROBLEM:
+        if kategori_tidak_dikenal != "default":
+            raise ValueError(f"Kategori tidak dikenal: '{kategori}'")
+        kategori = KATEGORI_DEFAULT
+
+    try:
+        tanggal = datetime.date.fromisoformat(str(data["tanggal_masuk"]).strip()[:10])
+    except ValueError:
+        raise ValueError(f"Format tanggal salah: '{data['tanggal_masuk']}'")
+
+    return Problem(
+        nama_problem=str(data["nama_problem"]).strip(),
+        deskripsi_problem=str(data.get("deskripsi_problem") or ""),
+        kategori_problem=kategori,
+        penyebab=str(data["penyebab"]),
+        solusi=str(data["solusi"]),
+        tanggal_masuk=tanggal
+    )
+
+
+def impor_problems(diagnoser, path: str, format: str | None = None, chunk_size: int = 20000,
+                   peta_kolom: dict | None = None, kategori_tidak_dikenal: str = "tolak",
+                   maks_detail_gagal: int = 1000) -> dict:
+    """Impor file CSV/JSONL ke tabel problems secara streaming, per chunk (satu transaksi per chunk).
+    Memori hanya sebesar satu chunk. Nomor baris di 'gagal_detail' dihitung dari record pertama = 1."""
+    format = format or deteksi_format(path)
+    if format == "csv": sumber = baca_csv(path)
+    elif format == "jsonl": sumber = baca_jsonl(path)
+    else: raise ValueError(f"Format impor tidak didukung: {format}")
+    return impor_records(diagnoser, sumber, chunk_size, peta_kolom, kategori_tidak_dikenal, maks_detail_gagal)
+
+
+def impor_records(diagnoser, sumber, chunk_size: int = 20000, peta_kolom: dict | None = None,
+                  kategori_tidak_dikenal: str = "tolak", maks_detail_gagal: int = 1000) -> dict:
+    """Impor record (dict, atau Exception untuk record yang rusak) dari iterable apa pun, per chunk."""
+    hasil = {"berhasil": 0, "gagal": 0, "gagal_detail": [], "chunk": 0}
+    mulai = time.perf_counter()
+
+    def catat_gagal(nomor, pesan):
+        hasil["gagal"] += 1
+        if len(hasil["gagal_detail"]) < maks_detail_gagal:
+            hasil["gagal_detail"].append((nomor, pesan))
+
+    data = enumerate(sumber, start=1)
+    while True:
+        chunk = list(itertools.islice(data, chunk_size))
+        if not chunk: break
+        problems, nomor_baris = [], []
+        for nomor, record in chunk:
+            try:
+                if isinstance(record, Exception): raise record
+                problems.append(record_ke_problem(record, peta_kolom, kategori_tidak_dikenal))
+                nomor_baris.append(nomor)
+            except ValueError as e:
+                catat_gagal(nomor, str(e))
+
+        hasil_batch = diagnoser.tambah_problem_batch(problems, chunk_size=max(1, len(problems)))
+        hasil["berhasil"] += hasil_batch["berhasil"]
+        for indeks, pesan in hasil_batch["gagal_detail"]:
+            catat_gagal(nomor_baris[indeks], pesan)
+        hasil["chunk"] += 1
+
+    durasi = time.perf_counter() - mulai
+    hasil["durasi_detik"] = round(durasi, 4)
+    hasil["baris_per_detik"] = round(hasil["berhasil"] / durasi, 1) if durasi > 0 else 0.0
+    return hasil
+
+
+def _query_ekspor(filter_kategori=None, tanggal_mulai=None, tanggal_akhir=None) -> tuple[str, tuple]:
+    """SELECT ekspor dengan placeholder {problems} (dijalankan di database utama + arsip, lihat arsip.py)."""
+    sql = f"SELECT {', '.join(KOLOM_EKSPOR)} FROM {{problems}}"
+    conditions, params = [], []
+    if filter_kategori and filter_kategori != "Semua Kategori":
+        conditions.append("kategori_problem = ?")
+        params.append(filter_kategori)
+    if tanggal_mulai:
+        conditions.append("tanggal_masuk >= ?")
+        params.append(tanggal_ke_hari(tanggal_mulai))
+    if tanggal_akhir:
+        conditions.append("tanggal_masuk <= ?")
+        params.append(tanggal_ke_hari(tanggal_akhir))
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    return sql, tuple(params)
+
+
+def _baris_ekspor(rows):
+    """Baris DB -> nilai ekspor: tanggal_masuk (nomor hari, kolom terakhir KOLOM_EKSPOR) jadi 'YYYY-MM-DD'."""
+    for row in rows:
+        *nilai, hari = row
+        yield (*nilai, hari_ke_tanggal(hari).isoformat())
+
+
+def ekspor_problems(path: str, format: str | None = None, filter_kategori: str | None = None,
+                    tanggal_mulai: datetime.date | None = None, tanggal_akhir: datetime.date | None = None,
+                    batch_size: int = 20000) -> dict:
+    """Ekspor tabel problems ke CSV/JSONL/Parquet langsung dari cursor (fetchmany), tanpa DataFrame penuh."""
+    format = format or deteksi_format(path)
+    sql, params = _query_ekspor(filter_kategori, tanggal_mulai, tanggal_akhir)
+    rows = _baris_ekspor(arsip.iter_baca(sql, params, tanggal_mulai=tanggal_mulai, tanggal_akhir=tanggal_akhir,
+                                         urut=(("tanggal_masuk", False), ("id", False)), batch_size=batch_size))
+    mulai = time.perf_counter()
+    jumlah = 0
+
+    if format == "csv":
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(KOLOM_EKSPOR)
+            for row in rows:
+                writer.writerow(row)
+                jumlah += 1
+    elif format == "jsonl":
+        with open(path, "w", encoding="utf-8") as f:
+            for row in rows:
+                f.write(json.dumps(dict(zip(KOLOM_EKSPOR, row)), ensure_ascii=False))
+                f.write("\n")
+                jumlah += 1
+    elif format == "parquet":
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Ekspor Parquet butuh paket 'pyarrow' (pip install pyarrow).")
+        skema = pa.schema([("id", pa.int64())] + [(k, pa.string()) for k in KOLOM_PROBLEM])
+        with pq.ParquetWriter(path, skema) as writer:
+            while True:
+                chunk = list(itertools.islice(rows, batch_size))
+                if not chunk: break
+                kolom = {k: [row[i] for row in chunk] for i, k in enumerate(KOLOM_EKSPOR)}
+                writer.write_table(pa.table(kolom, schema=skema))
+                jumlah += len(chunk)
+    else:
+        raise ValueError(f"Format ekspor tidak didukung: {format}")
+
+    durasi = time.perf_counter() - mulai
+    return {"baris": jumlah, "durasi_detik": round(durasi, 4),
+            "baris_per_detik": round(jumlah / durasi, 1) if durasi > 0 else 0.0}
+
+
+def _parse_peta(daftar: list[str] | None) -> dict:
+    peta = {}
+    for item in daftar or []:
+        asal, _, tujuan = item.partition("=")
+        if not tujuan or tujuan not in KOLOM_PROBLEM:
+            raise SystemExit(f"Pemetaan kolom tidak valid: '{item}' (format: kolom_file=kolom_db)")
+        peta[asal.strip()] = tujuan
+    return peta
+
+
+def _parse_tanggal(teks: str | None):
+    return datetime.date.fromisoformat(teks) if teks else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Impor/ekspor data problems (CSV, JSONL, Parquet).")
+    sub = parser.add_subparsers(dest="perintah", required=True)
+
+    p_impor = sub.add_parser("impor", help="Impor file CSV/JSONL ke database")
+    p_impor.add_argument("file")
+    p_impor.add_argument("--format", choices=["csv", "jsonl"])
+    p_impor.add_argument("--chunk", type=int, default=20000)
+    p_impor.add_argument("--peta", action="append", metavar="KOLOM_FILE=KOLOM_DB")
+    p_impor.add_argument("--kategori-tidak-dikenal", choices=["tolak", "default"], default="tolak")
+
+    p_ekspor = sub.add_parser("ekspor", help="Ekspor tabel problems ke file")
+    p_ekspor.add_argument("file")
+    p_ekspor.add_argument("--format", choices=["csv", "jsonl", "parquet"])
+    p_ekspor.add_argument("--kategori")
+    p_ekspor.add_argument("--mulai", help="YYYY-MM-DD")
+    p_ekspor.add_argument("--akhir", help="YYYY-MM-DD")
+
+    args = parser.parse_args(argv)
+    if args.perintah == "impor":
+        from manajer_diagnosis import HardwareDiagnoser
+        hasil = impor_problems(HardwareDiagnoser(), args.file, format=args.format, chunk_size=args.chunk,
+                               peta_kolom=_parse_peta(args.peta),
+                               kategori_tidak_dikenal=args.kategori_tidak_dikenal)
+        print(f"Impor selesai: {hasil['berhasil']} berhasil, {hasil['gagal']} gagal "
+              f"({hasil['baris_per_detik']} baris/detik).")
+        for nomor, pesan in hasil["gagal_detail"][:20]:
+            print(f"  - record {nomor}: {pesan}")
+        return 0 if hasil["gagal"] == 0 else 1
+
+    hasil = ekspor_problems(args.file, format=args.format, filter_kategori=args.kategori,
+                            tanggal_mulai=_parse_tanggal(args.mulai), tanggal_akhir=_parse_tanggal(args.akhir))
+    print(f"Ekspor selesai: {hasil['baris']} baris ke '{args.file}' ({hasil['baris_per_detik']} baris/detik).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
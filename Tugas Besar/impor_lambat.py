@@ -0,0 +1,32 @@
+# impor_lambat.py
+import importlib
+import sys
+
+
+class ModulLambat:
+    """Pengganti modul yang baru benar-benar di-import saat atributnya pertama kali dipakai.
+    Jalur inti (tambah/ambil problem, CLI, worker) jadi tidak membayar ratusan ms import pandas/numpy."""
+
+    def __init__(self, nama: str):
+        self._nama = nama
+        self._modul = None
+
+    def __getattr__(self, atribut):
+        modul = self._modul
+        if modul is None:
+            modul = self._modul = importlib.import_module(self._nama)
+        return getattr(modul, atribut)
+
+    def __repr__(self) -> str:
+        return f"<ModulLambat {self._nama} ({'dimuat' if self._nama in sys.modules else 'belum dimuat'})>"
+
+
+pd = ModulLambat("pandas")
+np = ModulLambat("numpy")
+
+
+def adalah_dataframe(nilai) -> bool:
+    """isinstance(nilai, DataFrame) tanpa memicu import pandas: jika pandas belum dimuat, nilai pasti bukan DataFrame.
+    Modul bisa sudah ada di sys.modules tapi masih di-import thread lain (belum punya DataFrame)."""
+    kelas = getattr(sys.modules.get("pandas"), "DataFrame", None)
+    return kelas is not None and isinstance(nilai, kelas)
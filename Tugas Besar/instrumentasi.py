@@ -0,0 +1,161 @@
+# instrumentasi.py
+import bisect
+import logging
+import re
+import sys
+import threading
+from collections import deque
+from functools import lru_cache
+from konfigurasi import LOG_LEVEL, INSTRUMENTASI_AKTIF, AMBANG_QUERY_LAMBAT_MS
+
+# Batas atas bucket histogram latensi (ms); bucket terakhir = lebih dari batas terbesar.
+BUCKET_LATENSI_MS = (0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000, 5000)
+SIMPAN_QUERY_LAMBAT = 50
+# Tulisan bulk: ambang query lambat berlaku per baris, bukan per chunk executemany / UPDATE-DELETE massal.
+JENIS_PER_BARIS = frozenset({"execute", "execute_many"})
+_SAMPEL_BYTE = 64
+
+_log_root = logging.getLogger("diagnosis")
+if not _log_root.handlers:
+    _handler = logging.StreamHandler(sys.stdout)
+    _handler.setFormatter(logging.Formatter("%(levelname)s [%(filename)s] %(message)s"))
+    _log_root.addHandler(_handler)
+    _log_root.setLevel(LOG_LEVEL)
+    _log_root.propagate = False
+
+
+def get_logger(nama: str) -> logging.Logger:
+    """Logger bertingkat untuk modul aplikasi. Pakai argumen lazy (log.debug("... %s", x)) supaya
+    pesan yang levelnya dimatikan tidak diformat sama sekali."""
+    return _log_root.getChild(nama)
+
+
+def atur_level_log(level: str | int):
+    _log_root.setLevel(level)
+
+
+log = get_logger("instrumentasi")
+
+
+@lru_cache(maxsize=1024)
+def bentuk_query(sql: str) -> str:
+    """Normalisasi SQL jadi 'bentuk' query: literal diganti '?', daftar IN (?, ?, ...) diringkas, spasi dirapikan."""
+    bentuk = re.sub(r"'(?:[^']|'')*'", "?", sql)
+    bentuk = re.sub(r"\b\d+(?:\.\d+)?\b", "?", bentuk)
+    bentuk = re.sub(r"\(\s*\?(?:\s*,\s*\?)+\s*\)", "(?, ...)", bentuk)
+    return " ".join(bentuk.split())
+
+
+def perkiraan_byte_rows(rows) -> int:
+    """Perkiraan byte data yang dimaterialisasi dari list baris (disampel, bukan dihitung penuh)."""
+    if not rows: return 0
+    sampel = rows[:_SAMPEL_BYTE]
+    total = 0
+    for row in sampel:
+        for nilai in row:
+            total += len(nilai) if isinstance(nilai, (str, bytes)) else 8
+    return total * len(rows) // len(sampel)
+
+
+def perkiraan_byte_dataframe(df) -> int:
+    if df is None or df.empty: return 0
+    sampel = df.head(_SAMPEL_BYTE)
+    return int(sampel.memory_usage(index=False, deep=True).sum() * len(df) // len(sampel))
+
+
+class StatistikQuery:
+    __slots__ = ("bentuk", "jenis", "jumlah", "error", "total_detik", "maks_detik", "baris", "byte", "histogram")
+
+    def __init__(self, bentuk: str, jenis: str):
+        self.bentuk = bentuk
+        self.jenis = jenis
+        self.jumlah = self.error = self.baris = self.byte = 0
+        self.total_detik = self.maks_detik = 0.0
+        self.histogram = [0] * (len(BUCKET_LATENSI_MS) + 1)
+
+    def to_dict(self) -> dict:
+        return {
+            "bentuk": self.bentuk, "jenis": self.jenis, "jumlah": self.jumlah, "error": self.error,
+            "total_ms": round(self.total_detik * 1000, 3),
+            "rata_ms": round(self.total_detik * 1000 / self.jumlah, 3) if self.jumlah else 0.0,
+            "maks_ms": round(self.maks_detik * 1000, 3),
+            "baris": self.baris, "byte": self.byte,
+            "histogram": dict(zip([f"<={b}ms" for b in BUCKET_LATENSI_MS] + [f">{BUCKET_LATENSI_MS[-1]}ms"],
+                                  self.histogram)),
+        }
+
+
+class Instrumentasi:
+    """Kumpulan metrik per bentuk query + log query lambat + hook yang bisa dipasang.
+
+    Hook dipanggil untuk setiap query dengan satu dict: jenis, bentuk, sql, durasi_ms, baris, byte,
+    lambat, plan (EXPLAIN QUERY PLAN, hanya untuk query lambat) dan error."""
+
+    def __init__(self, aktif: bool = INSTRUMENTASI_AKTIF, ambang_lambat_ms: float = AMBANG_QUERY_LAMBAT_MS):
+        self.aktif = aktif
+        self.ambang_lambat_ms = ambang_lambat_ms
+        self._lock = threading.Lock()
+        self._stat: dict[tuple[str, str], StatistikQuery] = {}
+        self._lambat = deque(maxlen=SIMPAN_QUERY_LAMBAT)
+        self._hooks = []
+
+    def tambah_hook(self, hook):
+        with self._lock:
+            if hook not in self._hooks: self._hooks = self._hooks + [hook]
+
+    def hapus_hook(self, hook):
+        with self._lock:
+            self._hooks = [h for h in self._hooks if h is not hook]
+
+    def lambat(self, durasi_detik: float, jenis: str | None = None, baris: int = 0) -> bool:
+        if jenis in JENIS_PER_BARIS: durasi_detik /= max(baris, 1)
+        return self.ambang_lambat_ms is not None and durasi_detik * 1000 >= self.ambang_lambat_ms
+
+    def catat(self, jenis: str, sql: str, durasi_detik: float, baris: int = 0, byte: int = 0,
+              plan: list[str] | None = None, error: str | None = None):
+        bentuk = bentuk_query(sql)
+        lambat = self.lambat(durasi_detik, jenis, baris)
+        with self._lock:
+            stat = self._stat.get((jenis, bentuk))
+            if stat is None:
+                stat = self._stat[(jenis, bentuk)] = StatistikQuery(bentuk, jenis)
+            stat.jumlah += 1
+            stat.total_detik += durasi_detik
+            stat.maks_detik = max(stat.maks_detik, durasi_detik)
+            stat.baris += baris
+            stat.byte += byte
+            stat.histogram[bisect.bisect_left(BUCKET_LATENSI_MS, durasi_detik * 1000)] += 1
+            if error: stat.error += 1
+            hooks = self._hooks
+
+        catatan = {"jenis": jenis, "bentuk": bentuk, "sql": sql, "durasi_ms": round(durasi_detik * 1000, 3),
+                   "baris": baris, "byte": byte, "lambat": lambat, "plan": plan, "error": error}
+        if lambat:
+            self._lambat.append(catatan)
+            log.warning("Query lambat (%.1f ms, %s, %d baris): %s | plan: %s", durasi_detik * 1000, jenis, baris,
+                        bentuk[:200], " / ".join(plan) if plan else "-")
+        for hook in hooks:
+            try:
+                hook(catatan)
+            except Exception as e:
+                log.error("Hook instrumentasi %r gagal: %s", hook, e)
+
+    def top_query(self, n: int = 10, urut: str = "total_ms") -> list[dict]:
+        with self._lock:
+            data = [s.to_dict() for s in self._stat.values()]
+        return sorted(data, key=lambda d: d[urut], reverse=True)[:n]
+
+    def query_lambat(self) -> list[dict]:
+        return list(reversed(self._lambat))
+
+    def reset(self):
+        with self._lock:
+            self._stat.clear()
+            self._lambat.clear()
+
+
+_instrumentasi = Instrumentasi()
+
+
+def get_instrumentasi() -> Instrumentasi:
+    return _instrumentasi
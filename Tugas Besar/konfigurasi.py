@@ -11,4 +11,73 @@ KATEGORI_PROBLEM = [
     "Audio", "Peripheral (USB/Keyboard/Mouse)", "Power (Baterai/Charger)",
     "Lainnya"
 ]
-KATEGORI_DEFAULT = "Lainnya"
\ No newline at end of file
+KATEGORI_DEFAULT = "Lainnya"
+
+# Pengaturan pool koneksi SQLite (dipakai database.py)
+DB_POOL_UKURAN = 8
+DB_POOL_BACA_UKURAN = 8         # pool terpisah berisi koneksi read-only (mode=ro, query_only) untuk query baca
+DB_POOL_TIMEOUT = 10
+DB_PRAGMA = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -20000,       # negatif = KiB, jadi ~20 MB per koneksi
+    "mmap_size": 268435456,     # 256 MB
+    "temp_store": "MEMORY",
+    "busy_timeout": 10000,
+}
+# Semua tulisan lewat satu thread penulis (group commit) alih-alih tiap sesi mengunci database sendiri
+DB_PENULIS_TUNGGAL = True
+DB_PENULIS_MAKS_BATCH = 256     # maks. permintaan tulis per commit
+DB_PENULIS_JEDA_MS = 2          # lama menunggu permintaan lain sebelum commit
+
+# Cache hasil query di HardwareDiagnoser (LRU + TTL, invalidasi otomatis saat data berubah)
+CACHE_MAKS_ENTRI = 256
+CACHE_TTL_DETIK = 300
+CACHE_BATAS_PATCH = 5000        # maks. jumlah perubahan yang di-patch ke hasil cache; lebih dari itu dihitung ulang
+CHANGELOG_SIMPAN = 100000       # jumlah entri change log terakhir yang disimpan (dipangkas saat manajer dibuat)
+
+# Logging & instrumentasi query (lihat instrumentasi.py)
+LOG_LEVEL = "WARNING"           # DEBUG untuk melihat log debug aplikasi; WARNING mematikan log debug/info
+INSTRUMENTASI_AKTIF = True      # catat latensi/baris/byte per bentuk query
+AMBANG_QUERY_LAMBAT_MS = 250    # query di atas ambang ini dicatat sebagai lambat beserta EXPLAIN QUERY PLAN
+PANEL_PERFORMA = False          # tampilkan panel performa query (admin) di sidebar Streamlit
+
+# Query analisis yang saling independen dijalankan paralel (HardwareDiagnoser.analisis_paralel)
+ANALISIS_MAKS_THREAD = 4
+
+# Rekomendasi kasus serupa (rekomendasi.py): jumlah bucket hashing n-gram (vektor jarang, jadi dimensi besar
+# tidak menambah ukuran indeks) dan skor kemiripan minimum agar teks yang tidak mirip apa pun tidak dapat hasil
+REKOMENDASI_DIMENSI = 1 << 18
+REKOMENDASI_MIN_SKOR = 0.25   # kosinus: teks acak/tak terkait < 0.17, kemiripan parsial yang relevan mulai ~0.30
+
+# AsyncHardwareDiagnoser (manajer_async.py): thread + koneksi read-only sendiri, batas permintaan yang berjalan
+ASYNC_MAKS_THREAD = 4
+ASYNC_MAKS_ANTREAN = 64         # permintaan di atas batas ini menunggu slot (atau ditolak jika tolak_saat_penuh)
+
+# Layanan HTTP lokal (layanan_http.py)
+HTTP_HOST = "127.0.0.1"
+HTTP_PORT = 8765
+HTTP_CHUNK_INGEST = 5000        # record NDJSON per transaksi saat ingest
+HTTP_MAKS_HALAMAN = 1000        # maks. baris per halaman GET /problems
+
+# Deteksi anomali tren harian per kategori (anomali.py)
+ANOMALI_JENDELA_HARI = 28       # jendela rata-rata/simpangan bergulir
+ANOMALI_ALPHA_EWMA = 0.1
+ANOMALI_ALPHA_MUSIMAN = 0.2     # EWMA per hari dalam minggu (baseline musiman)
+ANOMALI_AMBANG_Z = 3.0
+ANOMALI_MIN_JUMLAH = 5          # hari dengan tiket lebih sedikit dari ini tidak pernah ditandai
+ANOMALI_HARI_PEMANASAN = 120    # riwayat yang dibaca saat detektor dibuat; selanjutnya incremental dari change log
+ANOMALI_RIWAYAT = 50            # maks. hari anomali yang disimpan per kategori
+
+# Arsip per tahun (arsip.py): tiket periode tertutup dipindah ke file SQLite terpisah yang di-ATTACH saat dibaca
+ARSIP_DIREKTORI = None          # None = folder '<nama db>_arsip' di sebelah file database
+ARSIP_TAHUN_AKTIF = 2           # tahun berjalan + tahun lalu tetap di database utama
+ARSIP_MODE = "ro"               # "ro" (mode=ro) atau "immutable" (tanpa lock/cek perubahan; file arsip tidak pernah ditimpa)
+ARSIP_MAKS_LAMPIRAN = 8         # maks. file arsip yang di-ATTACH dalam satu query (batas SQLite default: 10)
+
+# Cadangan online (cadangan.py): API backup SQLite per langkah kecil dengan jeda, lalu cek integritas salinan
+CADANGAN_DIREKTORI = None       # None = folder '<nama db>_cadangan' di sebelah file database
+CADANGAN_SIMPAN = 7             # jumlah cadangan terbaru yang disimpan; yang lebih lama dihapus setelah cadangan baru
+CADANGAN_HALAMAN_PER_LANGKAH = 256  # halaman per langkah backup (256 x 4 KiB = 1 MiB)
+CADANGAN_JEDA_MS = 10           # jeda antar langkah; selama jeda tidak ada lock yang ditahan di database sumber
+CADANGAN_MAKS_ULANG = 3         # non-WAL: salinan diulang tiap kali sumber berubah; lewat batas ini disalin sekaligus
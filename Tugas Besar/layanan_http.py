@@ -0,0 +1,296 @@
+# layanan_http.py
+import argparse
+import datetime
+import json
+import re
+import sys
+import uuid
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+import database
+import impor_ekspor
+from instrumentasi import get_logger
+from konfigurasi import HTTP_HOST, HTTP_PORT, HTTP_CHUNK_INGEST, HTTP_MAKS_HALAMAN
+
+log = get_logger("http")
+
+# Bagian ETag yang berbeda di setiap proses: counter versi_data() mulai dari 0 lagi setelah restart.
+_ID_PROSES = uuid.uuid4().hex[:8]
+_UKURAN_BACA = 64 * 1024
+
+
+class PermintaanSalah(ValueError):
+    """Parameter/isi permintaan tidak valid (HTTP 400)."""
+
+
+def _json_default(nilai):
+    if isinstance(nilai, (datetime.date, datetime.datetime)): return nilai.isoformat()[:10]
+    if hasattr(nilai, "isoformat"): return nilai.isoformat()[:10]     # pandas.Timestamp
+    if hasattr(nilai, "item"): return nilai.item()                      # skalar numpy
+    raise TypeError(f"Tidak bisa diubah ke JSON: {type(nilai).__name__}")
+
+
+def _records(df) -> list[dict]:
+    """DataFrame hasil HardwareDiagnoser -> list dict; index bernama (tanggal/bulan) ikut jadi kolom."""
+    if df.index.name: df = df.reset_index()
+    return df.astype(object).where(df.notna(), None).to_dict(orient="records")
+
+
+def _tanggal(nilai: str | None) -> datetime.date | None:
+    if not nilai: return None
+    try:
+        return datetime.date.fromisoformat(nilai)
+    except ValueError:
+        raise PermintaanSalah(f"Format tanggal salah (YYYY-MM-DD): '{nilai}'")
+
+
+def _angka(nilai: str | None, default: int, minimum: int = 0, maksimum: int | None = None) -> int:
+    if nilai in (None, ""): return default
+    try:
+        angka = int(nilai)
+    except ValueError:
+        raise PermintaanSalah(f"Bukan angka: '{nilai}'")
+    if angka < minimum: raise PermintaanSalah(f"Nilai minimal {minimum}: {angka}")
+    return min(angka, maksimum) if maksimum else angka
+
+
+def etag_sekarang() -> str | None:
+    """ETag berbasis versi perubahan database: sama selama tidak ada commit baru (dari proses mana pun)."""
+    lokal, data_version = database.versi_data()
+    return None if data_version is None else f'"{_ID_PROSES}-{lokal}-{data_version}"'
+
+
+class PenanganHTTP(BaseHTTPRequestHandler):
+    """Endpoint JSON di atas HardwareDiagnoser (`self.server.diagnoser`):
+
+    POST   /problems                 ingest NDJSON (satu tiket per baris), dibatch per HTTP_CHUNK_INGEST
+    GET    /problems                 daftar berhalaman: batas, setelah=YYYY-MM-DD,ID, kategori, mulai, akhir
+    GET    /problems/<id>            satu tiket
+    DELETE /problems/<id>
+    GET    /cari                     q, kategori, batas, offset
+    GET    /statistik/frekuensi      mulai, akhir
+    GET    /statistik/kategori       mulai, akhir
+    GET    /statistik/tren           periode=harian|bulanan, kategori
+    GET    /statistik/anomali        kategori; lonjakan tiket harian + status hari berjalan per kategori
+    GET    /versi                    ETag data saat ini
+
+    Semua GET memakai ETag dari versi data; If-None-Match yang cocok dijawab 304 tanpa menjalankan query."""
+
+    protocol_version = "HTTP/1.1"
+    # Header dan body ditulis terpisah: tanpa TCP_NODELAY, Nagle + delayed ACK menahan tiap respons ~40 ms.
+    disable_nagle_algorithm = True
+    server_version = "DiagnosisHardware/1.0"
+
+    # --- Routing ---
+
+    def do_GET(self):
+        self._tangani("GET")
+
+    def do_POST(self):
+        self._tangani("POST")
+
+    def do_DELETE(self):
+        self._tangani("DELETE")
+
+    _RUTE = [
+        ("GET", re.compile(r"/problems"), "_daftar_problems"),
+        ("POST", re.compile(r"/problems"), "_ingest_problems"),
+        ("GET", re.compile(r"/problems/(\d+)"), "_ambil_problem"),
+        ("DELETE", re.compile(r"/problems/(\d+)"), "_hapus_problem"),
+        ("GET", re.compile(r"/cari"), "_cari"),
+        ("GET", re.compile(r"/statistik/frekuensi"), "_frekuensi"),
+        ("GET", re.compile(r"/statistik/kategori"), "_per_kategori"),
+        ("GET", re.compile(r"/statistik/tren"), "_tren"),
+        ("GET", re.compile(r"/statistik/anomali"), "_anomali"),
+        ("GET", re.compile(r"/versi"), "_versi"),
+    ]
+
+    def _tangani(self, metode: str):
+        self._body_dibaca = False
+        url = urlsplit(self.path)
+        path = url.path.rstrip("/") or "/"
+        rute = [(m, cocok, nama) for m, pola, nama in self._RUTE if (cocok := pola.fullmatch(path))]
+        if not rute:
+            return self._kirim_error(HTTPStatus.NOT_FOUND, f"Tidak ada endpoint {path}")
+        cocok = next(((m, c, nama) for m, c, nama in rute if m == metode), None)
+        if cocok is None:
+            return self._kirim_error(HTTPStatus.METHOD_NOT_ALLOWED, f"{metode} tidak didukung untuk {path}")
+        _, hasil_cocok, nama = cocok
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+
+        etag = etag_sekarang() if metode == "GET" else None
+        # ETag dihitung SEBELUM query: jika data berubah selama query, respons membawa ETag lama dan
+        # poll berikutnya mengambil ulang (paling buruk satu fetch ekstra, tidak pernah data basi).
+        if etag and etag in {t.strip() for t in self.headers.get("If-None-Match", "").split(",")}:
+            return self._kirim(HTTPStatus.NOT_MODIFIED, None, etag)
+        try:
+            status, isi = getattr(self, nama)(query, *hasil_cocok.groups())
+        except PermintaanSalah as e:
+            return self._kirim_error(HTTPStatus.BAD_REQUEST, str(e))
+        except Exception as e:
+            log.error("Error %s %s: %s", metode, self.path, e, exc_info=True)
+            # Body mungkin baru terbaca sebagian: koneksi tidak bisa dipakai ulang.
+            self.close_connection = True
+            return self._kirim_error(HTTPStatus.INTERNAL_SERVER_ERROR, "Error internal server")
+        self._kirim(status, isi, etag if status == HTTPStatus.OK else None)
+
+    def _kirim(self, status: HTTPStatus, isi, etag: str | None = None):
+        body = b"" if isi is None else json.dumps(isi, default=_json_default, ensure_ascii=False,
+                                                  separators=(",", ":")).encode()
+        self.send_response(status)
+        if etag:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+        if status != HTTPStatus.NOT_MODIFIED:
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body and self.command != "HEAD": self.wfile.write(body)
+
+    def _kirim_error(self, status: HTTPStatus, pesan: str):
+        self._buang_body()
+        self._kirim(status, {"error": pesan})
+
+    def log_message(self, format, *args):
+        log.debug("%s - %s", self.address_string(), format % args)
+
+    # --- Body permintaan ---
+
+    def _potongan_body(self):
+        """Body permintaan per potongan bytes (Content-Length atau Transfer-Encoding: chunked)."""
+        if "chunked" in self.headers.get("Transfer-Encoding", "").lower():
+            while True:
+                ukuran = int(self.rfile.readline().split(b";")[0].strip() or b"0", 16)
+                if ukuran == 0:
+                    while self.rfile.readline().strip(): pass      # trailer
+                    return
+                yield self.rfile.read(ukuran)
+                self.rfile.readline()
+        else:
+            sisa = int(self.headers.get("Content-Length") or 0)
+            while sisa > 0:
+                potongan = self.rfile.read(min(sisa, _UKURAN_BACA))
+                if not potongan: return
+                sisa -= len(potongan)
+                yield potongan
+
+    def _baris_body(self):
+        sisa = b""
+        for potongan in self._potongan_body():
+            *lengkap, sisa = (sisa + potongan).split(b"\n")
+            yield from lengkap
+        if sisa: yield sisa
+
+    def _buang_body(self):
+        if self.command in ("POST", "PUT") and not self._body_dibaca:
+            self._body_dibaca = True
+            for _ in self._potongan_body(): pass
+
+    # --- Endpoint ---
+
+    def _ingest_problems(self, query):
+        kategori_tidak_dikenal = query.get("kategori_tidak_dikenal", "tolak")
+        if kategori_tidak_dikenal not in ("tolak", "default"):
+            raise PermintaanSalah("kategori_tidak_dikenal harus 'tolak' atau 'default'")
+        self._body_dibaca = True
+        hasil = impor_ekspor.impor_records(self.server.diagnoser, impor_ekspor.baca_ndjson(self._baris_body()),
+                                           chunk_size=HTTP_CHUNK_INGEST,
+                                           kategori_tidak_dikenal=kategori_tidak_dikenal)
+        return HTTPStatus.OK, hasil
+
+    def _daftar_problems(self, query):
+        batas = _angka(query.get("batas"), 50, minimum=1, maksimum=HTTP_MAKS_HALAMAN)
+        setelah = None
+        if query.get("setelah"):
+            tanggal, _, id_problem = query["setelah"].partition(",")
+            setelah = (_tanggal(tanggal), _angka(id_problem, 0, minimum=1))
+        df = self.server.diagnoser.get_halaman_problems(
+            batas=batas, setelah=setelah, filter_kategori=query.get("kategori"),
+            tanggal_mulai=_tanggal(query.get("mulai")), tanggal_akhir=_tanggal(query.get("akhir")))
+        data = _records(df)
+        berikutnya = None
+        if len(data) == batas:
+            tanggal = data[-1]['Tanggal']
+            berikutnya = f"{tanggal if isinstance(tanggal, str) else _json_default(tanggal)},{data[-1]['ID']}"
+        return HTTPStatus.OK, {"data": data, "berikutnya": berikutnya}
+
+    def _ambil_problem(self, query, id_problem):
+        problem = self.server.diagnoser.get_problem_by_id(int(id_problem))
+        if problem is None:
+            return HTTPStatus.NOT_FOUND, {"error": f"Problem {id_problem} tidak ditemukan"}
+        return HTTPStatus.OK, problem.to_dict()
+
+    def _hapus_problem(self, query, id_problem):
+        terhapus = self.server.diagnoser.hapus_problem_batch([int(id_problem)])
+        if terhapus is None:
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "Hapus gagal"}
+        if not terhapus:
+            return HTTPStatus.NOT_FOUND, {"error": f"Problem {id_problem} tidak ditemukan"}
+        return HTTPStatus.OK, {"terhapus": terhapus}
+
+    def _cari(self, query):
+        df = self.server.diagnoser.cari_problem(query.get("q", ""), kategori=query.get("kategori"),
+                                                limit=_angka(query.get("batas"), 20, 1, HTTP_MAKS_HALAMAN),
+                                                offset=_angka(query.get("offset"), 0))
+        return HTTPStatus.OK, {"data": _records(df)}
+
+    def _frekuensi(self, query):
+        df = self.server.diagnoser.get_frekuensi_problem(_tanggal(query.get("mulai")), _tanggal(query.get("akhir")))
+        return HTTPStatus.OK, {"data": _records(df)}
+
+    def _per_kategori(self, query):
+        df = self.server.diagnoser.get_jumlah_per_kategori(_tanggal(query.get("mulai")),
+                                                           _tanggal(query.get("akhir")))
+        return HTTPStatus.OK, {"data": _records(df)}
+
+    def _tren(self, query):
+        periode = query.get("periode", "harian")
+        if periode not in ("harian", "bulanan"):
+            raise PermintaanSalah("periode harus 'harian' atau 'bulanan'")
+        metode = (self.server.diagnoser.get_tren_problem_harian if periode == "harian"
+                  else self.server.diagnoser.get_tren_problem_bulanan)
+        return HTTPStatus.OK, {"periode": periode, "data": _records(metode(kategori_problem=query.get("kategori")))}
+
+    def _anomali(self, query):
+        diagnoser = self.server.diagnoser
+        return HTTPStatus.OK, {"data": _records(diagnoser.get_anomali(query.get("kategori"))),
+                               "status": _records(diagnoser.get_status_anomali())}
+
+    def _versi(self, query):
+        return HTTPStatus.OK, {"etag": etag_sekarang()}
+
+
+class ServerDiagnosis(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, alamat: tuple[str, int], diagnoser=None):
+        if diagnoser is None:
+            from manajer_diagnosis import HardwareDiagnoser
+            diagnoser = HardwareDiagnoser()
+        self.diagnoser = diagnoser
+        super().__init__(alamat, PenanganHTTP)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Layanan HTTP JSON lokal untuk data diagnosis hardware.")
+    parser.add_argument("--host", default=HTTP_HOST)
+    parser.add_argument("--port", type=int, default=HTTP_PORT)
+    parser.add_argument("--db", help="Path database (default: DB_PATH di konfigurasi.py)")
+    args = parser.parse_args(argv)
+
+    if args.db: database.atur_db_path(args.db)
+    server = ServerDiagnosis((args.host, args.port))
+    print(f"[layanan_http] Mendengarkan di http://{args.host}:{server.server_address[1]}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        database.tutup_pool()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,275 @@
+# manajer_async.py
+import asyncio
+import contextlib
+import functools
+import itertools
+import sqlite3
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+import database
+from manajer_diagnosis import HardwareDiagnoser
+from instrumentasi import get_logger
+from konfigurasi import ASYNC_MAKS_THREAD, ASYNC_MAKS_ANTREAN
+
+log = get_logger("async")
+
+
+class AntreanPenuh(RuntimeError):
+    """Semua slot permintaan sedang terpakai dan AsyncHardwareDiagnoser dibuat dengan tolak_saat_penuh=True."""
+
+
+class _Tugas:
+    """Koneksi yang sedang dipakai satu permintaan baca, supaya query-nya bisa dihentikan saat dibatalkan."""
+    __slots__ = ("conn", "dibatalkan", "lock")
+
+    def __init__(self):
+        self.conn = None
+        self.dibatalkan = False
+        self.lock = threading.Lock()
+
+    def batalkan(self):
+        with self.lock:
+            self.dibatalkan = True
+            if self.conn is not None: self.conn.interrupt()
+
+
+def _baca_async(nama: str):
+    """Buat versi async dari method baca HardwareDiagnoser `nama` (argumen dan docstring sama)."""
+    @functools.wraps(getattr(HardwareDiagnoser, nama))
+    async def metode(self, *args, **kwargs):
+        return await self._baca(getattr(self.sync, nama), *args, **kwargs)
+    return metode
+
+
+class AsyncHardwareDiagnoser:
+    """Antarmuka asyncio untuk HardwareDiagnoser; event loop tidak pernah menunggu sqlite3.
+
+    - Query baca dijalankan di ThreadPoolExecutor sendiri (`maks_thread`) dengan pool koneksi read-only
+      sendiri, jadi beban async tidak merebut koneksi milik halaman Streamlit.
+    - Tulisan diantrekan ke thread penulis tunggal dan Future-nya di-await langsung tanpa memakai thread.
+    - Backpressure: maks. `maks_antrean` permintaan berjalan bersamaan; sisanya menunggu slot, atau langsung
+      AntreanPenuh jika tolak_saat_penuh=True.
+    - Pembatalan: task yang di-cancel membatalkan permintaan yang belum mulai; query baca yang sedang berjalan
+      dihentikan dengan Connection.interrupt(). Tulisan yang sudah dieksekusi penulis tetap di-commit.
+    Satu objek dipakai dari satu event loop."""
+
+    def __init__(self, diagnoser: HardwareDiagnoser | None = None, maks_thread: int = ASYNC_MAKS_THREAD,
+                 maks_antrean: int = ASYNC_MAKS_ANTREAN, tolak_saat_penuh: bool = False):
+        self.sync = diagnoser or HardwareDiagnoser()
+        self.maks_antrean = max(1, int(maks_antrean))
+        self.tolak_saat_penuh = tolak_saat_penuh
+        maks_thread = max(1, int(maks_thread))
+        self._executor = ThreadPoolExecutor(max_workers=maks_thread, thread_name_prefix="async-diagnosis")
+        self._pool = database.ConnectionPool(database.DB_PATH, ukuran=maks_thread, hanya_baca=True)
+        self._slot = asyncio.Semaphore(self.maks_antrean)
+        self._stat = {"selesai": 0, "dibatalkan": 0, "ditolak": 0, "berjalan": 0}
+
+    @contextlib.asynccontextmanager
+    async def _ambil_slot(self):
+        if self.tolak_saat_penuh and self._slot.locked():
+            self._stat["ditolak"] += 1
+            raise AntreanPenuh(f"Sudah ada {self.maks_antrean} permintaan yang berjalan.")
+        async with self._slot:
+            self._stat["berjalan"] += 1
+            try:
+                yield
+                self._stat["selesai"] += 1
+            except asyncio.CancelledError:
+                self._stat["dibatalkan"] += 1
+                raise
+            finally:
+                self._stat["berjalan"] -= 1
+
+    def _di_thread(self, tugas: _Tugas, fungsi, args, kwargs):
+        # Satu snapshot per permintaan: semua query-nya memakai satu koneksi yang bisa di-interrupt.
+        with database.snapshot(self._pool) as conn:
+            with tugas.lock:
+                if tugas.dibatalkan: return None
+                tugas.conn = conn
+            try:
+                return fungsi(*args, **kwargs)
+            finally:
+                with tugas.lock: tugas.conn = None
+
+    async def _baca(self, fungsi, *args, **kwargs):
+        async with self._ambil_slot():
+            tugas = _Tugas()
+            future = self._executor.submit(self._di_thread, tugas, fungsi, args, kwargs)
+            try:
+                return await asyncio.wrap_future(future)
+            except asyncio.CancelledError:
+                if not future.cancel():
+                    tugas.batalkan()
+                    # Query yang di-interrupt mengembalikan hasil kosong yang mungkin sempat masuk cache.
+                    future.add_done_callback(lambda _: self.sync.kosongkan_cache())
+                raise
+
+    async def _jalankan(self, fungsi, *args, **kwargs):
+        """Jalankan fungsi blocking (mis. impor batch) di executor; pembatalan hanya berlaku sebelum mulai."""
+        async with self._ambil_slot():
+            return await asyncio.wrap_future(self._executor.submit(fungsi, *args, **kwargs))
+
+    async def _tulis(self, metode, *args, **kwargs) -> tuple[bool, object]:
+        """Panggil method tulis sinkron dengan tunggu=False lalu await Future-nya.
+        Return: (True, hasil Future) jika di-commit; (False, nilai return method) jika ditolak sebelum
+        diantrekan; (False, None) jika tulisan gagal."""
+        async with self._ambil_slot():
+            if database.DB_PENULIS_TUNGGAL:
+                hasil = metode(*args, tunggu=False, **kwargs)
+            else:
+                # Tanpa penulis tunggal, kirim_tulis mengeksekusi langsung di thread pemanggil.
+                hasil = await asyncio.wrap_future(
+                    self._executor.submit(functools.partial(metode, *args, tunggu=False, **kwargs)))
+            if not isinstance(hasil, Future):
+                return False, hasil
+            try:
+                return True, await asyncio.wrap_future(hasil)
+            except sqlite3.Error as e:
+                log.error("%s gagal: %s", metode.__name__, e)
+                return False, None
+
+    # --- Tulis ---
+
+    async def tambah_problem(self, problem) -> bool:
+        berhasil, _ = await self._tulis(self.sync.tambah_problem, problem)
+        return berhasil
+
+    async def ubah_problem(self, problem) -> bool:
+        berhasil, berubah = await self._tulis(self.sync.ubah_problem, problem)
+        return berhasil and bool(berubah)
+
+    async def hapus_problem(self, id_problem: int) -> bool:
+        berhasil, terhapus = await self._tulis(self.sync.hapus_problem, id_problem)
+        return berhasil and bool(terhapus)
+
+    async def hapus_problem_batch(self, ids, chunk_size: int = 500) -> list[int] | None:
+        _, hasil = await self._tulis(self.sync.hapus_problem_batch, list(ids), chunk_size)
+        return hasil
+
+    async def tambah_problem_batch(self, problems, chunk_size: int = 5000, maks_detail_gagal: int = 1000) -> dict:
+        return await self._jalankan(self.sync.tambah_problem_batch, problems, chunk_size, maks_detail_gagal)
+
+    async def rebuild_rollup(self) -> int:
+        return await self._jalankan(self.sync.rebuild_rollup)
+
+    # --- Baca ---
+
+    get_semua_problems = _baca_async("get_semua_problems")
+    get_problem_batch = _baca_async("get_problem_batch")
+    get_dataframe_problems = _baca_async("get_dataframe_problems")
+    get_halaman_problems = _baca_async("get_halaman_problems")
+    hitung_problems = _baca_async("hitung_problems")
+    get_frekuensi_problem = _baca_async("get_frekuensi_problem")
+    get_tren_problem_harian = _baca_async("get_tren_problem_harian")
+    get_tren_problem_bulanan = _baca_async("get_tren_problem_bulanan")
+    get_tren_matrix = _baca_async("get_tren_matrix")
+    get_anomali = _baca_async("get_anomali")
+    get_status_anomali = _baca_async("get_status_anomali")
+    get_jumlah_per_kategori = _baca_async("get_jumlah_per_kategori")
+    get_problem_by_id = _baca_async("get_problem_by_id")
+    cari_problem = _baca_async("cari_problem")
+    rekomendasi_solusi = _baca_async("rekomendasi_solusi")
+    changes_since = _baca_async("changes_since")
+
+    async def analisis(self, permintaan: dict[str, tuple]) -> dict:
+        """Versi async dari analisis_paralel: {nama: (nama_method, kwargs)} -> {nama: hasil}, dijalankan bersamaan."""
+        for nama, (metode, _) in permintaan.items():
+            if metode not in HardwareDiagnoser.METODE_ANALISIS:
+                raise ValueError(f"Method analisis tidak dikenal untuk '{nama}': {metode}")
+        hasil = await asyncio.gather(*(self._baca(getattr(self.sync, metode), **(kwargs or {}))
+                                       for metode, kwargs in permintaan.values()))
+        return dict(zip(permintaan, hasil))
+
+    async def iter_problems(self, batch_size: int = 5000, filter_kategori: str | None = None,
+                            tanggal_mulai=None, tanggal_akhir=None, sebagai_dataframe: bool = False):
+        """Async generator seluruh problem (lihat HardwareDiagnoser.iter_problems). Batch berikutnya baru
+        diambil saat konsumen memintanya, jadi memori dan beban database mengikuti kecepatan konsumen."""
+        sumber = self.sync.iter_problems(batch_size, filter_kategori, tanggal_mulai, tanggal_akhir,
+                                         sebagai_dataframe)
+        per_ambil = 1 if sebagai_dataframe else batch_size
+        while True:
+            potongan = await self._baca(lambda: list(itertools.islice(sumber, per_ambil)))
+            if not potongan: return
+            for item in potongan:
+                yield item
+
+    def statistik(self) -> dict:
+        return {**self._stat, "maks_antrean": self.maks_antrean, "pool": self._pool.statistik()}
+
+    def tutup(self):
+        """Batalkan permintaan yang belum mulai, tunggu yang sedang berjalan, lalu tutup koneksi."""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self._pool.tutup()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await asyncio.get_running_loop().run_in_executor(None, self.tutup)
+
+
+if __name__ == "__main__":
+    # Demo: ukur jeda event loop (detak tiap 5 ms) saat query berat dijalankan langsung vs lewat
+    # AsyncHardwareDiagnoser, lalu batalkan satu query yang sedang berjalan.
+    import argparse
+    import os
+    import sys
+    import tempfile
+    import time
+
+    parser = argparse.ArgumentParser(description="Demo responsivitas event loop AsyncHardwareDiagnoser.")
+    parser.add_argument("--jumlah", type=int, default=100_000, help="Jumlah tiket sintetis")
+    args = parser.parse_args()
+
+    async def jeda_maks(pekerjaan) -> tuple[float, float]:
+        jeda, selesai = [0.0], False
+
+        async def detak():
+            while not selesai:
+                mulai = time.perf_counter()
+                await asyncio.sleep(0.005)
+                jeda[0] = max(jeda[0], time.perf_counter() - mulai - 0.005)
+        tugas_detak = asyncio.create_task(detak())
+        await asyncio.sleep(0.01)
+        mulai = time.perf_counter()
+        await pekerjaan()
+        durasi = time.perf_counter() - mulai
+        selesai = True
+        await tugas_detak
+        return durasi * 1000, jeda[0] * 1000
+
+    async def demo():
+        async with AsyncHardwareDiagnoser(HardwareDiagnoser(gunakan_cache=False)) as adiag:
+            diag = adiag.sync
+
+            async def langsung():
+                for _ in range(3): diag.get_dataframe_problems(); diag.get_tren_problem_bulanan()
+
+            async def lewat_async():
+                for _ in range(3):
+                    await asyncio.gather(adiag.get_dataframe_problems(), adiag.get_tren_problem_bulanan())
+
+            for label, pekerjaan in (("langsung (blocking)", langsung), ("AsyncHardwareDiagnoser", lewat_async)):
+                durasi, jeda = await jeda_maks(pekerjaan)
+                print(f"{label:<24} {durasi:8.1f} ms total, jeda event loop maks {jeda:7.1f} ms")
+
+            tugas = asyncio.create_task(adiag.get_dataframe_problems())
+            await asyncio.sleep(0.02)
+            mulai = time.perf_counter()
+            tugas.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await tugas
+            print(f"Pembatalan query berjalan: {(time.perf_counter() - mulai) * 1000:.1f} ms")
+
+            jumlah = 0
+            async for df in adiag.iter_problems(batch_size=20_000, sebagai_dataframe=True):
+                jumlah += len(df)
+            print(f"iter_problems async: {jumlah} baris; statistik: {adiag.statistik()}")
+
+    with tempfile.TemporaryDirectory(prefix="demo_async_") as direktori:
+        database.atur_db_path(os.path.join(direktori, "demo.db"))
+        from data_sintetis import isi_database
+        isi_database(HardwareDiagnoser(gunakan_cache=False), args.jumlah)
+        asyncio.run(demo())
+        database.tutup_pool()
+    sys.exit(0)
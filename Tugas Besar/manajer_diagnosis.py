@@ -1,76 +1,274 @@
 # manajer_diagnosis.py
 
+from __future__ import annotations
 import datetime
-import pandas as pd
+import functools
+import itertools
+import numbers
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter
+from collections.abc import Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
+import arsip
 import database
-from model import Problem
-from konfigurasi import KATEGORI_PROBLEM
+import migrasi
+from model import Problem, ProblemBatch, KOLOM_ROW, hari_ke_tanggal, tanggal_ke_hari, ke_tanggal
+from cache_query import QueryCache
+from impor_lambat import pd, np, adalah_dataframe
+from instrumentasi import get_logger
+from konfigurasi import (KATEGORI_PROBLEM, CACHE_MAKS_ENTRI, CACHE_TTL_DETIK, CACHE_BATAS_PATCH,
+                         CHANGELOG_SIMPAN, ANALISIS_MAKS_THREAD, ANOMALI_HARI_PEMANASAN)
+
+
+log = get_logger("manajer")
+
+
+def _di_cache(fungsi=None, *, patch: str | None = None):
+    """Cache hasil method per (nama method, argumen); otomatis basi saat database.versi_data() berubah.
+    Jika `patch` diberikan (nama method patch), hasil yang basi diperbarui dari change log
+    (changes_since) alih-alih dihitung ulang, selama jumlah perubahannya <= CACHE_BATAS_PATCH."""
+    if fungsi is None:
+        return lambda f: _di_cache(f, patch=patch)
+
+    @functools.wraps(fungsi)
+    def pembungkus(self, *args, **kwargs):
+        if self._cache is None:
+            return fungsi(self, *args, **kwargs)
+        kunci = (fungsi.__name__, args, tuple(sorted(kwargs.items())))
+        try:
+            hash(kunci)
+        except TypeError:
+            return fungsi(self, *args, **kwargs)
+        generasi = database.versi_data()
+        if generasi[1] is None:
+            return fungsi(self, *args, **kwargs)
+
+        status, nilai, seq_lama = self._cache.ambil(kunci, generasi)
+        if status == "basi" and patch and seq_lama is not None:
+            delta = self.changes_since(seq_lama, batas=CACHE_BATAS_PATCH)
+            if delta["lengkap"] and not delta["ada_lagi"]:
+                nilai = getattr(self, patch)(nilai, delta["perubahan"], *args, **kwargs)
+                self._cache.simpan(kunci, generasi, nilai, delta["seq_terakhir"])
+                self._cache.catat_patch()
+                status = "hit"
+        if status != "hit":
+            # seq change log dan hasil query dibaca dari snapshot yang sama supaya patch berikutnya tepat.
+            with database.snapshot():
+                seq = self._seq_terakhir() if patch else None
+                nilai = fungsi(self, *args, **kwargs)
+            self._cache.simpan(kunci, generasi, nilai, seq)
+        # DataFrame dikembalikan sebagai salinan supaya pemanggil tidak mengubah isi cache.
+        return nilai.copy() if adalah_dataframe(nilai) else nilai
+    return pembungkus
 
 class HardwareDiagnoser:
     _db_setup_done = False
 
-    def __init__(self):
+    def __init__(self, gunakan_cache: bool = True):
+        self._indeks = None
+        self._detektor = None
+        self._anomali_lock = threading.RLock()
+        self._executor = None
+        self._pasca_tulis = None
+        self._executor_lock = threading.Lock()
+        self._cache = QueryCache(CACHE_MAKS_ENTRI, CACHE_TTL_DETIK) if gunakan_cache else None
         if not HardwareDiagnoser._db_setup_done:
             print("[HardwareDiagnoser] Melakukan pengecekan/setup database awal...")
             if database.setup_database_initial():
                 HardwareDiagnoser._db_setup_done = True
+                self.pangkas_changelog()
                 print("[HardwareDiagnoser] Database siap.")
             else:
                 print("[HardwareDiagnoser] KRITIKAL: Setup database awal GAGAL!")
         else:
             print("[HardwareDiagnoser] Database sudah siap (skip cek awal).")
 
-    def tambah_problem(self, problem: Problem) -> bool:
-        if not isinstance(problem, Problem) or not problem.nama_problem or not problem.penyebab or not problem.solusi:
-            print("Peringatan: Objek Problem tidak valid atau data kunci kosong.")
-            return False
+    _SQL_INSERT = """
+        INSERT INTO problems 
+        (nama_problem, deskripsi_problem, kategori_problem, penyebab, solusi, tanggal_masuk)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """
+    # `problems` adalah view (lihat migrasi 7): lastrowid/rowcount dari trigger INSTEAD OF tidak terisi, jadi id
+    # baru dibaca dari sqlite_sequence (aman, masih di transaksi penulis yang sama).
+    _SQL_ID_TERAKHIR = "SELECT seq FROM sqlite_sequence WHERE name = 'problems_data'"
 
-        sql = """
-            INSERT INTO problems 
-            (nama_problem, deskripsi_problem, kategori_problem, penyebab, solusi, tanggal_masuk)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """
-        params = (
+    @staticmethod
+    def _validasi_problem(problem) -> str | None:
+        if not isinstance(problem, Problem):
+            return f"Bukan objek Problem: {type(problem).__name__}"
+        if not problem.nama_problem or not problem.penyebab or not problem.solusi:
+            return "Data kunci (nama/penyebab/solusi) kosong"
+        return None
+
+    @staticmethod
+    def _params_problem(problem: Problem) -> tuple:
+        return (
             problem.nama_problem,
             problem.deskripsi_problem,
             problem.kategori_problem,
             problem.penyebab,
             problem.solusi,
-            problem.tanggal_masuk.strftime("%Y-%m-%d")
+            tanggal_ke_hari(problem.tanggal_masuk)
         )
 
-        return database.execute_query(sql, params)
+    def _get_pasca_tulis(self) -> ThreadPoolExecutor:
+        if self._pasca_tulis is None:
+            with self._executor_lock:
+                if self._pasca_tulis is None:
+                    self._pasca_tulis = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pasca-tulis")
+        return self._pasca_tulis
+
+    @staticmethod
+    def _jalankan_setelah(setelah, hasil):
+        try:
+            setelah(hasil)
+        except Exception:
+            log.error("Pembaruan setelah tulis gagal", exc_info=True)
+        return hasil
+
+    def _tunggu_tulis(self, future: Future, tunggu: bool, setelah=None, pesan_gagal: str = "Tulis gagal"):
+        """Tunggu hasil permintaan tulis (return None jika gagal), atau kembalikan Future jika tunggu=False.
+        `setelah(hasil)` (indeks rekomendasi) dijalankan setelah commit, tidak pernah di thread penulis supaya
+        antrean tulis tidak ikut menunggu: tunggu=True di thread pemanggil, tunggu=False di thread 'pasca-tulis'
+        dan Future yang dikembalikan baru selesai sesudahnya."""
+        if not tunggu:
+            if setelah is None: return future
+            hasil = Future()
+            hasil.set_running_or_notify_cancel()
+
+            def selesai(f: Future):
+                try:
+                    nilai = f.result()
+                except BaseException as e:
+                    hasil.set_exception(e)
+                    return
+                try:
+                    self._get_pasca_tulis().submit(lambda: hasil.set_result(self._jalankan_setelah(setelah, nilai)))
+                except RuntimeError:    # tutup() sudah dipanggil
+                    hasil.set_result(self._jalankan_setelah(setelah, nilai))
+            future.add_done_callback(selesai)
+            return hasil
+        try:
+            nilai = future.result()
+        except sqlite3.Error as e:
+            log.error("%s: %s", pesan_gagal, e)
+            return None
+        return nilai if setelah is None else self._jalankan_setelah(setelah, nilai)
+
+    def tambah_problem(self, problem: Problem, tunggu: bool = True) -> bool | Future:
+        """Simpan satu Problem. tunggu=False: langsung return Future berisi id problem baru."""
+        if self._validasi_problem(problem):
+            print("Peringatan: Objek Problem tidak valid atau data kunci kosong.")
+            return False
+
+        params = self._params_problem(problem)
+        def tambah(conn):
+            conn.execute(self._SQL_INSERT, params)
+            return conn.execute(self._SQL_ID_TERAKHIR).fetchone()[0]
+
+        future = database.kirim_tulis(tambah)
+        hasil = self._tunggu_tulis(future, tunggu, lambda _: self._setelah_tambah(), "Tambah problem gagal")
+        return hasil if not tunggu else hasil is not None
+
+    _SQL_UPDATE = """
+        UPDATE problems
+        SET nama_problem = ?, deskripsi_problem = ?, kategori_problem = ?, penyebab = ?, solusi = ?, tanggal_masuk = ?
+        WHERE id = ?
+        RETURNING id
+    """
+
+    def ubah_problem(self, problem: Problem, tunggu: bool = True) -> bool | Future:
+        """Perbarui problem berdasarkan problem.id. Return True jika ada baris yang berubah
+        (tunggu=False: Future berisi nilai yang sama). Tiket di partisi arsip (arsip.py) hanya-baca."""
+        if self._validasi_problem(problem) or not isinstance(problem.id, int) or problem.id <= 0:
+            print("Peringatan: Objek Problem tidak valid, data kunci kosong, atau ID tidak ada.")
+            return False
+
+        params = self._params_problem(problem) + (problem.id,)
+        future = database.kirim_tulis(lambda conn: conn.execute(self._SQL_UPDATE, params).fetchone() is not None)
+
+        def setelah(berubah):
+            if berubah and self._indeks is not None: self._indeks.tambah([(problem.id, problem.nama_problem,
+                                                                            problem.deskripsi_problem)])
+        hasil = self._tunggu_tulis(future, tunggu, setelah, "Ubah problem gagal")
+        return hasil if not tunggu else bool(hasil)
+
+    def tambah_problem_batch(self, problems: Iterable[Problem], chunk_size: int = 5000,
+                             maks_detail_gagal: int = 1000) -> dict:
+        """Masukkan banyak Problem sekaligus. `problems` boleh generator; data diproses per chunk
+        (satu transaksi + executemany per chunk), jadi memori tetap datar berapapun jumlah datanya.
+        Baris yang tidak valid dicatat di 'gagal_detail' (indeks, pesan) tanpa menggagalkan baris lain."""
+        chunk_size = max(1, int(chunk_size))
+        hasil = {"berhasil": 0, "gagal": 0, "gagal_detail": [], "chunk": 0}
+        mulai = time.perf_counter()
+
+        def catat_gagal(indeks, pesan):
+            hasil["gagal"] += 1
+            if len(hasil["gagal_detail"]) < maks_detail_gagal:
+                hasil["gagal_detail"].append((indeks, pesan))
+
+        data = enumerate(problems)
+        while True:
+            chunk = list(itertools.islice(data, chunk_size))
+            if not chunk: break
+            rows, indeks_rows = [], []
+            for indeks, problem in chunk:
+                pesan = self._validasi_problem(problem)
+                if pesan:
+                    catat_gagal(indeks, pesan)
+                    continue
+                rows.append(self._params_problem(problem))
+                indeks_rows.append(indeks)
+
+            sukses, gagal_db = database.execute_many(self._SQL_INSERT, rows)
+            hasil["berhasil"] += sukses
+            for posisi, pesan in gagal_db:
+                catat_gagal(indeks_rows[posisi], pesan)
+            hasil["chunk"] += 1
+
+        if hasil["berhasil"]: self._setelah_tambah()
+        durasi = time.perf_counter() - mulai
+        hasil["durasi_detik"] = round(durasi, 4)
+        hasil["baris_per_detik"] = round(hasil["berhasil"] / durasi, 1) if durasi > 0 else 0.0
+        return hasil
+
+    # Query baris problem memakai placeholder {problems}: dijalankan di database utama + partisi arsip yang
+    # relevan lewat arsip.baca (UNION ALL, urutan & LIMIT diterapkan di luar gabungan).
+    _SQL_SEMUA_PROBLEMS = """
+        SELECT id, nama_problem, deskripsi_problem, kategori_problem, penyebab, solusi, tanggal_masuk 
+        FROM {problems}
+    """
+    _URUT_TERBARU = (("tanggal_masuk", False), ("id", False))
 
     def get_semua_problems(self) -> list[Problem]:
-        sql = """
-            SELECT id, nama_problem, deskripsi_problem, kategori_problem, penyebab, solusi, tanggal_masuk 
-            FROM problems 
-            ORDER BY tanggal_masuk DESC, id DESC
-        """
-        rows = database.fetch_query(sql, fetch_all=True)
-        problems_list = []
-
-        if rows:
-            for row in rows:
-                problems_list.append(Problem(
-                    id_problem=row['id'],
-                    nama_problem=row['nama_problem'],
-                    deskripsi_problem=row['deskripsi_problem'],
-                    kategori_problem=row['kategori_problem'],
-                    penyebab=row['penyebab'],
-                    solusi=row['solusi'],
-                    tanggal_masuk=row['tanggal_masuk']
-                ))
-        return problems_list
+        rows = arsip.baca(self._SQL_SEMUA_PROBLEMS, urut=self._URUT_TERBARU)
+        return [Problem.from_row(row) for row in rows] if rows else []
 
-    def get_dataframe_problems(self, filter_kategori: str | None = None,
-                               tanggal_mulai: datetime.date | None = None,
-                               tanggal_akhir: datetime.date | None = None) -> pd.DataFrame:
-        sql = """
-            SELECT id, tanggal_masuk, kategori_problem, nama_problem,
-                   deskripsi_problem, penyebab, solusi
-            FROM problems
-        """
+    def get_problem_batch(self, filter_kategori: str | None = None,
+                          tanggal_mulai: datetime.date | None = None,
+                          tanggal_akhir: datetime.date | None = None,
+                          batch_size: int = 5000) -> ProblemBatch:
+        """Semua problem (sesuai filter) dalam bentuk kolom (ProblemBatch), dibaca streaming dari cursor."""
+        sql = f"SELECT {', '.join(KOLOM_ROW)} FROM {{problems}}"
+        conditions, params = self._kondisi_filter(filter_kategori, tanggal_mulai, tanggal_akhir)
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        try:
+            return ProblemBatch.from_rows(arsip.iter_baca(sql, tuple(params), tanggal_mulai=tanggal_mulai,
+                                                          tanggal_akhir=tanggal_akhir, urut=self._URUT_TERBARU,
+                                                          batch_size=batch_size))
+        except sqlite3.Error as e:
+            log.error("Gagal membaca ProblemBatch: %s", e, exc_info=True)
+            return ProblemBatch()
+
+    @staticmethod
+    def _kondisi_filter(filter_kategori: str | None = None,
+                        tanggal_mulai: datetime.date | None = None,
+                        tanggal_akhir: datetime.date | None = None) -> tuple[list[str], list]:
         conditions, params = [], []
 
         if filter_kategori and filter_kategori != "Semua Kategori":
@@ -78,16 +276,71 @@ class HardwareDiagnoser:
             params.append(filter_kategori)
         if tanggal_mulai:
             conditions.append("tanggal_masuk >= ?")
-            params.append(tanggal_mulai.strftime("%Y-%m-%d"))
+            params.append(tanggal_ke_hari(tanggal_mulai))
         if tanggal_akhir:
             conditions.append("tanggal_masuk <= ?")
-            params.append(tanggal_akhir.strftime("%Y-%m-%d"))
+            params.append(tanggal_ke_hari(tanggal_akhir))
+        return conditions, params
+
+    @staticmethod
+    def _kursor(kursor: tuple | None) -> tuple[int, int] | None:
+        """Normalisasi kursor keyset (tanggal_masuk, id) ke (nomor hari, id); tanggal boleh nomor hari,
+        date, atau string 'YYYY-MM-DD'."""
+        if kursor is None: return None
+        tanggal, id_problem = kursor
+        if isinstance(tanggal, numbers.Integral): return int(tanggal), int(id_problem)
+        if not isinstance(tanggal, datetime.date): tanggal = ke_tanggal(str(tanggal)[:10])
+        return tanggal_ke_hari(tanggal), int(id_problem)
+
+    @classmethod
+    def _filter_dataframe_problems(cls, filter_kategori: str | None = None,
+                                   tanggal_mulai: datetime.date | None = None,
+                                   tanggal_akhir: datetime.date | None = None,
+                                   setelah: tuple | None = None, ids: list[int] | None = None) -> tuple[str, tuple]:
+        sql = """
+            SELECT id, tanggal_masuk, kategori_problem, nama_problem,
+                   deskripsi_problem, penyebab, solusi
+            FROM {problems}
+        """
+        conditions, params = cls._kondisi_filter(filter_kategori, tanggal_mulai, tanggal_akhir)
+        setelah = cls._kursor(setelah)
+        if setelah:
+            # Keyset: baris "sesudah" kursor dalam urutan tanggal_masuk DESC, id DESC.
+            conditions.append("(tanggal_masuk, id) < (?, ?)")
+            params.extend(setelah)
+        if ids:
+            conditions.append(f"id IN ({', '.join('?' * len(ids))})")
+            params.extend(ids)
 
         if conditions:
             sql += " WHERE " + " AND ".join(conditions)
-        sql += " ORDER BY tanggal_masuk DESC, id DESC"
+        return sql, tuple(params)
+
+    @classmethod
+    def _sql_dataframe_problems(cls, filter_kategori: str | None = None,
+                                tanggal_mulai: datetime.date | None = None,
+                                tanggal_akhir: datetime.date | None = None,
+                                setelah: tuple | None = None, batas: int | None = None,
+                                ids: list[int] | None = None) -> tuple[str, tuple]:
+        """Query daftar problem di database utama saja (patch cache & laporan query plan)."""
+        sql, params = cls._filter_dataframe_problems(filter_kategori, tanggal_mulai, tanggal_akhir, setelah, ids)
+        return arsip.sql_gabungan(sql, params, urut=cls._URUT_TERBARU, batas=batas or None)[:2]
+
+    def _baca_dataframe_problems(self, filter_kategori: str | None = None,
+                                 tanggal_mulai: datetime.date | None = None,
+                                 tanggal_akhir: datetime.date | None = None,
+                                 setelah: tuple | None = None, batas: int | None = None,
+                                 sebagai: str = "dataframe"):
+        """Daftar problem dari database utama + partisi arsip yang beririsan dengan filter tanggal & kursor."""
+        sql, params = self._filter_dataframe_problems(filter_kategori, tanggal_mulai, tanggal_akhir, setelah)
+        akhir = tanggal_ke_hari(tanggal_akhir) if tanggal_akhir else None
+        setelah = self._kursor(setelah)
+        if setelah: akhir = setelah[0] if akhir is None else min(akhir, setelah[0])
+        return arsip.baca(sql, params, tanggal_mulai=tanggal_mulai, tanggal_akhir=akhir, urut=self._URUT_TERBARU,
+                          batas=batas or None, sebagai=sebagai)
 
-        df = database.get_dataframe(sql, params=tuple(params) if params else None)
+    @staticmethod
+    def _format_dataframe_problems(df: pd.DataFrame) -> pd.DataFrame:
         if not df.empty:
             df = df[['id', 'tanggal_masuk', 'kategori_problem', 'nama_problem',
                      'deskripsi_problem', 'penyebab', 'solusi']]
@@ -100,54 +353,148 @@ class HardwareDiagnoser:
                 'penyebab': 'Penyebab',
                 'solusi': 'Solusi'
             }, inplace=True)
+            df['Tanggal'] = df['Tanggal'].map(hari_ke_tanggal)
         return df
 
-    def hapus_problem(self, id_problem: int) -> bool:
+    @_di_cache(patch="_patch_dataframe_problems")
+    def get_dataframe_problems(self, filter_kategori: str | None = None,
+                               tanggal_mulai: datetime.date | None = None,
+                               tanggal_akhir: datetime.date | None = None) -> pd.DataFrame:
+        df = self._baca_dataframe_problems(filter_kategori, tanggal_mulai, tanggal_akhir)
+        return self._format_dataframe_problems(df)
+
+    @_di_cache
+    def get_halaman_problems(self, batas: int = 50, setelah: tuple | None = None,
+                             filter_kategori: str | None = None,
+                             tanggal_mulai: datetime.date | None = None,
+                             tanggal_akhir: datetime.date | None = None) -> pd.DataFrame:
+        """Satu halaman (maks. `batas` baris) dengan keyset pagination pada (tanggal_masuk, id).
+        `setelah` = (Tanggal, ID) dari baris terakhir halaman sebelumnya; None untuk halaman pertama."""
+        df = self._baca_dataframe_problems(filter_kategori, tanggal_mulai, tanggal_akhir, setelah=setelah, batas=batas)
+        return self._format_dataframe_problems(df)
+
+    @_di_cache(patch="_patch_hitung_problems")
+    def hitung_problems(self, filter_kategori: str | None = None,
+                        tanggal_mulai: datetime.date | None = None,
+                        tanggal_akhir: datetime.date | None = None) -> int:
+        sql = "SELECT COUNT(*) FROM {problems}"
+        conditions, params = self._kondisi_filter(filter_kategori, tanggal_mulai, tanggal_akhir)
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        rows = arsip.baca(sql, tuple(params), tanggal_mulai=tanggal_mulai, tanggal_akhir=tanggal_akhir)
+        return sum(row[0] for row in rows)
+
+    def iter_problems(self, batch_size: int = 5000, filter_kategori: str | None = None,
+                      tanggal_mulai: datetime.date | None = None,
+                      tanggal_akhir: datetime.date | None = None,
+                      sebagai_dataframe: bool = False):
+        """Generator seluruh problem (urut tanggal_masuk DESC, id DESC) per batch dengan keyset pagination.
+        Setiap batch adalah query terpisah, jadi tidak ada koneksi/transaksi yang ditahan lama.
+        Yield: objek Problem satu per satu, atau DataFrame per batch jika sebagai_dataframe=True."""
+        setelah = None
+        while True:
+            if sebagai_dataframe:
+                df = self._baca_dataframe_problems(filter_kategori, tanggal_mulai, tanggal_akhir, setelah=setelah,
+                                                   batas=batch_size)
+                if df.empty: return
+                setelah = (df['tanggal_masuk'].iloc[-1], df['id'].iloc[-1])
+                yield self._format_dataframe_problems(df)
+                if len(df) < batch_size: return
+            else:
+                rows = self._baca_dataframe_problems(filter_kategori, tanggal_mulai, tanggal_akhir, setelah=setelah,
+                                                     batas=batch_size, sebagai="baris")
+                if not rows: return
+                setelah = (rows[-1]['tanggal_masuk'], rows[-1]['id'])
+                for row in rows:
+                    yield Problem.from_row((row['id'], row['nama_problem'], row['deskripsi_problem'],
+                                            row['kategori_problem'], row['penyebab'], row['solusi'],
+                                            row['tanggal_masuk']))
+                if len(rows) < batch_size: return
+
+    def hapus_problem(self, id_problem: int, tunggu: bool = True) -> bool | Future:
+        """Hapus satu problem. Return: True jika barisnya ada di database utama dan terhapus (id yang tidak ada atau
+        sudah diarsipkan -> False). tunggu=False: langsung return Future berisi nilai tersebut."""
         if not isinstance(id_problem, int) or id_problem <= 0: return False
-        sql = "DELETE FROM problems WHERE id = ?"
-        return database.execute_query(sql, (id_problem,))
+        sql = "DELETE FROM problems_data WHERE id = ?"
+        future = database.kirim_tulis(lambda conn: conn.execute(sql, (id_problem,)).rowcount > 0)
+        hasil = self._tunggu_tulis(future, tunggu, lambda terhapus: terhapus and self._setelah_hapus([id_problem]),
+                                   "Hapus problem gagal")
+        return hasil if not tunggu else bool(hasil)
 
-    def get_frekuensi_problem(self, tanggal_mulai: datetime.date = None,
-                              tanggal_akhir: datetime.date = None) -> pd.DataFrame:
-        sql = """
-            SELECT nama_problem, COUNT(id) as jumlah_kejadian
-            FROM problems
-        """
+    def hapus_problem_batch(self, ids: Iterable[int], chunk_size: int = 500,
+                            tunggu: bool = True) -> list[int] | None | Future:
+        """Hapus sekumpulan ID secara atomik (satu transaksi, IN-list per chunk).
+        Return: daftar ID yang benar-benar terhapus, atau None jika gagal (tidak ada yang terhapus).
+        tunggu=False: langsung return Future berisi daftar ID tersebut."""
+        id_valid = sorted({int(i) for i in ids if isinstance(i, numbers.Integral) and not isinstance(i, bool) and i > 0})
+        if not id_valid: return []
+
+        def hapus(conn):
+            terhapus = []
+            for i in range(0, len(id_valid), chunk_size):
+                chunk = id_valid[i:i + chunk_size]
+                sql = f"DELETE FROM problems_data WHERE id IN ({', '.join('?' * len(chunk))}) RETURNING id"
+                terhapus.extend(row[0] for row in conn.execute(sql, chunk).fetchall())
+            return sorted(terhapus)
+
+        return self._tunggu_tulis(database.kirim_tulis(hapus), tunggu, self._setelah_hapus,
+                                  "Hapus batch gagal, transaksi dibatalkan")
+
+    @staticmethod
+    def _sql_frekuensi_problem(tanggal_mulai: datetime.date = None,
+                               tanggal_akhir: datetime.date = None) -> tuple[str, tuple]:
+        # Dibaca dari rollup_harian (dijaga trigger), bukan dari tabel problems mentah. Dikelompokkan per id
+        # katalog (integer), nama baru di-join ke hasil yang sudah kecil.
         conditions, params = [], []
 
         if tanggal_mulai:
-            conditions.append("tanggal_masuk >= ?")
-            params.append(tanggal_mulai.strftime("%Y-%m-%d"))
+            conditions.append("tanggal >= ?")
+            params.append(tanggal_ke_hari(tanggal_mulai))
         if tanggal_akhir:
-            conditions.append("tanggal_masuk <= ?")
-            params.append(tanggal_akhir.strftime("%Y-%m-%d"))
+            conditions.append("tanggal <= ?")
+            params.append(tanggal_ke_hari(tanggal_akhir))
 
-        if conditions:
-            sql += " WHERE " + " AND ".join(conditions)
-        sql += " GROUP BY nama_problem ORDER BY jumlah_kejadian DESC"
+        where = " WHERE " + " AND ".join(conditions) if conditions else ""
+        sql = f"""
+            SELECT katalog_problem.nama AS nama_problem, r.jumlah_kejadian
+            FROM (SELECT katalog_id, SUM(jumlah) AS jumlah_kejadian FROM rollup_harian{where}
+                  GROUP BY katalog_id) r
+            JOIN katalog_problem ON katalog_problem.id = r.katalog_id
+            ORDER BY r.jumlah_kejadian DESC, nama_problem
+        """
+        return sql, tuple(params)
 
-        df = database.get_dataframe(sql, params=tuple(params) if params else None)
+    @_di_cache(patch="_patch_frekuensi_problem")
+    def get_frekuensi_problem(self, tanggal_mulai: datetime.date = None,
+                              tanggal_akhir: datetime.date = None) -> pd.DataFrame:
+        sql, params = self._sql_frekuensi_problem(tanggal_mulai, tanggal_akhir)
+        df = database.get_dataframe(sql, params=params or None)
         df.rename(columns={'nama_problem': 'Masalah', 'jumlah_kejadian': 'Jumlah Kejadian'}, inplace=True)
         return df
 
-    def get_tren_problem_harian(self, kategori_problem: str = None) -> pd.DataFrame:
+    @staticmethod
+    def _sql_tren_problem_harian(kategori_problem: str = None) -> tuple[str, tuple]:
         sql = """
-            SELECT tanggal_masuk, COUNT(id) as jumlah_masalah
-            FROM problems
+            SELECT tanggal as tanggal_masuk, SUM(jumlah) as jumlah_masalah
+            FROM rollup_harian
         """
         conditions, params = [], []
 
         if kategori_problem and kategori_problem != "Semua Kategori":
-            conditions.append("kategori_problem = ?")
+            conditions.append("kategori_id = (SELECT id FROM kategori WHERE nama = ?)")
             params.append(kategori_problem)
 
         if conditions:
             sql += " WHERE " + " AND ".join(conditions)
-        sql += " GROUP BY tanggal_masuk ORDER BY tanggal_masuk ASC"
+        sql += " GROUP BY tanggal ORDER BY tanggal ASC"
+        return sql, tuple(params)
 
-        df = database.get_dataframe(sql, params=tuple(params) if params else None)
+    @_di_cache(patch="_patch_tren_problem_harian")
+    def get_tren_problem_harian(self, kategori_problem: str = None) -> pd.DataFrame:
+        sql, params = self._sql_tren_problem_harian(kategori_problem)
+        df = database.get_dataframe(sql, params=params or None)
         if not df.empty:
-            df['tanggal_masuk'] = pd.to_datetime(df['tanggal_masuk'])
+            df['tanggal_masuk'] = pd.to_datetime(df['tanggal_masuk'], unit='D')
             df.set_index('tanggal_masuk', inplace=True)
             df = df.resample('D').sum().fillna(0)
             df.rename(columns={'jumlah_masalah': 'Jumlah Masalah'}, inplace=True)
@@ -157,24 +504,29 @@ class HardwareDiagnoser:
 
         return df
 
-    def get_tren_problem_bulanan(self, kategori_problem: str = None) -> pd.DataFrame:
+    @staticmethod
+    def _sql_tren_problem_bulanan(kategori_problem: str = None) -> tuple[str, tuple]:
         sql = """
-            SELECT strftime('%Y-%m', tanggal_masuk) as bulan, COUNT(id) as jumlah_masalah
-            FROM problems
+            SELECT bulan, SUM(jumlah) as jumlah_masalah
+            FROM rollup_harian
         """
         conditions, params = [], []
 
         if kategori_problem and kategori_problem != "Semua Kategori":
-            conditions.append("kategori_problem = ?")
+            conditions.append("kategori_id = (SELECT id FROM kategori WHERE nama = ?)")
             params.append(kategori_problem)
 
         if conditions:
             sql += " WHERE " + " AND ".join(conditions)
         sql += " GROUP BY bulan ORDER BY bulan ASC"
+        return sql, tuple(params)
 
-        df = database.get_dataframe(sql, params=tuple(params) if params else None)
+    @_di_cache(patch="_patch_tren_problem_bulanan")
+    def get_tren_problem_bulanan(self, kategori_problem: str = None) -> pd.DataFrame:
+        sql, params = self._sql_tren_problem_bulanan(kategori_problem)
+        df = database.get_dataframe(sql, params=params or None)
         if not df.empty:
-            df['bulan'] = pd.to_datetime(df['bulan'])
+            df['bulan'] = pd.to_datetime(df['bulan'].to_numpy().astype('datetime64[M]'))
             df.set_index('bulan', inplace=True)
             df.rename(columns={'jumlah_masalah': 'Jumlah Masalah'}, inplace=True)
         else:
@@ -183,22 +535,533 @@ class HardwareDiagnoser:
 
         return df
 
+    @staticmethod
+    def _sql_jumlah_per_kategori(tanggal_mulai: datetime.date = None,
+                                 tanggal_akhir: datetime.date = None) -> tuple[str, tuple]:
+        conditions, params = [], []
+
+        if tanggal_mulai:
+            conditions.append("tanggal >= ?")
+            params.append(tanggal_ke_hari(tanggal_mulai))
+        if tanggal_akhir:
+            conditions.append("tanggal <= ?")
+            params.append(tanggal_ke_hari(tanggal_akhir))
+
+        where = " WHERE " + " AND ".join(conditions) if conditions else ""
+        # Kategori NULL tersimpan sebagai id 0 dan ditampilkan sebagai ''.
+        sql = f"""
+            SELECT COALESCE(kategori.nama, '') AS kategori_problem, r.jumlah_masalah
+            FROM (SELECT kategori_id, SUM(jumlah) AS jumlah_masalah FROM rollup_harian{where}
+                  GROUP BY kategori_id) r
+            LEFT JOIN kategori ON kategori.id = r.kategori_id
+            ORDER BY r.jumlah_masalah DESC, kategori_problem
+        """
+        return sql, tuple(params)
+
+    @_di_cache(patch="_patch_jumlah_per_kategori")
+    def get_jumlah_per_kategori(self, tanggal_mulai: datetime.date = None,
+                                tanggal_akhir: datetime.date = None) -> pd.DataFrame:
+        sql, params = self._sql_jumlah_per_kategori(tanggal_mulai, tanggal_akhir)
+        df = database.get_dataframe(sql, params=params or None)
+        df.rename(columns={'kategori_problem': 'Kategori', 'jumlah_masalah': 'Jumlah Masalah'}, inplace=True)
+        return df
+
+    GRANULARITAS_TREN = ("D", "W", "M", "Q")
+
+    @staticmethod
+    def _nomor_periode(granularitas: str, nilai):
+        """Nomor hari (D/W) atau nomor bulan (M/Q) -> nomor periode. Minggu dimulai Senin (hari 0 = Kamis)."""
+        if granularitas == "W": return (nilai + 3) // 7
+        if granularitas == "Q": return nilai // 3
+        return nilai
+
+    @classmethod
+    def _periode_tanggal(cls, granularitas: str, tanggal: datetime.date) -> int:
+        nilai = (tanggal.year - 1970) * 12 + tanggal.month - 1 if granularitas in ("M", "Q") else tanggal_ke_hari(tanggal)
+        return cls._nomor_periode(granularitas, nilai)
+
+    @staticmethod
+    def _awal_periode(granularitas: str, nomor):
+        """Nomor periode (array) -> tanggal awal periode sebagai datetime64."""
+        if granularitas == "D": return nomor.astype("datetime64[D]")
+        if granularitas == "W": return (nomor * 7 - 3).astype("datetime64[D]")
+        if granularitas == "M": return nomor.astype("datetime64[M]")
+        return (nomor * 3).astype("datetime64[M]")
+
+    @staticmethod
+    def _sql_tren_matrix(granularitas: str, kategori: tuple | None = None,
+                         tanggal_mulai: datetime.date | None = None,
+                         tanggal_akhir: datetime.date | None = None) -> tuple[str, tuple]:
+        # D/W dikelompokkan per hari, M/Q per kolom bulan; keduanya dilayani indeks covering rollup_harian.
+        kolom = "bulan" if granularitas in ("M", "Q") else "tanggal"
+        conditions, params = [], []
+        if kategori:
+            conditions.append(f"kategori_id IN (SELECT id FROM kategori WHERE nama IN ({', '.join('?' * len(kategori))}))")
+            params.extend(kategori)
+        if tanggal_mulai:
+            conditions.append("tanggal >= ?")
+            params.append(tanggal_ke_hari(tanggal_mulai))
+        if tanggal_akhir:
+            conditions.append("tanggal <= ?")
+            params.append(tanggal_ke_hari(tanggal_akhir))
+        where = " WHERE " + " AND ".join(conditions) if conditions else ""
+        sql = f"""
+            SELECT COALESCE(kategori.nama, ''), r.periode, r.jumlah
+            FROM (SELECT kategori_id, {kolom} AS periode, SUM(jumlah) AS jumlah FROM rollup_harian{where}
+                  GROUP BY kategori_id, {kolom}) r
+            LEFT JOIN kategori ON kategori.id = r.kategori_id
+        """
+        return sql, tuple(params)
+
+    def get_tren_matrix(self, granularitas: str = "D", kategori: str | Iterable[str] | None = None,
+                        tanggal_mulai: datetime.date | None = None,
+                        tanggal_akhir: datetime.date | None = None) -> pd.DataFrame:
+        """Matriks jumlah masalah periode × kategori dari satu query berkelompok: index = awal periode
+        ('D' harian, 'W' mingguan mulai Senin, 'M' bulanan, 'Q' kuartalan), satu kolom per kategori.
+        Periode kosong diisi 0, jadi tampilan per kategori / total / bertumpuk cukup di-slice dari hasil ini.
+        kategori None (atau "Semua Kategori") = semua kategori yang punya data."""
+        if granularitas not in self.GRANULARITAS_TREN:
+            raise ValueError(f"Granularitas tren harus salah satu dari {self.GRANULARITAS_TREN}: {granularitas!r}")
+        if isinstance(kategori, str):
+            kategori = None if kategori == "Semua Kategori" else (kategori,)
+        elif kategori is not None:
+            kategori = tuple(dict.fromkeys(kategori)) or None
+        return self._tren_matrix(granularitas, kategori, tanggal_mulai, tanggal_akhir)
+
+    @_di_cache
+    def _tren_matrix(self, granularitas: str, kategori: tuple | None,
+                     tanggal_mulai: datetime.date | None, tanggal_akhir: datetime.date | None) -> pd.DataFrame:
+        sql, params = self._sql_tren_matrix(granularitas, kategori, tanggal_mulai, tanggal_akhir)
+        rows = database.fetch_query(sql, params or None) or []
+        nama_kategori, kolom_periode, jumlah = zip(*rows) if rows else ((), (), ())
+        label = list(kategori) if kategori else sorted(set(nama_kategori))
+        kode = {k: i for i, k in enumerate(label)}
+        kode_kategori = np.fromiter(map(kode.__getitem__, nama_kategori), dtype=np.intp, count=len(rows))
+        kolom_periode = np.array(kolom_periode, dtype=np.int64)
+        jumlah = np.array(jumlah, dtype=np.int64)
+
+        kosong = pd.DataFrame(columns=label, index=pd.DatetimeIndex([], name='periode'), dtype='int64')
+        if not rows and not (tanggal_mulai and tanggal_akhir):
+            return kosong
+        periode = self._nomor_periode(granularitas, kolom_periode)
+        awal = self._periode_tanggal(granularitas, tanggal_mulai) if tanggal_mulai else int(periode.min())
+        akhir = self._periode_tanggal(granularitas, tanggal_akhir) if tanggal_akhir else int(periode.max())
+        if akhir < awal:
+            return kosong
+
+        matriks = np.zeros((akhir - awal + 1, len(label)), dtype=np.int64)
+        np.add.at(matriks, (periode - awal, kode_kategori), jumlah)
+        index = pd.DatetimeIndex(self._awal_periode(granularitas, np.arange(awal, akhir + 1)), name='periode')
+        return pd.DataFrame(matriks, index=index, columns=label)
+
+    # Method yang boleh dipanggil lewat analisis_paralel (semuanya hanya membaca).
+    METODE_ANALISIS = ("get_frekuensi_problem", "get_tren_problem_harian", "get_tren_problem_bulanan",
+                       "get_tren_matrix", "get_jumlah_per_kategori", "hitung_problems", "get_dataframe_problems",
+                       "get_anomali", "get_status_anomali")
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=ANALISIS_MAKS_THREAD,
+                                                        thread_name_prefix="analisis")
+        return self._executor
+
+    def analisis_paralel(self, permintaan: dict[str, tuple]) -> dict:
+        """Jalankan beberapa query analisis sekaligus di thread pool (koneksi read-only), lalu kembalikan
+        semua hasilnya bersama. `permintaan`: {nama: (nama_method, kwargs)}, mis.
+        {"frekuensi": ("get_frekuensi_problem", {"tanggal_mulai": d}), "tren": ("get_tren_problem_harian", {})}.
+        Total waktu ~ query terlama, bukan jumlah semuanya."""
+        for nama, (metode, _) in permintaan.items():
+            if metode not in self.METODE_ANALISIS:
+                raise ValueError(f"Method analisis tidak dikenal untuk '{nama}': {metode}")
+        executor = self._get_executor()
+        futures = {nama: executor.submit(getattr(self, metode), **(kwargs or {}))
+                   for nama, (metode, kwargs) in permintaan.items()}
+        return {nama: future.result() for nama, future in futures.items()}
+
+    def tutup(self):
+        """Hentikan thread pool analisis & thread pasca-tulis (jika sudah dibuat)."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        if self._pasca_tulis is not None:
+            self._pasca_tulis.shutdown(wait=True)
+            self._pasca_tulis = None
+
+    _SQL_PROBLEM_BY_ID = """
+        SELECT id, nama_problem, deskripsi_problem, kategori_problem, penyebab, solusi, tanggal_masuk
+        FROM {problems}
+        WHERE id = ?
+    """
+
     def get_problem_by_id(self, id_problem: int) -> Problem | None:
+        rows = arsip.baca(self._SQL_PROBLEM_BY_ID, (id_problem,), rentang_id=(id_problem, id_problem))
+        return Problem.from_row(rows[0]) if rows else None
+
+    @staticmethod
+    def _query_fts(teks: str) -> str:
+        """Ubah teks bebas dari pengguna menjadi query FTS5 yang aman: setiap kata di-quote dan diberi prefix *."""
+        kata = re.findall(r"\w+", teks or "")
+        return " ".join(f'"{k}"*' for k in kata)
+
+    @staticmethod
+    def _sql_cari_problem(query_fts: str, kategori: str | None = None) -> tuple[str, tuple]:
+        # Tabel FTS tidak diberi alias: MATCH, highlight(), dan rank harus memakai nama tabelnya, juga di arsip.
         sql = """
-            SELECT id, nama_problem, deskripsi_problem, kategori_problem, penyebab, solusi, tanggal_masuk
-            FROM problems
-            WHERE id = ?
+            SELECT p.id, p.tanggal_masuk, p.kategori_problem, p.nama_problem,
+                   highlight(problems_fts, 0, '**', '**') AS nama_highlight,
+                   snippet(problems_fts, -1, '**', '**', '…', 16) AS cuplikan,
+                   p.penyebab, p.solusi, problems_fts.rank AS skor
+            FROM {fts}
+            JOIN {problems} p ON p.id = problems_fts.rowid
+            WHERE problems_fts MATCH ?
         """
-        row = database.fetch_query(sql, (id_problem,), fetch_all=False)
-
-        if row:
-            return Problem(
-                id_problem=row['id'],
-                nama_problem=row['nama_problem'],
-                deskripsi_problem=row['deskripsi_problem'],
-                kategori_problem=row['kategori_problem'],
-                penyebab=row['penyebab'],
-                solusi=row['solusi'],
-                tanggal_masuk=row['tanggal_masuk']
-            )
-        return None
\ No newline at end of file
+        params = [query_fts]
+        if kategori and kategori != "Semua Kategori":
+            sql += " AND p.kategori_problem = ?"
+            params.append(kategori)
+        return sql, tuple(params)
+
+    @_di_cache
+    def cari_problem(self, query: str, kategori: str | None = None,
+                     limit: int = 20, offset: int = 0) -> pd.DataFrame:
+        """Pencarian full-text (FTS5) di nama, deskripsi, penyebab, dan solusi; diurutkan berdasarkan BM25.
+        Kata yang cocok ditandai **tebal** di kolom 'Masalah (Sorotan)' dan 'Cuplikan'."""
+        kolom = ['ID', 'Tanggal', 'Kategori', 'Masalah', 'Masalah (Sorotan)', 'Cuplikan', 'Penyebab', 'Solusi', 'Skor']
+        query_fts = self._query_fts(query)
+        if not query_fts:
+            return pd.DataFrame(columns=kolom)
+        # Skor BM25 dihitung per file (statistik korpus masing-masing), jadi urutan antar partisi perkiraan.
+        sql, params = self._sql_cari_problem(query_fts, kategori)
+        df = arsip.baca(sql, params, urut=(("skor", True),), batas=limit, lewati=offset, sebagai="dataframe")
+        if df.empty:
+            return pd.DataFrame(columns=kolom)
+        df.columns = kolom
+        df['Tanggal'] = df['Tanggal'].map(hari_ke_tanggal)
+        return df
+
+    def _setelah_tambah(self):
+        if self._indeks is not None: self.sinkronkan_rekomendasi()
+
+    def _setelah_hapus(self, ids):
+        if self._indeks is not None and ids: self._indeks.hapus(ids)
+
+    def _indeks_rekomendasi(self):
+        if self._indeks is None:
+            import rekomendasi
+            direktori = os.path.splitext(database.DB_PATH)[0] + "_rekomendasi"
+            self._indeks = rekomendasi.get_indeks(direktori)
+            self.sinkronkan_rekomendasi()
+        return self._indeks
+
+    def sinkronkan_rekomendasi(self, batch_size: int = 5000) -> int:
+        """Masukkan ke indeks rekomendasi semua problem dengan id > id terbesar yang sudah terindeks.
+        Jika database ternyata lebih 'muda' dari indeks (mis. file DB diganti), indeks dibangun ulang."""
+        indeks = self._indeks if self._indeks is not None else self._indeks_rekomendasi()
+        # Partisi arsip yang seluruh id-nya di bawah id_maks indeks tidak perlu dibuka.
+        rows = arsip.baca("SELECT MAX(id) FROM {problems}", rentang_id=(indeks.id_maks, None))
+        id_maks_db = max((row[0] for row in rows if row[0] is not None), default=0)
+        if id_maks_db < indeks.id_maks:
+            print("[HardwareDiagnoser] Indeks rekomendasi tidak cocok dengan database, dibangun ulang...")
+            indeks.reset()
+        if id_maks_db == indeks.id_maks:
+            return 0
+        sql = "SELECT id, nama_problem, deskripsi_problem FROM {problems} WHERE id > ?"
+        rows = arsip.iter_baca(sql, (indeks.id_maks,), rentang_id=(indeks.id_maks + 1, None), urut=(("id", True),),
+                               batch_size=batch_size)
+        jumlah = 0
+        while True:
+            chunk = [tuple(r) for r in itertools.islice(rows, batch_size)]
+            if not chunk: break
+            indeks.tambah(chunk)
+            jumlah += len(chunk)
+        return jumlah
+
+    def rekomendasi_solusi(self, nama_problem: str, deskripsi_problem: str = "", k: int = 5,
+                           kecuali_id=()) -> pd.DataFrame:
+        """Top-k problem historis yang paling mirip (n-gram karakter + cosine) beserta penyebab & solusinya."""
+        import rekomendasi
+        kolom = ['ID', 'Masalah', 'Kategori', 'Penyebab', 'Solusi', 'Tanggal', 'Kemiripan']
+        teks = rekomendasi.teks_problem(nama_problem, deskripsi_problem)
+        if not teks.strip():
+            return pd.DataFrame(columns=kolom)
+        indeks = self._indeks_rekomendasi()
+        hasil = indeks.cari(teks, k=k, kecuali_id=kecuali_id)
+        if not hasil:
+            return pd.DataFrame(columns=kolom)
+
+        ids = [id_problem for id_problem, _ in hasil]
+        sql = f"""
+            SELECT id, nama_problem, kategori_problem, penyebab, solusi, tanggal_masuk
+            FROM {{problems}} WHERE id IN ({', '.join('?' * len(ids))})
+        """
+        rows = {row['id']: row for row in arsip.baca(sql, tuple(ids), rentang_id=(min(ids), max(ids)))}
+        hilang = [i for i in ids if i not in rows]
+        if hilang: indeks.hapus(hilang)   # sudah dihapus dari DB oleh proses lain
+        data = [(i, rows[i]['nama_problem'], rows[i]['kategori_problem'], rows[i]['penyebab'],
+                 rows[i]['solusi'], hari_ke_tanggal(rows[i]['tanggal_masuk']), round(skor, 4)) for i, skor in hasil if i in rows]
+        return pd.DataFrame(data, columns=kolom)
+
+    # --- Deteksi anomali (lonjakan tiket harian per kategori, lihat anomali.py) ---
+
+    @staticmethod
+    def _hari_maks_anomali(hari_ini: datetime.date | None = None) -> int:
+        """Hari terakhir yang boleh masuk detektor: hari ini (atau `hari_ini` jika lebih baru)."""
+        return tanggal_ke_hari(max(hari_ini or datetime.date.today(), datetime.date.today()))
+
+    def _detektor_anomali(self):
+        """Detektor dibuat sekali dari ANOMALI_HARI_PEMANASAN hari terakhir di rollup_harian (sampai hari ini;
+        tiket bertanggal di masa depan tidak ikut), lalu hanya diperbarui dari change log (sinkronkan_anomali),
+        tidak pernah dari seluruh riwayat."""
+        with self._anomali_lock:
+            if self._detektor is None:
+                import anomali
+                detektor = anomali.DetektorAnomali()
+                rows = []
+                hari_maks = self._hari_maks_anomali()
+                with database.snapshot():
+                    detektor.seq = self._seq_terakhir()
+                    row = database.fetch_query("SELECT MAX(tanggal) FROM rollup_harian WHERE tanggal <= ?",
+                                               (hari_maks,), fetch_all=False)
+                    hari_akhir = row[0] if row else None
+                    if hari_akhir is not None:
+                        rows = database.fetch_query("""
+                            SELECT r.tanggal, COALESCE(kategori.nama, ''), r.jumlah
+                            FROM (SELECT tanggal, kategori_id, SUM(jumlah) AS jumlah FROM rollup_harian
+                                  WHERE tanggal > ? AND tanggal <= ? GROUP BY tanggal, kategori_id) r
+                            LEFT JOIN kategori ON kategori.id = r.kategori_id
+                            ORDER BY r.tanggal
+                        """, (hari_akhir - ANOMALI_HARI_PEMANASAN, hari_akhir)) or []
+                if hari_akhir is not None:
+                    detektor.muat_awal((tuple(r) for r in rows), hari_akhir)
+                self._detektor = detektor
+            return self._detektor
+
+    def sinkronkan_anomali(self, hari_ini: datetime.date | None = None) -> int:
+        """Terapkan perubahan baru dari change log ke detektor anomali. `hari_ini` memajukan hari terbuka
+        (menutup hari-hari sebelumnya) meskipun belum ada tiket baru. Tiket bertanggal setelah hari ini (atau
+        `hari_ini` jika lebih baru) diabaikan. Return: jumlah perubahan diterapkan."""
+        with self._anomali_lock:
+            detektor = self._detektor_anomali()
+            hari_maks = self._hari_maks_anomali(hari_ini)
+            jumlah = 0
+            while True:
+                delta = self.changes_since(detektor.seq, batas=CACHE_BATAS_PATCH)
+                if not delta["lengkap"]:
+                    # Sebagian perubahan sudah dipangkas dari change log: bangun ulang dari rollup.
+                    self._detektor = None
+                    return self.sinkronkan_anomali(hari_ini)
+                for p in delta["perubahan"]:
+                    detektor.tambah(p['kategori_problem'] or '', tanggal_ke_hari(p['tanggal_masuk']),
+                                    1 if p['operasi'] == 'I' else -1, hari_maks)
+                jumlah += len(delta["perubahan"])
+                detektor.seq = delta["seq_terakhir"]
+                if not delta["ada_lagi"]: break
+            if hari_ini: detektor.majukan(tanggal_ke_hari(hari_ini))
+            return jumlah
+
+    _KOLOM_ANOMALI = {"tanggal": "Tanggal", "kategori": "Kategori", "jumlah": "Jumlah",
+                      "rata_bergulir": "Rata-rata Bergulir", "ewma": "EWMA", "baseline_musiman": "Baseline Musiman",
+                      "skor": "Skor Z", "berjalan": "Hari Berjalan", "anomali": "Anomali"}
+
+    def get_anomali(self, kategori: str | None = None, hari_ini: datetime.date | None = None,
+                    termasuk_berjalan: bool = True) -> pd.DataFrame:
+        """Hari dengan lonjakan tiket per kategori (terbaru dulu), termasuk hari berjalan jika sudah melewati ambang."""
+        self.sinkronkan_anomali(hari_ini)
+        if kategori == "Semua Kategori": kategori = None
+        data = self._detektor_anomali().anomali(kategori, termasuk_berjalan)
+        return pd.DataFrame(data, columns=list(self._KOLOM_ANOMALI)).rename(columns=self._KOLOM_ANOMALI)
+
+    def get_status_anomali(self, hari_ini: datetime.date | None = None) -> pd.DataFrame:
+        """Penilaian hari berjalan untuk setiap kategori (skor tertinggi dulu)."""
+        self.sinkronkan_anomali(hari_ini)
+        data = self._detektor_anomali().status_terkini()
+        return pd.DataFrame(data, columns=list(self._KOLOM_ANOMALI)).rename(columns=self._KOLOM_ANOMALI)
+
+    def rebuild_rollup(self) -> int:
+        """Bangun ulang tabel rollup_harian dari tabel problems_data dan semua partisi arsip."""
+        direktori = arsip.direktori_arsip()
+        return database.kirim_tulis(lambda conn: migrasi.rebuild_rollup(conn, False, direktori)).result()
+
+    def tambah_alias_problem(self, alias: str, nama_problem: str) -> int:
+        """Catat `alias` sebagai nama lain `nama_problem` di katalog; tiket lama yang bernama alias ikut dipindah
+        sehingga frekuensi & pencarian menghitungnya sebagai satu problem. Return: jumlah tiket dipindah."""
+        return database.kirim_tulis(lambda conn: migrasi.tambah_alias(conn, alias, nama_problem)).result()
+
+    # --- Change feed & patch incremental untuk hasil cache ---
+
+    def _seq_terakhir(self) -> int:
+        row = database.fetch_query("SELECT seq FROM sqlite_sequence WHERE name = 'problems_changelog'",
+                                   fetch_all=False)
+        return row[0] if row else 0
+
+    def changes_since(self, seq: int, batas: int | None = 10000) -> dict:
+        """Perubahan pada tabel problems dengan nomor urut > seq, urut naik.
+        'lengkap' False berarti sebagian perubahan sudah dipangkas dari change log (pemanggil harus
+        memuat ulang penuh); 'ada_lagi' True berarti hasil terpotong oleh `batas`."""
+        with database.snapshot():
+            seq_terakhir = self._seq_terakhir()
+            row = database.fetch_query("SELECT MIN(seq) FROM problems_changelog", fetch_all=False)
+            seq_min = row[0] if row else None
+            sql = """
+                SELECT c.seq, c.operasi, c.problem_id, c.tanggal_masuk, kategori.nama AS kategori_problem,
+                       katalog_problem.nama AS nama_problem
+                FROM problems_changelog c
+                LEFT JOIN kategori ON kategori.id = c.kategori_id
+                LEFT JOIN katalog_problem ON katalog_problem.id = c.katalog_id
+                WHERE c.seq > ? ORDER BY c.seq
+            """
+            params = (int(seq),)
+            if batas:
+                sql += " LIMIT ?"
+                params += (int(batas) + 1,)
+            rows = database.fetch_query(sql, params) or []
+        lengkap = seq >= (seq_min - 1) if seq_min is not None else seq >= seq_terakhir
+        ada_lagi = bool(batas) and len(rows) > batas
+        rows = rows[:batas] if batas else rows
+        perubahan = [dict(row) for row in rows]
+        for p in perubahan:
+            if p['tanggal_masuk'] is not None: p['tanggal_masuk'] = hari_ke_tanggal(p['tanggal_masuk'])
+        return {
+            "seq_awal": int(seq),
+            "seq_terakhir": rows[-1]['seq'] if ada_lagi else max(seq_terakhir, int(seq)),
+            "lengkap": lengkap,
+            "ada_lagi": ada_lagi,
+            "perubahan": perubahan,
+        }
+
+    def pangkas_changelog(self, simpan: int = CHANGELOG_SIMPAN) -> bool:
+        """Hapus entri change log lama, sisakan `simpan` entri terakhir."""
+        return database.execute_query("DELETE FROM problems_changelog WHERE seq <= ?",
+                                      (self._seq_terakhir() - int(simpan),))
+
+    @staticmethod
+    def _delta_perubahan(perubahan: list[dict], kunci, kategori: str | None = None,
+                         tanggal_mulai: datetime.date | None = None,
+                         tanggal_akhir: datetime.date | None = None) -> Counter:
+        delta = Counter()
+        semua_kategori = not kategori or kategori == "Semua Kategori"
+        for p in perubahan:
+            if not semua_kategori and p['kategori_problem'] != kategori: continue
+            if tanggal_mulai and p['tanggal_masuk'] < tanggal_mulai: continue
+            if tanggal_akhir and p['tanggal_masuk'] > tanggal_akhir: continue
+            delta[kunci(p)] += 1 if p['operasi'] == 'I' else -1
+        return delta
+
+    def _patch_dataframe_problems(self, df: pd.DataFrame, perubahan: list[dict],
+                                  filter_kategori: str | None = None,
+                                  tanggal_mulai: datetime.date | None = None,
+                                  tanggal_akhir: datetime.date | None = None) -> pd.DataFrame:
+        op_terakhir = {p['problem_id']: p['operasi'] for p in perubahan}
+        if not op_terakhir: return df
+        if not df.empty:
+            df = df[~df['ID'].isin(list(op_terakhir))]
+        ids_baru = [i for i, op in op_terakhir.items() if op == 'I']
+        potongan = [df]
+        for i in range(0, len(ids_baru), 500):
+            sql, params = self._sql_dataframe_problems(filter_kategori, tanggal_mulai, tanggal_akhir,
+                                                       ids=ids_baru[i:i + 500])
+            potongan.append(self._format_dataframe_problems(database.get_dataframe(sql, params=params)))
+        potongan = [p for p in potongan if not p.empty]
+        if not potongan:
+            return df.iloc[0:0]
+        df = pd.concat(potongan, ignore_index=True) if len(potongan) > 1 else potongan[0]
+        return df.sort_values(['Tanggal', 'ID'], ascending=False, kind='stable').reset_index(drop=True)
+
+    def _patch_hitung_problems(self, jumlah: int, perubahan: list[dict], filter_kategori: str | None = None,
+                               tanggal_mulai: datetime.date | None = None,
+                               tanggal_akhir: datetime.date | None = None) -> int:
+        delta = self._delta_perubahan(perubahan, lambda p: None, filter_kategori, tanggal_mulai, tanggal_akhir)
+        return jumlah + delta[None]
+
+    def _patch_frekuensi_problem(self, df: pd.DataFrame, perubahan: list[dict],
+                                 tanggal_mulai: datetime.date = None,
+                                 tanggal_akhir: datetime.date = None) -> pd.DataFrame:
+        delta = self._delta_perubahan(perubahan, lambda p: p['nama_problem'], None, tanggal_mulai, tanggal_akhir)
+        if not delta: return df
+        seri = df.set_index('Masalah')['Jumlah Kejadian'] if not df.empty else pd.Series(dtype='int64')
+        seri = seri.add(pd.Series(delta, dtype='int64'), fill_value=0)
+        seri = seri[seri > 0].astype('int64').sort_values(ascending=False, kind='stable')
+        seri.index.name = 'Masalah'
+        return seri.rename('Jumlah Kejadian').reset_index()
+
+    def _patch_jumlah_per_kategori(self, df: pd.DataFrame, perubahan: list[dict],
+                                   tanggal_mulai: datetime.date = None,
+                                   tanggal_akhir: datetime.date = None) -> pd.DataFrame:
+        # rollup_harian menyimpan kategori NULL sebagai ''.
+        delta = self._delta_perubahan(perubahan, lambda p: p['kategori_problem'] or '', None,
+                                      tanggal_mulai, tanggal_akhir)
+        if not delta: return df
+        seri = df.set_index('Kategori')['Jumlah Masalah'] if not df.empty else pd.Series(dtype='int64')
+        seri = seri.add(pd.Series(delta, dtype='int64'), fill_value=0)
+        seri = seri[seri > 0].astype('int64').sort_values(ascending=False, kind='stable')
+        seri.index.name = 'Kategori'
+        return seri.rename('Jumlah Masalah').reset_index()
+
+    def _patch_tren_problem_harian(self, df: pd.DataFrame, perubahan: list[dict],
+                                   kategori_problem: str = None) -> pd.DataFrame:
+        delta = self._delta_perubahan(perubahan, lambda p: p['tanggal_masuk'], kategori_problem)
+        if not delta: return df
+        tambahan = pd.Series(list(delta.values()), index=pd.to_datetime(list(delta.keys())), dtype='int64')
+        seri = df['Jumlah Masalah'] if not df.empty else pd.Series(dtype='int64')
+        seri = seri.add(tambahan, fill_value=0)
+        seri = seri[seri != 0]
+        if seri.empty:
+            df = pd.DataFrame(columns=['Jumlah Masalah'])
+            df.index.name = 'tanggal_masuk'
+            return df
+        seri = seri.reindex(pd.date_range(seri.index.min(), seri.index.max(), freq='D'), fill_value=0)
+        df = seri.astype('int64').to_frame('Jumlah Masalah')
+        df.index.name = 'tanggal_masuk'
+        return df
+
+    def _patch_tren_problem_bulanan(self, df: pd.DataFrame, perubahan: list[dict],
+                                    kategori_problem: str = None) -> pd.DataFrame:
+        delta = self._delta_perubahan(perubahan, lambda p: p['tanggal_masuk'].replace(day=1), kategori_problem)
+        if not delta: return df
+        tambahan = pd.Series(list(delta.values()), index=pd.to_datetime(list(delta.keys())), dtype='int64')
+        seri = df['Jumlah Masalah'] if not df.empty else pd.Series(dtype='int64')
+        seri = seri.add(tambahan, fill_value=0)
+        seri = seri[seri != 0].sort_index()
+        df = seri.astype('int64').to_frame('Jumlah Masalah')
+        df.index.name = 'bulan'
+        return df
+
+    def statistik_cache(self) -> dict:
+        return self._cache.statistik() if self._cache is not None else {}
+
+    def kosongkan_cache(self):
+        if self._cache is not None: self._cache.kosongkan()
+
+    def laporan_query_plan(self) -> dict[str, list[str]]:
+        """EXPLAIN QUERY PLAN untuk setiap query manajer (dengan kombinasi filter yang umum dipakai)."""
+        hari_ini = datetime.date.today()
+        awal = hari_ini - datetime.timedelta(days=30)
+        kategori = KATEGORI_PROBLEM[0]
+        queries = {
+            "get_semua_problems": arsip.sql_gabungan(self._SQL_SEMUA_PROBLEMS, urut=self._URUT_TERBARU)[:2],
+            "get_problem_by_id": arsip.sql_gabungan(self._SQL_PROBLEM_BY_ID, (1,))[:2],
+            "hapus_problem": ("DELETE FROM problems_data WHERE id = ?", (1,)),
+            "get_dataframe_problems()": self._sql_dataframe_problems(),
+            "get_dataframe_problems(kategori)": self._sql_dataframe_problems(kategori),
+            "get_dataframe_problems(tanggal)": self._sql_dataframe_problems(None, awal, hari_ini),
+            "get_dataframe_problems(kategori, tanggal)": self._sql_dataframe_problems(kategori, awal, hari_ini),
+            "get_halaman_problems(setelah)": self._sql_dataframe_problems(setelah=(hari_ini, 100), batas=50),
+            "get_halaman_problems(kategori, setelah)": self._sql_dataframe_problems(kategori, setelah=(hari_ini, 100),
+                                                                                   batas=50),
+            "get_frekuensi_problem()": self._sql_frekuensi_problem(),
+            "get_frekuensi_problem(tanggal)": self._sql_frekuensi_problem(awal, hari_ini),
+            "get_jumlah_per_kategori(tanggal)": self._sql_jumlah_per_kategori(awal, hari_ini),
+            "get_tren_problem_harian()": self._sql_tren_problem_harian(),
+            "get_tren_problem_harian(kategori)": self._sql_tren_problem_harian(kategori),
+            "get_tren_problem_bulanan()": self._sql_tren_problem_bulanan(),
+            "get_tren_problem_bulanan(kategori)": self._sql_tren_problem_bulanan(kategori),
+            "cari_problem(kategori)": arsip.sql_gabungan(*self._sql_cari_problem(self._query_fts("layar"), kategori),
+                                                         urut=(("skor", True),), batas=20)[:2],
+        }
+        laporan = {}
+        with database.get_pool().koneksi() as conn:
+            for nama, (sql, params) in queries.items():
+                laporan[nama] = migrasi.explain_query_plan(conn, sql, params)
+        return laporan
@@ -0,0 +1,667 @@
+# migrasi.py
+import os
+import sqlite3
+import urllib.parse
+from konfigurasi import KATEGORI_PROBLEM
+
+_INDEKS_PROBLEMS = [
+    "CREATE INDEX IF NOT EXISTS idx_problems_kategori_tanggal ON problems (kategori_problem, tanggal_masuk, id)",
+    "CREATE INDEX IF NOT EXISTS idx_problems_tanggal ON problems (tanggal_masuk, id)",
+    "CREATE INDEX IF NOT EXISTS idx_problems_nama ON problems (nama_problem)",
+]
+
+# Trigger pada tabel problems dipisah ke konstanta: migrasi 6 membangun ulang tabel dan harus memasangnya lagi.
+_TRIGGER_FTS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS problems_fts_ai AFTER INSERT ON problems BEGIN
+        INSERT INTO problems_fts (rowid, nama_problem, deskripsi_problem, penyebab, solusi)
+        VALUES (new.id, new.nama_problem, new.deskripsi_problem, new.penyebab, new.solusi);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS problems_fts_ad AFTER DELETE ON problems BEGIN
+        INSERT INTO problems_fts (problems_fts, rowid, nama_problem, deskripsi_problem, penyebab, solusi)
+        VALUES ('delete', old.id, old.nama_problem, old.deskripsi_problem, old.penyebab, old.solusi);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS problems_fts_au AFTER UPDATE ON problems BEGIN
+        INSERT INTO problems_fts (problems_fts, rowid, nama_problem, deskripsi_problem, penyebab, solusi)
+        VALUES ('delete', old.id, old.nama_problem, old.deskripsi_problem, old.penyebab, old.solusi);
+        INSERT INTO problems_fts (rowid, nama_problem, deskripsi_problem, penyebab, solusi)
+        VALUES (new.id, new.nama_problem, new.deskripsi_problem, new.penyebab, new.solusi);
+    END
+    """,
+]
+
+_TRIGGER_ROLLUP = [
+    """
+    CREATE TRIGGER IF NOT EXISTS rollup_harian_ai AFTER INSERT ON problems BEGIN
+        INSERT INTO rollup_harian (tanggal, kategori_problem, nama_problem, jumlah)
+        VALUES (new.tanggal_masuk, COALESCE(new.kategori_problem, ''), new.nama_problem, 1)
+        ON CONFLICT (tanggal, kategori_problem, nama_problem) DO UPDATE SET jumlah = jumlah + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS rollup_harian_ad AFTER DELETE ON problems BEGIN
+        UPDATE rollup_harian SET jumlah = jumlah - 1
+        WHERE tanggal = old.tanggal_masuk AND kategori_problem = COALESCE(old.kategori_problem, '')
+          AND nama_problem = old.nama_problem;
+        DELETE FROM rollup_harian
+        WHERE tanggal = old.tanggal_masuk AND kategori_problem = COALESCE(old.kategori_problem, '')
+          AND nama_problem = old.nama_problem AND jumlah <= 0;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS rollup_harian_au AFTER UPDATE OF tanggal_masuk, kategori_problem, nama_problem
+    ON problems BEGIN
+        UPDATE rollup_harian SET jumlah = jumlah - 1
+        WHERE tanggal = old.tanggal_masuk AND kategori_problem = COALESCE(old.kategori_problem, '')
+          AND nama_problem = old.nama_problem;
+        DELETE FROM rollup_harian
+        WHERE tanggal = old.tanggal_masuk AND kategori_problem = COALESCE(old.kategori_problem, '')
+          AND nama_problem = old.nama_problem AND jumlah <= 0;
+        INSERT INTO rollup_harian (tanggal, kategori_problem, nama_problem, jumlah)
+        VALUES (new.tanggal_masuk, COALESCE(new.kategori_problem, ''), new.nama_problem, 1)
+        ON CONFLICT (tanggal, kategori_problem, nama_problem) DO UPDATE SET jumlah = jumlah + 1;
+    END
+    """,
+]
+
+_TRIGGER_CHANGELOG = [
+    """
+    CREATE TRIGGER IF NOT EXISTS problems_changelog_ai AFTER INSERT ON problems BEGIN
+        INSERT INTO problems_changelog (operasi, problem_id, tanggal_masuk, kategori_problem, nama_problem)
+        VALUES ('I', new.id, new.tanggal_masuk, new.kategori_problem, new.nama_problem);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS problems_changelog_ad AFTER DELETE ON problems BEGIN
+        INSERT INTO problems_changelog (operasi, problem_id, tanggal_masuk, kategori_problem, nama_problem)
+        VALUES ('D', old.id, old.tanggal_masuk, old.kategori_problem, old.nama_problem);
+    END
+    """,
+    # UPDATE dicatat sebagai hapus versi lama + sisip versi baru.
+    """
+    CREATE TRIGGER IF NOT EXISTS problems_changelog_au AFTER UPDATE ON problems BEGIN
+        INSERT INTO problems_changelog (operasi, problem_id, tanggal_masuk, kategori_problem, nama_problem)
+        VALUES ('D', old.id, old.tanggal_masuk, old.kategori_problem, old.nama_problem);
+        INSERT INTO problems_changelog (operasi, problem_id, tanggal_masuk, kategori_problem, nama_problem)
+        VALUES ('I', new.id, new.tanggal_masuk, new.kategori_problem, new.nama_problem);
+    END
+    """,
+]
+
+# Nomor bulan = (tahun - 1970) * 12 + bulan - 1 (sama dengan numpy datetime64[M]), dihitung dari nomor hari.
+_SQL_BULAN = ("(CAST(strftime('%Y', tanggal * 86400, 'unixepoch') AS INTEGER) - 1970) * 12"
+              " + CAST(strftime('%m', tanggal * 86400, 'unixepoch') AS INTEGER) - 1")
+
+_INDEKS_ROLLUP = [
+    "CREATE INDEX IF NOT EXISTS idx_rollup_kategori ON rollup_harian (kategori_problem, tanggal, jumlah)",
+    "CREATE INDEX IF NOT EXISTS idx_rollup_nama ON rollup_harian (nama_problem, jumlah)",
+    "CREATE INDEX IF NOT EXISTS idx_rollup_bulan ON rollup_harian (bulan, jumlah)",
+    "CREATE INDEX IF NOT EXISTS idx_rollup_kategori_bulan ON rollup_harian (kategori_problem, bulan, jumlah)",
+]
+
+
+def _nomor_hari(kolom: str) -> str:
+    """Ekspresi SQL: teks 'YYYY-MM-DD' -> nomor hari sejak 1970-01-01 (nilai yang sudah INTEGER dibiarkan)."""
+    return (f"CASE WHEN typeof({kolom}) = 'integer' THEN {kolom}"
+            f" ELSE CAST(julianday({kolom}) - 2440587.5 AS INTEGER) END")
+
+
+def _pulihkan_sequence(conn: sqlite3.Connection, tabel: str, seq: int | None):
+    """Setelah tabel AUTOINCREMENT dibangun ulang, pastikan id/seq berikutnya tidak mengulang nilai lama."""
+    if seq is None: return
+    if conn.execute("UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = ?", (seq, tabel)).rowcount == 0:
+        conn.execute("INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)", (tabel, seq))
+
+
+def _tanggal_jadi_nomor_hari(conn: sqlite3.Connection):
+    """Bangun ulang problems, problems_changelog, dan rollup_harian dengan tanggal INTEGER. Filter rentang,
+    urutan, dan pengelompokan bulan jadi perbandingan integer di indeks; hidrasi tidak perlu parse string.
+    Indeks & trigger ikut terhapus bersama tabel lama dan dipasang lagi oleh langkah berikutnya."""
+    seq = dict(conn.execute("SELECT name, seq FROM sqlite_sequence").fetchall())
+    conn.execute("""
+        CREATE TABLE problems_baru (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nama_problem TEXT NOT NULL,
+            deskripsi_problem TEXT,
+            kategori_problem TEXT,
+            penyebab TEXT NOT NULL,
+            solusi TEXT NOT NULL,
+            -- Teks 'YYYY-MM-DD' dari penulis lama ditolak: campuran teks & integer merusak filter rentang.
+            tanggal_masuk INTEGER NOT NULL CHECK (typeof(tanggal_masuk) = 'integer')
+        )
+    """)
+    conn.execute(f"""
+        INSERT INTO problems_baru (id, nama_problem, deskripsi_problem, kategori_problem, penyebab, solusi, tanggal_masuk)
+        SELECT id, nama_problem, deskripsi_problem, kategori_problem, penyebab, solusi, {_nomor_hari('tanggal_masuk')}
+        FROM problems ORDER BY id
+    """)
+    conn.execute("DROP TABLE problems")
+    conn.execute("ALTER TABLE problems_baru RENAME TO problems")
+    _pulihkan_sequence(conn, "problems", seq.get("problems"))
+
+    conn.execute("""
+        CREATE TABLE problems_changelog_baru (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            operasi TEXT NOT NULL CHECK (operasi IN ('I', 'D')),
+            problem_id INTEGER NOT NULL,
+            tanggal_masuk INTEGER,
+            kategori_problem TEXT,
+            nama_problem TEXT
+        )
+    """)
+    conn.execute(f"""
+        INSERT INTO problems_changelog_baru (seq, operasi, problem_id, tanggal_masuk, kategori_problem, nama_problem)
+        SELECT seq, operasi, problem_id, {_nomor_hari('tanggal_masuk')}, kategori_problem, nama_problem
+        FROM problems_changelog ORDER BY seq
+    """)
+    conn.execute("DROP TABLE problems_changelog")
+    conn.execute("ALTER TABLE problems_changelog_baru RENAME TO problems_changelog")
+    _pulihkan_sequence(conn, "problems_changelog", seq.get("problems_changelog"))
+
+    # Isi rollup dihitung ulang dari problems (rebuild_rollup) setelah trigger terpasang.
+    conn.execute("DROP TABLE rollup_harian")
+    conn.execute(f"""
+        CREATE TABLE rollup_harian (
+            tanggal INTEGER NOT NULL,
+            kategori_problem TEXT NOT NULL,
+            nama_problem TEXT NOT NULL,
+            jumlah INTEGER NOT NULL,
+            bulan INTEGER GENERATED ALWAYS AS ({_SQL_BULAN}) VIRTUAL,
+            PRIMARY KEY (tanggal, kategori_problem, nama_problem)
+        ) WITHOUT ROWID
+    """)
+
+
+def _spasi_tunggal(x: str) -> str:
+    """Ekspresi SQL: tab/baris baru jadi spasi, deret spasi (s/d 32) dirapatkan jadi satu, lalu di-trim."""
+    x = f"replace(replace(replace({x}, char(9), ' '), char(10), ' '), char(13), ' ')"
+    for _ in range(5):
+        x = f"replace({x}, '  ', ' ')"
+    return f"trim({x})"
+
+
+def _kunci_problem(x: str) -> str:
+    """Ekspresi SQL kunci kanonik nama problem: spasi dirapatkan + huruf kecil ('WiFi  Hilang ' = 'wifi hilang').
+    Sengaja murni SQL (lower() SQLite hanya melipat ASCII), supaya penulis lain tanpa fungsi Python pun sama."""
+    return f"lower({_spasi_tunggal(x)})"
+
+
+def _id_katalog(x: str) -> str:
+    """Ekspresi SQL: nama problem -> id katalog (alias didahulukan, lalu kunci kanonik)."""
+    kunci = _kunci_problem(x)
+    return (f"COALESCE((SELECT katalog_id FROM alias_problem WHERE kunci = {kunci}),"
+            f" (SELECT id FROM katalog_problem WHERE kunci = {kunci}))")
+
+
+def _sql_daftarkan_nama(x: str) -> str:
+    """Statement SQL: masukkan nama ke katalog jika kuncinya belum dikenal (baik sebagai entri maupun alias)."""
+    kunci = _kunci_problem(x)
+    return (f"INSERT OR IGNORE INTO katalog_problem (kunci, nama) SELECT {kunci}, {_spasi_tunggal(x)}"
+            f" WHERE NOT EXISTS (SELECT 1 FROM alias_problem WHERE kunci = {kunci})")
+
+
+# Skema v7: problems_data menyimpan id kategori & id katalog; `problems` menjadi view dengan kolom lama, jadi
+# query baca tetap sama dan INSERT/UPDATE/DELETE ke `problems` diteruskan trigger INSTEAD OF.
+_VIEW_PROBLEMS = """
+    CREATE VIEW IF NOT EXISTS problems AS
+    SELECT problems_data.id, katalog_problem.nama AS nama_problem, problems_data.deskripsi_problem,
+           kategori.nama AS kategori_problem, problems_data.penyebab, problems_data.solusi,
+           problems_data.tanggal_masuk
+    FROM problems_data
+    LEFT JOIN katalog_problem ON katalog_problem.id = problems_data.katalog_id
+    LEFT JOIN kategori ON kategori.id = problems_data.kategori_id
+"""
+
+_TRIGGER_VIEW_PROBLEMS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS problems_ii INSTEAD OF INSERT ON problems BEGIN
+        INSERT OR IGNORE INTO kategori (nama) VALUES (new.kategori_problem);
+        {_sql_daftarkan_nama("new.nama_problem")};
+        INSERT INTO problems_data (id, katalog_id, deskripsi_problem, kategori_id, penyebab, solusi, tanggal_masuk)
+        VALUES (new.id, {_id_katalog("new.nama_problem")}, new.deskripsi_problem,
+                (SELECT id FROM kategori WHERE nama = new.kategori_problem), new.penyebab, new.solusi,
+                new.tanggal_masuk);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS problems_iu INSTEAD OF UPDATE ON problems BEGIN
+        INSERT OR IGNORE INTO kategori (nama) VALUES (new.kategori_problem);
+        {_sql_daftarkan_nama("new.nama_problem")};
+        UPDATE problems_data
+        SET katalog_id = {_id_katalog("new.nama_problem")}, deskripsi_problem = new.deskripsi_problem,
+            kategori_id = (SELECT id FROM kategori WHERE nama = new.kategori_problem), penyebab = new.penyebab,
+            solusi = new.solusi, tanggal_masuk = new.tanggal_masuk
+        WHERE id = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS problems_id INSTEAD OF DELETE ON problems BEGIN
+        DELETE FROM problems_data WHERE id = old.id;
+    END
+    """,
+]
+
+_INDEKS_PROBLEMS_DATA = [
+    "CREATE INDEX IF NOT EXISTS idx_problems_data_kategori_tanggal ON problems_data (kategori_id, tanggal_masuk, id)",
+    "CREATE INDEX IF NOT EXISTS idx_problems_data_tanggal ON problems_data (tanggal_masuk, id)",
+    "CREATE INDEX IF NOT EXISTS idx_problems_data_katalog ON problems_data (katalog_id)",
+]
+
+# Nama di FTS diambil dari katalog. Nama katalog tidak pernah diubah (alias hanya memindah tiket ke entri lain),
+# jadi nilai 'delete' selalu sama dengan yang dulu diindeks.
+_NAMA_KATALOG = "(SELECT nama FROM katalog_problem WHERE id = {}.katalog_id)"
+
+_TRIGGER_FTS_DATA = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS problems_data_fts_ai AFTER INSERT ON problems_data BEGIN
+        INSERT INTO problems_fts (rowid, nama_problem, deskripsi_problem, penyebab, solusi)
+        VALUES (new.id, {_NAMA_KATALOG.format("new")}, new.deskripsi_problem, new.penyebab, new.solusi);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS problems_data_fts_ad AFTER DELETE ON problems_data BEGIN
+        INSERT INTO problems_fts (problems_fts, rowid, nama_problem, deskripsi_problem, penyebab, solusi)
+        VALUES ('delete', old.id, {_NAMA_KATALOG.format("old")}, old.deskripsi_problem, old.penyebab, old.solusi);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS problems_data_fts_au AFTER UPDATE ON problems_data BEGIN
+        INSERT INTO problems_fts (problems_fts, rowid, nama_problem, deskripsi_problem, penyebab, solusi)
+        VALUES ('delete', old.id, {_NAMA_KATALOG.format("old")}, old.deskripsi_problem, old.penyebab, old.solusi);
+        INSERT INTO problems_fts (rowid, nama_problem, deskripsi_problem, penyebab, solusi)
+        VALUES (new.id, {_NAMA_KATALOG.format("new")}, new.deskripsi_problem, new.penyebab, new.solusi);
+    END
+    """,
+]
+
+# Rollup per (hari, id kategori, id katalog); kategori NULL disimpan sebagai 0.
+_TRIGGER_ROLLUP_DATA = [
+    """
+    CREATE TRIGGER IF NOT EXISTS problems_data_rollup_ai AFTER INSERT ON problems_data BEGIN
+        INSERT INTO rollup_harian (tanggal, kategori_id, katalog_id, jumlah)
+        VALUES (new.tanggal_masuk, COALESCE(new.kategori_id, 0), new.katalog_id, 1)
+        ON CONFLICT (tanggal, kategori_id, katalog_id) DO UPDATE SET jumlah = jumlah + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS problems_data_rollup_ad AFTER DELETE ON problems_data BEGIN
+        UPDATE rollup_harian SET jumlah = jumlah - 1
+        WHERE tanggal = old.tanggal_masuk AND kategori_id = COALESCE(old.kategori_id, 0)
+          AND katalog_id = old.katalog_id;
+        DELETE FROM rollup_harian
+        WHERE tanggal = old.tanggal_masuk AND kategori_id = COALESCE(old.kategori_id, 0)
+          AND katalog_id = old.katalog_id AND jumlah <= 0;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS problems_data_rollup_au AFTER UPDATE OF tanggal_masuk, kategori_id, katalog_id
+    ON problems_data BEGIN
+        UPDATE rollup_harian SET jumlah = jumlah - 1
+        WHERE tanggal = old.tanggal_masuk AND kategori_id = COALESCE(old.kategori_id, 0)
+          AND katalog_id = old.katalog_id;
+        DELETE FROM rollup_harian
+        WHERE tanggal = old.tanggal_masuk AND kategori_id = COALESCE(old.kategori_id, 0)
+          AND katalog_id = old.katalog_id AND jumlah <= 0;
+        INSERT INTO rollup_harian (tanggal, kategori_id, katalog_id, jumlah)
+        VALUES (new.tanggal_masuk, COALESCE(new.kategori_id, 0), new.katalog_id, 1)
+        ON CONFLICT (tanggal, kategori_id, katalog_id) DO UPDATE SET jumlah = jumlah + 1;
+    END
+    """,
+]
+
+_TRIGGER_CHANGELOG_DATA = [
+    """
+    CREATE TRIGGER IF NOT EXISTS problems_data_changelog_ai AFTER INSERT ON problems_data BEGIN
+        INSERT INTO problems_changelog (operasi, problem_id, tanggal_masuk, kategori_id, katalog_id)
+        VALUES ('I', new.id, new.tanggal_masuk, new.kategori_id, new.katalog_id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS problems_data_changelog_ad AFTER DELETE ON problems_data BEGIN
+        INSERT INTO problems_changelog (operasi, problem_id, tanggal_masuk, kategori_id, katalog_id)
+        VALUES ('D', old.id, old.tanggal_masuk, old.kategori_id, old.katalog_id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS problems_data_changelog_au AFTER UPDATE ON problems_data BEGIN
+        INSERT INTO problems_changelog (operasi, problem_id, tanggal_masuk, kategori_id, katalog_id)
+        VALUES ('D', old.id, old.tanggal_masuk, old.kategori_id, old.katalog_id);
+        INSERT INTO problems_changelog (operasi, problem_id, tanggal_masuk, kategori_id, katalog_id)
+        VALUES ('I', new.id, new.tanggal_masuk, new.kategori_id, new.katalog_id);
+    END
+    """,
+]
+
+_INDEKS_ROLLUP_ID = [
+    "CREATE INDEX IF NOT EXISTS idx_rollup_kategori ON rollup_harian (kategori_id, tanggal, jumlah)",
+    "CREATE INDEX IF NOT EXISTS idx_rollup_katalog ON rollup_harian (katalog_id, jumlah)",
+    "CREATE INDEX IF NOT EXISTS idx_rollup_bulan ON rollup_harian (bulan, jumlah)",
+    "CREATE INDEX IF NOT EXISTS idx_rollup_kategori_bulan ON rollup_harian (kategori_id, bulan, jumlah)",
+]
+
+
+def _normalisasi_katalog(conn: sqlite3.Connection):
+    """Pecah nama problem & kategori ke tabel katalog berkunci integer, lalu bangun ulang problems (menjadi
+    problems_data + view), problems_changelog, dan rollup_harian. Varian nama yang hanya beda huruf besar/kecil
+    atau spasi digabung ke satu entri katalog; nama tampilannya = varian yang paling sering dipakai."""
+    seq = dict(conn.execute("SELECT name, seq FROM sqlite_sequence").fetchall())
+    conn.execute("CREATE TABLE kategori (id INTEGER PRIMARY KEY, nama TEXT NOT NULL UNIQUE)")
+    conn.executemany("INSERT OR IGNORE INTO kategori (nama) VALUES (?)", [(k,) for k in KATEGORI_PROBLEM])
+    conn.execute("""
+        INSERT OR IGNORE INTO kategori (nama)
+        SELECT kategori_problem FROM problems UNION SELECT kategori_problem FROM problems_changelog
+    """)
+    conn.execute("""
+        CREATE TABLE katalog_problem (
+            id INTEGER PRIMARY KEY,
+            kunci TEXT NOT NULL UNIQUE,     -- nama kanonik (lihat _kunci_problem)
+            nama TEXT NOT NULL              -- nama tampilan
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE alias_problem (
+            kunci TEXT PRIMARY KEY,
+            katalog_id INTEGER NOT NULL REFERENCES katalog_problem (id)
+        ) WITHOUT ROWID
+    """)
+
+    # Peta nama mentah -> id katalog, dihitung sekali per nama unik (bukan per baris).
+    conn.execute(f"""
+        CREATE TEMP TABLE peta_nama AS
+        SELECT nama, SUM(n) AS n, {_kunci_problem("nama")} AS kunci, NULL AS katalog_id
+        FROM (SELECT nama_problem AS nama, COUNT(*) AS n FROM problems GROUP BY nama_problem
+              UNION ALL
+              SELECT nama_problem, 0 FROM problems_changelog WHERE nama_problem IS NOT NULL GROUP BY nama_problem)
+        GROUP BY nama
+    """)
+    conn.execute(f"""
+        INSERT INTO katalog_problem (kunci, nama)
+        SELECT kunci, nama FROM (
+            SELECT kunci, {_spasi_tunggal("nama")} AS nama,
+                   ROW_NUMBER() OVER (PARTITION BY kunci ORDER BY n DESC, nama) AS urutan
+            FROM peta_nama
+        ) WHERE urutan = 1 ORDER BY kunci
+    """)
+    conn.execute("UPDATE peta_nama SET katalog_id = (SELECT id FROM katalog_problem WHERE kunci = peta_nama.kunci)")
+    conn.execute("CREATE UNIQUE INDEX temp.idx_peta_nama ON peta_nama (nama)")
+
+    conn.execute("""
+        CREATE TABLE problems_data (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            katalog_id INTEGER NOT NULL REFERENCES katalog_problem (id),
+            deskripsi_problem TEXT,
+            kategori_id INTEGER REFERENCES kategori (id),
+            penyebab TEXT NOT NULL,
+            solusi TEXT NOT NULL,
+            tanggal_masuk INTEGER NOT NULL CHECK (typeof(tanggal_masuk) = 'integer')
+        )
+    """)
+    conn.execute("""
+        INSERT INTO problems_data (id, katalog_id, deskripsi_problem, kategori_id, penyebab, solusi, tanggal_masuk)
+        SELECT p.id, peta_nama.katalog_id, p.deskripsi_problem, kategori.id, p.penyebab, p.solusi, p.tanggal_masuk
+        FROM problems p
+        JOIN peta_nama ON peta_nama.nama = p.nama_problem
+        LEFT JOIN kategori ON kategori.nama = p.kategori_problem
+        ORDER BY p.id
+    """)
+    # Hapus tabel lama (beserta indeks & triggernya); isi FTS tidak perlu dibangun ulang karena tokenizer
+    # sudah melipat huruf besar/kecil dan spasi, jadi nama kanonik menghasilkan token yang sama.
+    conn.execute("DROP TABLE problems")
+    _pulihkan_sequence(conn, "problems_data", seq.get("problems"))
+
+    conn.execute("""
+        CREATE TABLE problems_changelog_baru (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            operasi TEXT NOT NULL CHECK (operasi IN ('I', 'D')),
+            problem_id INTEGER NOT NULL,
+            tanggal_masuk INTEGER,
+            kategori_id INTEGER,
+            katalog_id INTEGER
+        )
+    """)
+    conn.execute("""
+        INSERT INTO problems_changelog_baru (seq, operasi, problem_id, tanggal_masuk, kategori_id, katalog_id)
+        SELECT c.seq, c.operasi, c.problem_id, c.tanggal_masuk, kategori.id, peta_nama.katalog_id
+        FROM problems_changelog c
+        LEFT JOIN peta_nama ON peta_nama.nama = c.nama_problem
+        LEFT JOIN kategori ON kategori.nama = c.kategori_problem
+        ORDER BY c.seq
+    """)
+    conn.execute("DROP TABLE problems_changelog")
+    conn.execute("ALTER TABLE problems_changelog_baru RENAME TO problems_changelog")
+    _pulihkan_sequence(conn, "problems_changelog", seq.get("problems_changelog"))
+    conn.execute("DROP TABLE temp.peta_nama")
+
+    conn.execute("DROP TABLE rollup_harian")
+    conn.execute(f"""
+        CREATE TABLE rollup_harian (
+            tanggal INTEGER NOT NULL,
+            kategori_id INTEGER NOT NULL,
+            katalog_id INTEGER NOT NULL,
+            jumlah INTEGER NOT NULL,
+            bulan INTEGER GENERATED ALWAYS AS ({_SQL_BULAN}) VIRTUAL,
+            PRIMARY KEY (tanggal, kategori_id, katalog_id)
+        ) WITHOUT ROWID
+    """)
+
+# Daftar migrasi skema, urut berdasarkan versi. Versi yang sudah diterapkan disimpan di PRAGMA user_version.
+# Setiap langkah berupa string SQL atau fungsi(conn); semuanya harus idempoten (IF NOT EXISTS, dst).
+MIGRASI = [
+    (1, "Tabel problems", [
+        """
+        CREATE TABLE IF NOT EXISTS problems (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nama_problem TEXT NOT NULL,
+            deskripsi_problem TEXT,
+            kategori_problem TEXT,
+            penyebab TEXT NOT NULL,
+            solusi TEXT NOT NULL,
+            tanggal_masuk DATE NOT NULL
+        )
+        """,
+    ]),
+    (2, "Indeks untuk filter, urutan daftar, dan tren", [*_INDEKS_PROBLEMS, "ANALYZE"]),
+    (3, "Indeks full-text (FTS5) untuk pencarian gejala/solusi", [
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS problems_fts USING fts5(
+            nama_problem, deskripsi_problem, penyebab, solusi,
+            content='problems', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+        )
+        """,
+        *_TRIGGER_FTS,
+        # Bobot BM25 per kolom: nama paling penting, lalu penyebab/solusi, lalu deskripsi.
+        "INSERT INTO problems_fts (problems_fts, rank) VALUES ('rank', 'bm25(10.0, 2.0, 4.0, 4.0)')",
+        "INSERT INTO problems_fts (problems_fts) VALUES ('rebuild')",
+    ]),
+    (4, "Tabel rollup harian untuk frekuensi & tren", [
+        """
+        CREATE TABLE IF NOT EXISTS rollup_harian (
+            tanggal DATE NOT NULL,
+            kategori_problem TEXT NOT NULL,
+            nama_problem TEXT NOT NULL,
+            jumlah INTEGER NOT NULL,
+            PRIMARY KEY (tanggal, kategori_problem, nama_problem)
+        ) WITHOUT ROWID
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_rollup_kategori ON rollup_harian (kategori_problem, tanggal, jumlah)",
+        "CREATE INDEX IF NOT EXISTS idx_rollup_nama ON rollup_harian (nama_problem, jumlah)",
+        *_TRIGGER_ROLLUP,
+        lambda conn: _rebuild_rollup_teks(conn),
+    ]),
+    (5, "Change log problems (feed perubahan berurutan untuk refresh incremental)", [
+        """
+        CREATE TABLE IF NOT EXISTS problems_changelog (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            operasi TEXT NOT NULL CHECK (operasi IN ('I', 'D')),
+            problem_id INTEGER NOT NULL,
+            tanggal_masuk DATE,
+            kategori_problem TEXT,
+            nama_problem TEXT
+        )
+        """,
+        *_TRIGGER_CHANGELOG,
+    ]),
+    (6, "Tanggal sebagai nomor hari (INTEGER) + kolom bulan di rollup", [
+        lambda conn: _tanggal_jadi_nomor_hari(conn),
+        *_INDEKS_PROBLEMS,
+        *_INDEKS_ROLLUP,
+        *_TRIGGER_FTS,
+        *_TRIGGER_ROLLUP,
+        *_TRIGGER_CHANGELOG,
+        lambda conn: _rebuild_rollup_teks(conn),
+        # Bukan ANALYZE global: statistik tabel bayangan FTS5 yang masih kosong membuat query internal FTS5
+        # memilih plan buruk, dan tiap INSERT (lewat trigger) makin lambat seiring indeks tumbuh.
+        "ANALYZE problems",
+        "ANALYZE rollup_harian",
+    ]),
+    (7, "Katalog nama problem & tabel kategori berkunci integer; problems menjadi view kompatibel", [
+        lambda conn: _normalisasi_katalog(conn),
+        _VIEW_PROBLEMS,
+        *_TRIGGER_VIEW_PROBLEMS,
+        *_INDEKS_PROBLEMS_DATA,
+        *_INDEKS_ROLLUP_ID,
+        *_TRIGGER_FTS_DATA,
+        *_TRIGGER_ROLLUP_DATA,
+        *_TRIGGER_CHANGELOG_DATA,
+        lambda conn: rebuild_rollup(conn, commit=False),
+        "ANALYZE problems_data",
+        "ANALYZE rollup_harian",
+        "ANALYZE kategori",
+        "ANALYZE katalog_problem",
+    ]),
+    (8, "Registry partisi arsip per tahun (lihat arsip.py)", [
+        """
+        CREATE TABLE IF NOT EXISTS arsip_partisi (
+            tahun INTEGER PRIMARY KEY,
+            versi INTEGER NOT NULL,
+            berkas TEXT NOT NULL,           -- nama file di direktori arsip
+            hari_awal INTEGER NOT NULL,     -- rentang tanggal_masuk partisi (nomor hari), untuk pruning
+            hari_akhir INTEGER NOT NULL,
+            id_min INTEGER,
+            id_max INTEGER,
+            jumlah INTEGER NOT NULL
+        )
+        """,
+    ]),
+]
+
+VERSI_TERBARU = MIGRASI[-1][0]
+
+
+def versi_skema(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def jalankan_migrasi(conn: sqlite3.Connection, sampai_versi: int | None = None) -> int:
+    """Terapkan semua migrasi yang belum ada, masing-masing dalam satu transaksi. Return: versi akhir."""
+    target = VERSI_TERBARU if sampai_versi is None else sampai_versi
+    for versi, keterangan, langkah in MIGRASI:
+        if versi > target: break
+        if versi_skema(conn) >= versi: continue
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Cek ulang di dalam lock tulis: proses lain mungkin baru saja menerapkan migrasi yang sama.
+            if versi_skema(conn) >= versi:
+                conn.rollback()
+                continue
+            for item in langkah:
+                item(conn) if callable(item) else conn.execute(item)
+            conn.execute(f"PRAGMA user_version = {int(versi)}")
+            conn.commit()
+            print(f" -> Migrasi {versi} diterapkan: {keterangan}")
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+    return versi_skema(conn)
+
+
+def _rebuild_rollup_teks(conn: sqlite3.Connection):
+    """rebuild_rollup untuk skema sebelum v7 (rollup berkunci teks), dipakai migrasi 4 & 6."""
+    conn.execute("DELETE FROM rollup_harian")
+    conn.execute("""
+        INSERT INTO rollup_harian (tanggal, kategori_problem, nama_problem, jumlah)
+        SELECT tanggal_masuk, COALESCE(kategori_problem, ''), nama_problem, COUNT(*)
+        FROM problems
+        GROUP BY tanggal_masuk, COALESCE(kategori_problem, ''), nama_problem
+    """)
+
+
+def rebuild_rollup(conn: sqlite3.Connection, commit: bool = True, direktori_arsip: str | None = None) -> int:
+    """Hitung ulang rollup_harian dari tabel problems_data (mis. setelah impor manual tanpa trigger) ditambah isi
+    setiap partisi di arsip_partisi (file di `direktori_arsip`, lihat arsip.py). Return: jumlah baris rollup."""
+    partisi = _berkas_partisi(conn)
+    if partisi and direktori_arsip is None:
+        raise RuntimeError("Database punya partisi arsip: direktori_arsip wajib diisi agar rollup tetap mencakup arsip.")
+    conn.execute("DELETE FROM rollup_harian")
+    conn.execute("""
+        INSERT INTO rollup_harian (tanggal, kategori_id, katalog_id, jumlah)
+        SELECT tanggal_masuk, COALESCE(kategori_id, 0), katalog_id, COUNT(*)
+        FROM problems_data
+        GROUP BY tanggal_masuk, COALESCE(kategori_id, 0), katalog_id
+    """)
+    for berkas in partisi:
+        _tambah_rollup_arsip(conn, os.path.join(direktori_arsip, berkas))
+    if commit: conn.commit()
+    return conn.execute("SELECT COUNT(*) FROM rollup_harian").fetchone()[0]
+
+
+def _berkas_partisi(conn: sqlite3.Connection) -> list[str]:
+    if not conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'arsip_partisi'").fetchone():
+        return []       # skema sebelum migrasi 8
+    return [row[0] for row in conn.execute("SELECT berkas FROM arsip_partisi ORDER BY tahun")]
+
+
+def _tambah_rollup_arsip(conn: sqlite3.Connection, path: str):
+    """Tambahkan hitungan tiket satu file arsip ke rollup_harian, seperti arsip._pindahkan saat menggulung.
+    File dibaca lewat koneksi read-only sendiri: ATTACH tidak bisa di dalam transaksi penulis yang sedang terbuka.
+    File arsip menyimpan nama & kategori sebagai teks; id katalog dicari lewat kunci kanonik entri aslinya."""
+    sumber = sqlite3.connect(f"file:{urllib.parse.quote(os.path.abspath(path))}?mode=ro", uri=True)
+    try:
+        rows = sumber.execute("""
+            SELECT tanggal_masuk, kategori_problem, nama_problem, COUNT(*)
+            FROM problems GROUP BY tanggal_masuk, kategori_problem, nama_problem
+        """).fetchall()
+    finally:
+        sumber.close()
+    conn.executemany(_sql_daftarkan_nama("?"), ((nama,) * 3 for nama in {row[2] for row in rows}))
+    conn.executemany(f"""
+        INSERT INTO rollup_harian (tanggal, kategori_id, katalog_id, jumlah)
+        SELECT ?1, COALESCE((SELECT id FROM kategori WHERE nama = ?2), 0),
+               COALESCE((SELECT id FROM katalog_problem WHERE kunci = {_kunci_problem("?3")}), {_id_katalog("?3")}), ?4
+        WHERE true
+        ON CONFLICT (tanggal, kategori_id, katalog_id) DO UPDATE SET jumlah = jumlah + excluded.jumlah
+    """, rows)
+
+
+def tambah_alias(conn: sqlite3.Connection, alias: str, nama_problem: str) -> int:
+    """Petakan nama `alias` ke entri katalog `nama_problem` (dibuat jika belum ada). Tiket yang sudah memakai
+    entri alias dipindah ke entri tujuan lewat UPDATE, jadi FTS, rollup, dan change log ikut diperbarui.
+    Entri lama tetap ada (change log lama masih merujuknya) tetapi tidak dipakai lagi. Tiket yang sudah diarsipkan
+    (arsip.py) tetap memakai nama lamanya. Return: jumlah tiket dipindah."""
+    conn.execute(_sql_daftarkan_nama("?"), (nama_problem,) * 3)
+    id_tujuan = conn.execute(f"SELECT {_id_katalog('?')}", (nama_problem,) * 2).fetchone()[0]
+    kunci = conn.execute(f"SELECT {_kunci_problem('?')}", (alias,)).fetchone()[0]
+    if not kunci:
+        raise ValueError("Alias tidak boleh kosong")
+    id_lama = conn.execute(f"SELECT {_id_katalog('?')}", (alias,) * 2).fetchone()[0]
+    conn.execute("""
+        INSERT INTO alias_problem (kunci, katalog_id) VALUES (?, ?)
+        ON CONFLICT (kunci) DO UPDATE SET katalog_id = excluded.katalog_id
+    """, (kunci, id_tujuan))
+    if id_lama is None or id_lama == id_tujuan:
+        return 0
+    conn.execute("UPDATE alias_problem SET katalog_id = ? WHERE katalog_id = ?", (id_tujuan, id_lama))
+    return conn.execute("UPDATE problems_data SET katalog_id = ? WHERE katalog_id = ?", (id_tujuan, id_lama)).rowcount
+
+
+def explain_query_plan(conn: sqlite3.Connection, sql: str, params: tuple | None = None) -> list[str]:
+    return [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params or ())]
+
+
+def scan_penuh(plan: list[str], tabel: str = "problems_data") -> bool:
+    """True jika plan berisi scan tabel `tabel` tanpa indeks (baris 'SCAN <tabel>' tanpa 'INDEX')."""
+    return any(baris.split(" ")[:2] == ["SCAN", tabel] and "INDEX" not in baris for baris in plan)
@@ -1,7 +1,44 @@
 # model.py
 import datetime
+import sys
+from array import array
+from functools import lru_cache
+
+# Tanggal di DB disimpan sebagai nomor hari sejak 1970-01-01 (INTEGER, sama dengan numpy datetime64[D]).
+_ORDINAL_EPOCH = datetime.date(1970, 1, 1).toordinal()
+# Urutan kolom baris DB yang dipakai Problem.from_row / ProblemBatch.tambah_row.
+KOLOM_ROW = ("id", "nama_problem", "deskripsi_problem", "kategori_problem", "penyebab", "solusi", "tanggal_masuk")
+
+
+@lru_cache(maxsize=8192)
+def parse_tanggal(teks: str | bytes) -> datetime.date:
+    """Parse 'YYYY-MM-DD' dengan cache: tanggal yang sama dipakai ulang (objek date dibagi antar baris)."""
+    if isinstance(teks, bytes): teks = teks.decode()
+    try:
+        return datetime.date.fromisoformat(teks)
+    except ValueError:
+        return datetime.datetime.strptime(teks, "%Y-%m-%d").date()
+
+
+def tanggal_ke_hari(tanggal: datetime.date) -> int:
+    return tanggal.toordinal() - _ORDINAL_EPOCH
+
+
+@lru_cache(maxsize=8192)
+def hari_ke_tanggal(hari: int) -> datetime.date:
+    """Nomor hari -> date, dengan cache (objek date yang sama dipakai ulang antar baris)."""
+    return datetime.date.fromordinal(hari + _ORDINAL_EPOCH)
+
+
+def ke_tanggal(nilai) -> datetime.date:
+    """Nilai tanggal dari DB/luar (nomor hari, date, atau 'YYYY-MM-DD') -> date."""
+    if isinstance(nilai, int): return hari_ke_tanggal(nilai)
+    return nilai if isinstance(nilai, datetime.date) else parse_tanggal(nilai)
+
 
 class Problem:
+    __slots__ = ("id", "nama_problem", "deskripsi_problem", "penyebab", "solusi", "kategori_problem", "tanggal_masuk")
+
     def __init__(self, nama_problem: str, penyebab: str, solusi: str,
                  deskripsi_problem: str = "", kategori_problem: str = "Lainnya",
                  tanggal_masuk: datetime.date | str = None, id_problem: int | None = None):
@@ -14,10 +51,20 @@ class Problem:
 
         if isinstance(tanggal_masuk, datetime.date): self.tanggal_masuk = tanggal_masuk
         elif isinstance(tanggal_masuk, str):
-            try: self.tanggal_masuk = datetime.datetime.strptime(tanggal_masuk, "%Y-%m-%d").date()
+            try: self.tanggal_masuk = parse_tanggal(tanggal_masuk)
             except ValueError: self.tanggal_masuk = datetime.date.today(); print(f"Peringatan: Format tanggal '{tanggal_masuk}' salah. Menggunakan tanggal hari ini.")
         else: self.tanggal_masuk = datetime.date.today(); print(f"Peringatan: Tipe tanggal '{type(tanggal_masuk)}' tidak valid. Menggunakan tanggal hari ini.")
 
+    @classmethod
+    def from_row(cls, row) -> "Problem":
+        """Buat Problem dari baris DB tepercaya (urutan KOLOM_ROW) tanpa validasi ulang."""
+        obj = cls.__new__(cls)
+        obj.id, obj.nama_problem, deskripsi, kategori, obj.penyebab, obj.solusi, tanggal = row
+        obj.deskripsi_problem = deskripsi or ""
+        obj.kategori_problem = sys.intern(kategori) if kategori else "Lainnya"
+        obj.tanggal_masuk = hari_ke_tanggal(tanggal) if type(tanggal) is int else ke_tanggal(tanggal)
+        return obj
+
     def to_dict(self) -> dict:
         return {
             "id": self.id, "nama_problem": self.nama_problem, "deskripsi_problem": self.deskripsi_problem,
@@ -26,4 +73,81 @@ class Problem:
         }
 
     def __repr__(self) -> str:
-        return f"Problem(ID: {self.id}, Nama: '{self.nama_problem}', Kategori: '{self.kategori_problem}', Tanggal: {self.tanggal_masuk.strftime('%Y-%m-%d')})"
\ No newline at end of file
+        return f"Problem(ID: {self.id}, Nama: '{self.nama_problem}', Kategori: '{self.kategori_problem}', Tanggal: {self.tanggal_masuk.strftime('%Y-%m-%d')})"
+
+
+class ProblemBatch:
+    """Kumpulan Problem dalam bentuk kolom: id & tanggal (nomor hari) di array, kategori sebagai kode kecil
+    ke daftar kategori yang di-intern. Jauh lebih hemat memori daripada list objek Problem untuk kerja massal."""
+
+    __slots__ = ("id", "nama_problem", "deskripsi_problem", "penyebab", "solusi",
+                 "kategori_kode", "tanggal_hari", "kategori", "_kode_by_kategori")
+
+    def __init__(self):
+        self.id = array("q")
+        self.tanggal_hari = array("i")
+        self.kategori_kode = array("H")
+        self.kategori: list[str] = []
+        self._kode_by_kategori: dict[str, int] = {}
+        self.nama_problem: list[str] = []
+        self.deskripsi_problem: list[str] = []
+        self.penyebab: list[str] = []
+        self.solusi: list[str] = []
+
+    @classmethod
+    def from_rows(cls, rows) -> "ProblemBatch":
+        batch = cls()
+        for row in rows:
+            batch.tambah_row(row)
+        return batch
+
+    def _kode_kategori(self, kategori: str) -> int:
+        kode = self._kode_by_kategori.get(kategori)
+        if kode is None:
+            kode = self._kode_by_kategori[kategori] = len(self.kategori)
+            self.kategori.append(sys.intern(kategori))
+        return kode
+
+    def tambah_row(self, row):
+        """Tambah satu baris DB (urutan KOLOM_ROW)."""
+        id_problem, nama, deskripsi, kategori, penyebab, solusi, tanggal = row
+        self.id.append(id_problem)
+        self.tanggal_hari.append(tanggal if type(tanggal) is int else tanggal_ke_hari(ke_tanggal(tanggal)))
+        self.kategori_kode.append(self._kode_kategori(kategori or "Lainnya"))
+        self.nama_problem.append(nama)
+        self.deskripsi_problem.append(deskripsi or "")
+        self.penyebab.append(penyebab)
+        self.solusi.append(solusi)
+
+    def __len__(self) -> int:
+        return len(self.id)
+
+    def __getitem__(self, i: int) -> Problem:
+        return Problem.from_row((self.id[i], self.nama_problem[i], self.deskripsi_problem[i],
+                                 self.kategori[self.kategori_kode[i]], self.penyebab[i], self.solusi[i],
+                                 self.tanggal_hari[i]))
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def hitung_per_kategori(self) -> dict[str, int]:
+        jumlah = [0] * len(self.kategori)
+        for kode in self.kategori_kode:
+            jumlah[kode] += 1
+        return dict(zip(self.kategori, jumlah))
+
+    def to_dataframe(self):
+        """DataFrame dengan kolom kategori bertipe Categorical (pandas diimpor hanya saat dibutuhkan)."""
+        import numpy as np
+        import pandas as pd
+        return pd.DataFrame({
+            "id": np.frombuffer(self.id, dtype=np.int64),
+            "tanggal_masuk": np.frombuffer(self.tanggal_hari, dtype=np.int32).astype("datetime64[D]"),
+            "kategori_problem": pd.Categorical.from_codes(np.frombuffer(self.kategori_kode, dtype=np.uint16),
+                                                          categories=self.kategori),
+            "nama_problem": self.nama_problem,
+            "deskripsi_problem": self.deskripsi_problem,
+            "penyebab": self.penyebab,
+            "solusi": self.solusi,
+        })
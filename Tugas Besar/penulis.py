@@ -0,0 +1,180 @@
+# penulis.py
+import contextlib
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from instrumentasi import get_logger
+
+log = get_logger("penulis")
+_SELESAI = object()
+
+
+class PenulisTunggal:
+    """Satu thread latar yang memiliki satu-satunya koneksi tulis ke database.
+
+    Permintaan tulis (fungsi(conn) -> hasil) diantrekan dan dieksekusi berkelompok dalam SATU transaksi
+    (group commit): kelompok ditutup saat jumlahnya mencapai `maks_batch` atau `jeda_detik` sudah lewat
+    sejak permintaan pertama. Permintaan yang gagal hanya membatalkan dirinya sendiri (kelompok diulang dengan
+    SAVEPOINT per permintaan). Hasil dikirim lewat Future setelah COMMIT berhasil.
+
+    Permintaan `eksklusif` (tulisan besar, mis. executemany satu chunk impor) tidak digabung: fungsinya
+    dipanggil tanpa transaksi aktif dan mengatur BEGIN/COMMIT sendiri."""
+
+    def __init__(self, db_path: str, pragma: dict | None = None, maks_batch: int = 256,
+                 jeda_detik: float = 0.002, timeout: float = 10, setelah_commit=None):
+        self.db_path = db_path
+        self.pragma = dict(pragma or {})
+        self.maks_batch = max(1, int(maks_batch))
+        self.jeda_detik = max(0.0, jeda_detik)
+        self.timeout = timeout
+        self.setelah_commit = setelah_commit
+        self._antrean = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._ditutup = False
+        self._stat = {"permintaan": 0, "gagal": 0, "commit": 0, "commit_gagal": 0, "batch_maks": 0}
+        self._conn = self._buat_koneksi()
+        self._thread = threading.Thread(target=self._loop, name="penulis-db", daemon=True)
+        self._thread.start()
+
+    def _buat_koneksi(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout, detect_types=sqlite3.PARSE_DECLTYPES,
+                               check_same_thread=False, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        for nama, nilai in self.pragma.items():
+            conn.execute(f"PRAGMA {nama} = {nilai}")
+        return conn
+
+    def kirim(self, fungsi, eksklusif: bool = False) -> Future:
+        """Antrekan fungsi(conn) untuk dieksekusi di thread penulis. Return: Future berisi hasil fungsi."""
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("kirim() dipanggil dari thread penulis sendiri (mis. dari callback Future).")
+        future = Future()
+        with self._lock:
+            if self._ditutup:
+                raise sqlite3.ProgrammingError("Penulis database sudah ditutup.")
+            self._stat["permintaan"] += 1
+            self._antrean.put((fungsi, future, eksklusif))
+        return future
+
+    def _ambil_batch(self, pertama) -> tuple[list, bool]:
+        batch, selesai = [pertama], False
+        batas_waktu = time.monotonic() + self.jeda_detik
+        while len(batch) < self.maks_batch:
+            try:
+                sisa = batas_waktu - time.monotonic()
+                item = self._antrean.get(timeout=sisa) if sisa > 0 else self._antrean.get_nowait()
+            except queue.Empty:
+                break
+            if item is _SELESAI:
+                selesai = True
+                break
+            batch.append(item)
+        return batch, selesai
+
+    def _loop(self):
+        selesai = False
+        while not selesai:
+            item = self._antrean.get()
+            if item is _SELESAI: break
+            batch, selesai = self._ambil_batch(item)
+            self._jalankan_batch(batch)
+        self._conn.close()
+
+    def _jalankan_batch(self, batch: list):
+        kelompok = []
+        for fungsi, future, eksklusif in batch:
+            if not future.set_running_or_notify_cancel(): continue
+            if eksklusif:
+                self._jalankan_kelompok(kelompok)
+                kelompok = []
+                self._jalankan_eksklusif(fungsi, future)
+            else:
+                kelompok.append((fungsi, future))
+        self._jalankan_kelompok(kelompok)
+
+    def _eksekusi(self, kelompok: list, pakai_savepoint: bool) -> tuple[list | None, Exception | None]:
+        """Jalankan kelompok dalam satu transaksi. Tanpa savepoint, error pertama membatalkan seluruh
+        transaksi (return (None, error)) supaya kelompok bisa diulang dengan savepoint per permintaan."""
+        conn = self._conn
+        hasil = []
+        conn.execute("BEGIN IMMEDIATE")
+        for fungsi, future in kelompok:
+            if pakai_savepoint: conn.execute("SAVEPOINT permintaan")
+            try:
+                hasil.append((future, fungsi(conn), None))
+            except Exception as e:
+                if not pakai_savepoint:
+                    conn.execute("ROLLBACK")
+                    return None, e
+                conn.execute("ROLLBACK TO permintaan")
+                hasil.append((future, None, e))
+            if pakai_savepoint: conn.execute("RELEASE permintaan")
+        conn.execute("COMMIT")
+        return hasil, None
+
+    def _jalankan_kelompok(self, kelompok: list):
+        if not kelompok: return
+        try:
+            # Jalur cepat tanpa SAVEPOINT (savepoint memaksa FTS5 flush tiap permintaan); jika ada permintaan
+            # yang gagal, kelompok diulang dengan SAVEPOINT per permintaan. Karena itu fungsi tulis harus aman
+            # dijalankan ulang (cukup: hanya mengubah database).
+            hasil, error = self._eksekusi(kelompok, pakai_savepoint=False)
+            if hasil is None and len(kelompok) == 1:
+                self._selesaikan([(kelompok[0][1], None, error)], commit=False)
+                return
+            if hasil is None:
+                hasil, _ = self._eksekusi(kelompok, pakai_savepoint=True)
+        except sqlite3.Error as e:
+            # Transaksi tidak bisa dimulai/dilanjutkan/di-commit: seluruh kelompok dibatalkan.
+            if self._conn.in_transaction:
+                with contextlib.suppress(sqlite3.Error): self._conn.execute("ROLLBACK")
+            self._gagalkan([f for _, f in kelompok], e)
+            return
+        self._selesaikan(hasil)
+
+    def _jalankan_eksklusif(self, fungsi, future: Future):
+        try:
+            nilai = fungsi(self._conn)
+        except Exception as e:
+            if self._conn.in_transaction:
+                with contextlib.suppress(sqlite3.Error): self._conn.execute("ROLLBACK")
+            self._selesaikan([(future, None, e)], commit=False)
+            return
+        self._selesaikan([(future, nilai, None)])
+
+    def _selesaikan(self, hasil: list, commit: bool = True):
+        gagal = sum(1 for _, _, e in hasil if e is not None)
+        with self._lock:
+            self._stat["commit"] += commit
+            self._stat["gagal"] += gagal
+            self._stat["batch_maks"] = max(self._stat["batch_maks"], len(hasil))
+        if commit and self.setelah_commit and gagal < len(hasil):
+            self.setelah_commit()
+        for future, nilai, error in hasil:
+            future.set_exception(error) if error is not None else future.set_result(nilai)
+
+    def _gagalkan(self, futures: list, error: Exception):
+        log.error("Group commit gagal (%d permintaan): %s", len(futures), error)
+        with self._lock:
+            self._stat["commit_gagal"] += 1
+            self._stat["gagal"] += len(futures)
+        for future in futures:
+            if not future.done(): future.set_exception(error)
+
+    def statistik(self) -> dict:
+        with self._lock:
+            stat = dict(self._stat)
+        stat["antrean"] = self._antrean.qsize()
+        stat["rata_batch"] = round((stat["permintaan"] - stat["antrean"]) / stat["commit"], 2) if stat["commit"] else 0.0
+        return stat
+
+    def tutup(self, timeout: float | None = None):
+        """Selesaikan semua permintaan yang sudah diantrekan, lalu hentikan thread dan tutup koneksi."""
+        with self._lock:
+            if self._ditutup: return
+            self._ditutup = True
+            self._antrean.put(_SELESAI)
+        if threading.current_thread() is not self._thread:
+            self._thread.join(timeout)
@@ -0,0 +1,306 @@
+# rekomendasi.py
+import contextlib
+import json
+import os
+import re
+import threading
+import zlib
+from functools import lru_cache
+import numpy as np
+from konfigurasi import REKOMENDASI_DIMENSI, REKOMENDASI_MIN_SKOR
+
+DIMENSI_DEFAULT = REKOMENDASI_DIMENSI
+NGRAM = 3
+KAPASITAS_AWAL = 1024
+FORMAT = 2   # 1 = vektor padat .npy (lama), 2 = vektor jarang (baris, kolom, nilai)
+
+try:
+    import fcntl
+except ImportError:   # Windows
+    fcntl = None
+    import msvcrt
+
+
+@lru_cache(maxsize=200_000)
+def _bucket_ngram(ngram: str, dim: int) -> tuple[int, float]:
+    h = zlib.crc32(ngram.encode("utf-8"))
+    return h % dim, (1.0 if (h >> 31) & 1 else -1.0)
+
+
+def teks_problem(nama_problem: str, deskripsi_problem: str = "") -> str:
+    # Nama diulang dua kali supaya bobotnya lebih besar daripada deskripsi.
+    return f"{nama_problem or ''} {nama_problem or ''} {deskripsi_problem or ''}"
+
+
+def vektor_teks(teks: str, dim: int = DIMENSI_DEFAULT) -> tuple[np.ndarray, np.ndarray]:
+    """Vektor jarang n-gram karakter (feature hashing bertanda), TF sublinear, dinormalisasi L2.
+    Dikembalikan sebagai (bucket int32 terurut, nilai float32) tanpa bucket bernilai nol."""
+    hitung: dict[int, float] = {}
+    for kata in re.findall(r"\w+", (teks or "").lower()):
+        kata = f" {kata} "
+        for i in range(max(1, len(kata) - NGRAM + 1)):
+            bucket, tanda = _bucket_ngram(kata[i:i + NGRAM], dim)
+            hitung[bucket] = hitung.get(bucket, 0.0) + tanda
+    kolom = sorted(b for b, v in hitung.items() if v)
+    nilai = np.array([hitung[b] for b in kolom], dtype=np.float32)
+    nilai = np.sign(nilai) * np.log1p(np.abs(nilai))
+    norma = float(np.linalg.norm(nilai))
+    return np.array(kolom, dtype=np.int32), (nilai / norma if norma > 0 else nilai)
+
+
+class IndeksRekomendasi:
+    """Indeks vektor n-gram jarang untuk mencari problem historis yang mirip.
+
+    Dengan dimensi besar (REKOMENDASI_DIMENSI) tabrakan hash antar n-gram praktis hilang, jadi hanya
+    bucket yang terisi yang disimpan: per dokumen satu rentang di file baris/kolom/nilai (memory-map),
+    plus id dan frekuensi dokumen per bucket untuk bobot IDF. Penambahan/penghapusan diterapkan langsung
+    ke file (incremental); file hanya diperbesar di tempat, tidak pernah diganti.
+
+    Aman dipakai beberapa proses sekaligus (mis. beberapa worker Streamlit/API pada DB yang sama): setiap
+    operasi memegang kunci file `kunci` di direktori indeks, dan `meta.json` membawa nomor `generasi` yang
+    naik setiap penulisan, sehingga proses lain memuat ulang keadaan indeks sebelum membaca/menulis."""
+
+    def __init__(self, direktori: str, dim: int = DIMENSI_DEFAULT):
+        self.direktori = direktori
+        self.dim = dim
+        self._lock = threading.RLock()
+        self._kedalaman = 0
+        os.makedirs(direktori, exist_ok=True)
+        self._path_meta = os.path.join(direktori, "meta.json")
+        self._path = {nama: os.path.join(direktori, f"{nama}.bin") for nama in ("ids", "awal", "baris", "kolom", "nilai", "df")}
+        self._f_kunci = open(os.path.join(direktori, "kunci"), "a+b")
+        self.generasi = -1
+        self.jumlah = 0          # jumlah slot terpakai (termasuk slot yang sudah dihapus)
+        self.jumlah_aktif = 0
+        self.nnz = 0             # jumlah entri (bucket tidak nol) terpakai
+        self.id_maks = 0
+        self._baris_by_id: dict[int, int] = {}
+        self._idf = None         # (idf per bucket, norma L2 dokumen berbobot IDF); lihat _bobot_idf
+        self._posting = None     # entri dikelompokkan per bucket (lihat _skor)
+        self.tata = 0            # naik setiap posisi entri berubah (kompaksi/reset), posting lama jadi tidak berlaku
+        with self._kunci(segarkan=False):
+            if not self._muat():
+                self._buat_baru(KAPASITAS_AWAL, KAPASITAS_AWAL * 64)
+
+    @contextlib.contextmanager
+    def _kunci(self, segarkan: bool = True):
+        """Kunci thread + kunci file antarproses (reentrant); muat ulang jika proses lain sudah menulis."""
+        with self._lock:
+            if self._kedalaman == 0:
+                self._f_kunci.seek(0)
+                if fcntl is not None: fcntl.flock(self._f_kunci, fcntl.LOCK_EX)
+                else: msvcrt.locking(self._f_kunci.fileno(), msvcrt.LK_LOCK, 1)
+            self._kedalaman += 1
+            try:
+                if segarkan and self._kedalaman == 1 and self._baca_meta().get("generasi") != self.generasi:
+                    if not self._muat(): self._buat_baru(KAPASITAS_AWAL, KAPASITAS_AWAL * 64)
+                yield
+            finally:
+                self._kedalaman -= 1
+                if self._kedalaman == 0:
+                    self._f_kunci.seek(0)
+                    if fcntl is not None: fcntl.flock(self._f_kunci, fcntl.LOCK_UN)
+                    else: msvcrt.locking(self._f_kunci.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def _baca_meta(self) -> dict:
+        try:
+            with open(self._path_meta, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _map(self, nama: str, dtype, panjang: int, baru: bool = False) -> np.memmap:
+        path = self._path[nama]
+        ukuran = max(1, panjang) * np.dtype(dtype).itemsize
+        with open(path, "w+b" if baru else "r+b") as f:
+            if baru or os.fstat(f.fileno()).st_size < ukuran: f.truncate(ukuran)
+        return np.memmap(path, dtype=dtype, mode="r+", shape=(max(1, panjang),))
+
+    def _buat_baru(self, kapasitas: int, kapasitas_nnz: int):
+        self._ids, self._awal = self._map("ids", np.int64, kapasitas, True), self._map("awal", np.int64, kapasitas + 1, True)
+        self._baris = self._map("baris", np.int32, kapasitas_nnz, True)
+        self._kolom = self._map("kolom", np.int32, kapasitas_nnz, True)
+        self._nilai = self._map("nilai", np.float32, kapasitas_nnz, True)
+        self._df = self._map("df", np.int32, self.dim, True)
+        self.jumlah = self.jumlah_aktif = self.nnz = self.id_maks = 0
+        self._baris_by_id = {}
+        self.tata += 1
+        for lama in ("vektor.npy", "ids.npy", "df.npy"):   # indeks format lama (vektor padat)
+            with contextlib.suppress(FileNotFoundError): os.remove(os.path.join(self.direktori, lama))
+        self._simpan_meta()
+
+    def _muat(self) -> bool:
+        meta = self._baca_meta()
+        if meta.get("format") != FORMAT or meta.get("dim") != self.dim: return False
+        try:
+            self._ids = self._map("ids", np.int64, meta["kapasitas"])
+            self._awal = self._map("awal", np.int64, meta["kapasitas"] + 1)
+            self._baris = self._map("baris", np.int32, meta["kapasitas_nnz"])
+            self._kolom = self._map("kolom", np.int32, meta["kapasitas_nnz"])
+            self._nilai = self._map("nilai", np.float32, meta["kapasitas_nnz"])
+            self._df = self._map("df", np.int32, self.dim)
+        except (OSError, ValueError, KeyError):
+            return False
+        self.jumlah, self.nnz, self.id_maks, self.generasi = meta["jumlah"], meta["nnz"], meta["id_maks"], meta["generasi"]
+        self.tata = meta.get("tata", 0)
+        ids = np.asarray(self._ids[:self.jumlah])
+        aktif = np.nonzero(ids > 0)[0]
+        self._baris_by_id = dict(zip(ids[aktif].tolist(), aktif.tolist()))
+        self.jumlah_aktif = len(self._baris_by_id)
+        self._idf = None
+        return True
+
+    def _simpan_meta(self):
+        for arr in (self._ids, self._awal, self._baris, self._kolom, self._nilai, self._df): arr.flush()
+        self.generasi = max(self.generasi, self._baca_meta().get("generasi", 0)) + 1
+        self._idf = None
+        sementara = self._path_meta + ".tmp"
+        with open(sementara, "w", encoding="utf-8") as f:
+            json.dump({"format": FORMAT, "dim": self.dim, "jumlah": self.jumlah, "nnz": self.nnz,
+                       "id_maks": self.id_maks, "generasi": self.generasi, "tata": self.tata,
+                       "kapasitas": len(self._ids), "kapasitas_nnz": len(self._nilai)}, f)
+        os.replace(sementara, self._path_meta)
+
+    def _pastikan_kapasitas(self, tambahan: int, tambahan_nnz: int):
+        if self.jumlah + tambahan > len(self._ids):
+            baru = max(len(self._ids) * 2, self.jumlah + tambahan)
+            del self._ids, self._awal
+            self._ids, self._awal = self._map("ids", np.int64, baru), self._map("awal", np.int64, baru + 1)
+        if self.nnz + tambahan_nnz > len(self._nilai):
+            baru = max(len(self._nilai) * 2, self.nnz + tambahan_nnz)
+            del self._baris, self._kolom, self._nilai
+            self._baris = self._map("baris", np.int32, baru)
+            self._kolom = self._map("kolom", np.int32, baru)
+            self._nilai = self._map("nilai", np.float32, baru)
+
+    def tambah(self, data):
+        """Tambah/replace dokumen. `data`: iterable (id, nama_problem, deskripsi_problem)."""
+        data = [(int(i), *vektor_teks(teks_problem(nama, deskripsi), self.dim)) for i, nama, deskripsi in data]
+        if not data: return
+        with self._kunci():
+            self._pastikan_kapasitas(len(data), sum(len(kolom) for _, kolom, _ in data))
+            for id_problem, kolom, nilai in data:
+                if id_problem in self._baris_by_id:
+                    self._hapus_satu(id_problem)
+                baris, awal, akhir = self.jumlah, self.nnz, self.nnz + len(kolom)
+                self._ids[baris] = id_problem
+                self._awal[baris], self._awal[baris + 1] = awal, akhir
+                self._baris[awal:akhir], self._kolom[awal:akhir], self._nilai[awal:akhir] = baris, kolom, nilai
+                self._df[kolom] += 1
+                self._baris_by_id[id_problem] = baris
+                self.jumlah, self.nnz = self.jumlah + 1, akhir
+                self.jumlah_aktif += 1
+                self.id_maks = max(self.id_maks, id_problem)
+            self._simpan_meta()
+
+    def _hapus_satu(self, id_problem: int) -> bool:
+        baris = self._baris_by_id.pop(int(id_problem), None)
+        if baris is None: return False
+        awal, akhir = int(self._awal[baris]), int(self._awal[baris + 1])
+        self._df[self._kolom[awal:akhir]] -= 1
+        self._nilai[awal:akhir] = 0
+        self._ids[baris] = 0
+        self.jumlah_aktif -= 1
+        return True
+
+    def hapus(self, ids):
+        with self._kunci():
+            if any([self._hapus_satu(i) for i in ids]):
+                self._simpan_meta()
+
+    def _bobot_idf(self, n: int, nnz: int) -> tuple[np.ndarray, np.ndarray]:
+        """IDF per bucket dan norma L2 tiap dokumen setelah dibobot IDF. Di-cache sampai indeks berubah
+        (_simpan_meta/_muat mengosongkannya), karena df baru menggeser bobot semua dokumen."""
+        if self._idf is None:
+            idf = np.log((1.0 + self.jumlah_aktif) / (1.0 + np.asarray(self._df))).astype(np.float32) + 1.0
+            nilai = np.asarray(self._nilai[:nnz]) * idf[np.asarray(self._kolom[:nnz])]
+            norma = np.sqrt(np.bincount(np.asarray(self._baris[:nnz]), weights=np.square(nilai, dtype=np.float64),
+                                        minlength=n))
+            norma[norma == 0] = 1.0      # slot yang sudah dihapus (nilai nol)
+            self._idf = (idf, norma)
+        return self._idf
+
+    def cari(self, teks: str, k: int = 5, kecuali_id=(), min_skor: float = REKOMENDASI_MIN_SKOR) -> list[tuple[int, float]]:
+        """Top-k (id, skor kemiripan) untuk teks query. Skor = cosine (0..1) antara query dan dokumen yang
+        sama-sama dibobot IDF, jadi sebanding antar query pendek/panjang dan antar ukuran indeks.
+        Hasil dengan skor di bawah `min_skor` dibuang, jadi teks yang tidak mirip apa pun menghasilkan []."""
+        q_kolom, q_nilai = vektor_teks(teks, self.dim)
+        with self._kunci():
+            n, nnz = self.jumlah, self.nnz
+            if n == 0 or self.jumlah_aktif == 0 or len(q_kolom) == 0: return []
+            idf, norma_dokumen = self._bobot_idf(n, nnz)
+            q_nilai = q_nilai * idf[q_kolom]
+            norma = float(np.linalg.norm(q_nilai))
+            if norma == 0: return []
+            # Bobot IDF sisi dokumen ikut dimasukkan ke query: (q·idf/|q·idf|)·(d·idf) = query·d.
+            query = np.zeros(self.dim, dtype=np.float32)
+            query[q_kolom] = q_nilai * idf[q_kolom] / norma
+            skor = self._skor(query, q_kolom, n, nnz) / norma_dokumen
+            skor[np.asarray(self._ids[:n]) == 0] = -np.inf   # slot yang sudah dihapus
+            for id_kecuali in kecuali_id:
+                baris = self._baris_by_id.get(int(id_kecuali))
+                if baris is not None and baris < n: skor[baris] = -np.inf
+            calon = np.nonzero(skor >= min_skor)[0]
+            calon = calon[np.argsort(-skor[calon], kind="stable")[:k]]
+            ids = self._ids[calon]
+        return [(int(i), float(skor[b])) for i, b in zip(ids, calon) if skor[b] > 0]
+
+    def _skor(self, query: np.ndarray, q_kolom: np.ndarray, n: int, nnz: int) -> np.ndarray:
+        """Dot product query dengan semua dokumen, hanya lewat entri yang bucket-nya ada di query.
+        Entri dikelompokkan per bucket sekali (salinan di memori, dibaca berurutan per query); entri yang
+        ditambahkan sesudahnya dipindai linear dari file sampai cukup banyak untuk dikelompokkan ulang."""
+        posting = self._posting
+        if posting is None or posting[0] != self.tata or nnz - posting[1] > max(1 << 16, posting[1] // 4):
+            kolom = np.asarray(self._kolom[:nnz])
+            urutan = np.argsort(kolom, kind="stable")
+            batas = np.concatenate(([0], np.cumsum(np.bincount(kolom, minlength=self.dim))))
+            self._posting = posting = (self.tata, nnz, batas, np.asarray(self._baris[:nnz])[urutan],
+                                       np.asarray(self._nilai[:nnz])[urutan])
+        _, terurut, batas, baris_urut, nilai_urut = posting
+        baris = [baris_urut[batas[c]:batas[c + 1]] for c in q_kolom.tolist()]
+        bobot = [nilai_urut[batas[c]:batas[c + 1]] * query[c] for c in q_kolom.tolist()]
+        if nnz > terurut:
+            kolom = np.asarray(self._kolom[terurut:nnz])
+            cocok = np.nonzero(query[kolom])[0]
+            baris.append(np.asarray(self._baris[terurut:nnz])[cocok])
+            bobot.append(np.asarray(self._nilai[terurut:nnz])[cocok] * query[kolom[cocok]])
+        return np.bincount(np.concatenate(baris), weights=np.concatenate(bobot), minlength=n).astype(np.float64)
+
+    def kompaksi(self):
+        """Buang slot dan entri yang sudah dihapus; file ditulis ulang di tempat."""
+        with self._kunci():
+            ids = np.array(self._ids[:self.jumlah])
+            aktif = np.nonzero(ids > 0)[0]
+            awal, akhir = np.asarray(self._awal[aktif]), np.asarray(self._awal[aktif + 1])
+            panjang = akhir - awal
+            entri = np.repeat(awal - np.concatenate(([0], np.cumsum(panjang)[:-1])), panjang) + np.arange(panjang.sum())
+            kolom, nilai = np.array(self._kolom[entri]), np.array(self._nilai[entri])
+            self.jumlah, self.nnz = len(aktif), len(entri)
+            self._ids[:self.jumlah] = ids[aktif]
+            self._awal[:self.jumlah + 1] = np.concatenate(([0], np.cumsum(panjang)))
+            self._baris[:self.nnz] = np.repeat(np.arange(self.jumlah, dtype=np.int32), panjang)
+            self._kolom[:self.nnz], self._nilai[:self.nnz] = kolom, nilai
+            self._baris_by_id = dict(zip(ids[aktif].tolist(), range(self.jumlah)))
+            self.tata += 1
+            self._simpan_meta()
+
+    def reset(self):
+        with self._kunci():
+            self._ids[:], self._df[:] = 0, 0
+            self.jumlah = self.jumlah_aktif = self.nnz = self.id_maks = 0
+            self._baris_by_id = {}
+            self.tata += 1
+            self._simpan_meta()
+
+
+_indeks_per_direktori: dict[str, IndeksRekomendasi] = {}
+_indeks_lock = threading.Lock()
+
+
+def get_indeks(direktori: str) -> IndeksRekomendasi:
+    """Satu objek indeks per direktori dalam satu proses (dipakai bersama oleh semua HardwareDiagnoser)."""
+    direktori = os.path.abspath(direktori)
+    with _indeks_lock:
+        if direktori not in _indeks_per_direktori:
+            _indeks_per_direktori[direktori] = IndeksRekomendasi(direktori)
+        return _indeks_per_direktori[direktori]
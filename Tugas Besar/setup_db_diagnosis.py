@@ -1,6 +1,9 @@
 # setup_db_diagnosis.py
+import argparse
 import sqlite3
 import os
+import arsip
+import migrasi
 from konfigurasi import DB_PATH
 
 def setup_database():
@@ -8,21 +11,9 @@ def setup_database():
     conn = None
     try:
         conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        sql_create_table = """
-        CREATE TABLE IF NOT EXISTS problems (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            nama_problem TEXT NOT NULL,
-            deskripsi_problem TEXT,
-            kategori_problem TEXT,
-            penyebab TEXT NOT NULL,
-            solusi TEXT NOT NULL,
-            tanggal_masuk DATE NOT NULL
-        );"""
-        print(" Membuat tabel 'problems' (jika belum ada)...")
-        cursor.execute(sql_create_table)
-        conn.commit()
-        print(" -> Tabel 'problems' siap.")
+        print(f" Menerapkan migrasi skema (versi saat ini: {migrasi.versi_skema(conn)})...")
+        versi = migrasi.jalankan_migrasi(conn)
+        print(f" -> Skema database siap (versi {versi}).")
         return True
     except sqlite3.Error as e:
         print(f" -> Error SQLite saat setup: {e}");
@@ -30,9 +21,54 @@ def setup_database():
     finally:
         if conn: conn.close(); print(" -> Koneksi DB setup ditutup.")
 
+def rebuild_rollup():
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        jumlah = migrasi.rebuild_rollup(conn, direktori_arsip=arsip.direktori_arsip(DB_PATH))
+        print(f" -> Rollup harian dibangun ulang ({jumlah} baris rollup).")
+    finally:
+        conn.close()
+
+def tambah_alias(alias: str, nama_problem: str):
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        with conn:
+            jumlah = migrasi.tambah_alias(conn, alias, nama_problem)
+        print(f" -> Alias '{alias}' -> '{nama_problem}' dicatat ({jumlah} tiket dipindah).")
+    finally:
+        conn.close()
+
+def tampilkan_laporan_query_plan():
+    from manajer_diagnosis import HardwareDiagnoser
+    laporan = HardwareDiagnoser().laporan_query_plan()
+    ada_scan_penuh = False
+    for nama, plan in laporan.items():
+        penuh = migrasi.scan_penuh(plan)
+        ada_scan_penuh = ada_scan_penuh or penuh
+        print(f"\n[{'SCAN PENUH' if penuh else 'OK'}] {nama}")
+        for baris in plan: print(f"    {baris}")
+    return not ada_scan_penuh
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Setup/migrasi database diagnosis hardware.")
+    parser.add_argument("--explain", action="store_true", help="Tampilkan EXPLAIN QUERY PLAN untuk query manajer")
+    parser.add_argument("--rebuild-rollup", action="store_true", help="Hitung ulang tabel rollup_harian dari problems")
+    parser.add_argument("--alias", nargs=2, metavar=("ALIAS", "NAMA_PROBLEM"),
+                        help="Gabungkan nama problem ALIAS ke entri katalog NAMA_PROBLEM")
+    args = parser.parse_args()
+
     print("--- Memulai Setup Database Diagnosis Hardware ---")
     if setup_database():
         print(f"\nSetup database '{os.path.basename(DB_PATH)}' selesai.")
     else: print(f"\nSetup database GAGAL.")
-    print("--- Setup Database Selesai ---")
\ No newline at end of file
+    print("--- Setup Database Selesai ---")
+
+    if args.rebuild_rollup:
+        rebuild_rollup()
+
+    if args.alias:
+        tambah_alias(*args.alias)
+
+    if args.explain:
+        print("\n--- Laporan EXPLAIN QUERY PLAN ---")
+        print("\nSemua query memakai indeks." if tampilkan_laporan_query_plan() else "\nAda query yang scan penuh!")
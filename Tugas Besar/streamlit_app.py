@@ -1,20 +1,25 @@
 # streamlit_app.py
 import streamlit as st
 import datetime
-import pandas as pd
-import numpy as np
+import functools
 import locale
+import numbers
 
-try:
-    locale.setlocale(locale.LC_ALL, 'id_ID.UTF-8')
-except locale.Error:
+
+@functools.cache
+def _atur_locale():
+    # Diatur sekali per proses, saat angka pertama kali diformat (bukan sebelum render pertama).
     try:
-        locale.setlocale(locale.LC_ALL, 'Indonesian_Indonesia.1252')
-    except:
-        print("Locale id_ID/Indonesian tidak tersedia. Format default akan digunakan.")
+        locale.setlocale(locale.LC_ALL, 'id_ID.UTF-8')
+    except locale.Error:
+        try:
+            locale.setlocale(locale.LC_ALL, 'Indonesian_Indonesia.1252')
+        except:
+            print("Locale id_ID/Indonesian tidak tersedia. Format default akan digunakan.")
 
 
 def format_angka(angka):
+    _atur_locale()
     try:
         return locale.format_string("%.0f", angka, grouping=True)
     except:
@@ -24,11 +29,15 @@ def format_angka(angka):
 try:
     from model import Problem
     from manajer_diagnosis import HardwareDiagnoser
-    from konfigurasi import KATEGORI_PROBLEM, KATEGORI_DEFAULT
+    from konfigurasi import KATEGORI_PROBLEM, KATEGORI_DEFAULT, PANEL_PERFORMA
+    from instrumentasi import get_logger, get_instrumentasi
+    from impor_lambat import pd
 except ImportError as e:
     st.error(f"Gagal mengimpor modul: {e}. Pastikan file .py lain ada di direktori yang sama.")
     st.stop()
 
+log = get_logger("app")
+
 st.set_page_config(
     page_title="Diagnosis Hardware Komputer",
     layout="wide",
@@ -38,25 +47,49 @@ st.set_page_config(
 
 @st.cache_resource
 def get_diagnoser_manager():
-    print(">>> STREAMLIT: (Cache Resource) Menginisialisasi HardwareDiagnoser...")
+    log.info("(Cache Resource) Menginisialisasi HardwareDiagnoser...")
     return HardwareDiagnoser()
 
 
 diagnoser = get_diagnoser_manager()
 
 
+def tampilkan_rekomendasi(nama_problem, deskripsi_problem, k=5):
+    if not (nama_problem or "").strip() and not (deskripsi_problem or "").strip():
+        return
+    with st.spinner("Mencari kasus serupa..."):
+        df_mirip = diagnoser.rekomendasi_solusi(nama_problem, deskripsi_problem, k=k)
+    if df_mirip.empty:
+        st.caption("Belum ada kasus serupa di riwayat.")
+        return
+    st.markdown("##### 💡 Kasus Serupa dari Riwayat")
+    for _, row in df_mirip.iterrows():
+        with st.expander(f"{row['Masalah']} · {row['Kategori']} · kemiripan {row['Kemiripan']:.0%}"):
+            st.markdown(f"**Penyebab:** {row['Penyebab']}")
+            st.markdown(f"**Solusi:** {row['Solusi']}")
+
+
 def halaman_tambah_masalah():
     st.header("➕ Tambah Masalah Hardware Baru")
 
+    # Nama & deskripsi di luar form supaya rekomendasi kasus serupa bisa muncul sebelum disimpan.
+    if st.session_state.pop("reset_form_tambah", False):
+        st.session_state["tambah_nama_problem"] = ""
+        st.session_state["tambah_deskripsi_problem"] = ""
+
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        nama_problem = st.text_input("Nama Masalah*", key="tambah_nama_problem",
+                                     placeholder="Contoh: Komputer Lemot, No Display, WiFi Hilang")
+    with col2:
+        kategori = st.selectbox("Kategori*:", KATEGORI_PROBLEM, index=len(KATEGORI_PROBLEM) - 1)
+
+    deskripsi_problem = st.text_area("Deskripsi Singkat Masalah", key="tambah_deskripsi_problem",
+                                     placeholder="Jelaskan lebih detail masalah yang terjadi...")
+
+    tampilkan_rekomendasi(nama_problem, deskripsi_problem)
+
     with st.form("form_tambah_masalah", clear_on_submit=True):
-        col1, col2 = st.columns([3, 1])
-        with col1:
-            nama_problem = st.text_input("Nama Masalah*", placeholder="Contoh: Komputer Lemot, No Display, WiFi Hilang")
-        with col2:
-            kategori = st.selectbox("Kategori*:", KATEGORI_PROBLEM, index=len(KATEGORI_PROBLEM) - 1)
-
-        deskripsi_problem = st.text_area("Deskripsi Singkat Masalah",
-                                         placeholder="Jelaskan lebih detail masalah yang terjadi...")
         penyebab = st.text_area("Penyebab Potensial*",
                                 placeholder="Misalnya: RAM penuh, Driver VGA korup, Adaptor WiFi rusak")
         solusi = st.text_area("Langkah-langkah Solusi*",
@@ -85,12 +118,41 @@ def halaman_tambah_masalah():
                     )
                     if diagnoser.tambah_problem(new_problem):
                         st.success(f"✅ OK! Masalah '{new_problem.nama_problem}' berhasil disimpan.")
-                        st.cache_data.clear()
+                        st.session_state["reset_form_tambah"] = True
                         st.rerun()
                     else:
                         st.error("❌ Gagal menyimpan masalah. Cek log atau input Anda.")
 
 
+def tampilkan_hasil_pencarian(kata_kunci, kategori, per_halaman=20):
+    halaman = st.number_input("Halaman hasil:", min_value=1, value=1, step=1, key="halaman_cari")
+    with st.spinner("Mencari..."):
+        df_hasil = diagnoser.cari_problem(kata_kunci, kategori=kategori,
+                                          limit=per_halaman, offset=(halaman - 1) * per_halaman)
+
+    if df_hasil.empty:
+        st.info("Tidak ada masalah yang cocok dengan kata kunci tersebut.")
+        return
+
+    st.caption(f"Menampilkan {len(df_hasil)} hasil teratas (halaman {halaman}).")
+    for _, row in df_hasil.iterrows():
+        with st.expander(f"#{row['ID']} · {row['Masalah']} · {row['Kategori']} · {row['Tanggal']}"):
+            st.markdown(f"**Masalah:** {row['Masalah (Sorotan)']}")
+            st.markdown(f"**Cuplikan:** {row['Cuplikan']}")
+            st.markdown(f"**Penyebab:** {row['Penyebab']}")
+            st.markdown(f"**Solusi:** {row['Solusi']}")
+
+
+UKURAN_HALAMAN_DAFTAR = 50
+
+
+def reset_halaman_daftar():
+    # Tumpukan kursor keyset: elemen ke-i = (Tanggal, ID) baris terakhir halaman i-1; halaman 1 = None.
+    st.session_state["kursor_daftar"] = [None]
+    if 'data_editor_problems' in st.session_state:
+        del st.session_state['data_editor_problems']
+
+
 def halaman_daftar_masalah():
     st.subheader("📚 Daftar Semua Masalah Hardware")
 
@@ -98,7 +160,7 @@ def halaman_daftar_masalah():
         "Filter berdasarkan Kategori:",
         ["Semua Kategori"] + KATEGORI_PROBLEM,
         key="filter_kategori_daftar",
-        on_change=st.cache_data.clear
+        on_change=reset_halaman_daftar
     )
 
     col_date_start, col_date_end = st.columns(2)
@@ -107,27 +169,61 @@ def halaman_daftar_masalah():
             "Tanggal Mulai:",
             value=None,
             key="date_start_filter",
-            on_change=st.cache_data.clear
+            on_change=reset_halaman_daftar
         )
     with col_date_end:
         date_end_filter = st.date_input(
             "Tanggal Akhir:",
             value=None,
             key="date_end_filter",
-            on_change=st.cache_data.clear
+            on_change=reset_halaman_daftar
         )
 
     if st.button("🔄 Refresh Daftar"):
-        st.cache_data.clear()
+        reset_halaman_daftar()
         st.rerun()
 
+    kata_kunci = st.text_input("🔍 Cari gejala / penyebab / solusi:", key="kata_kunci_cari",
+                               placeholder="Contoh: layar gelap, wifi putus, bsod")
+    if kata_kunci.strip():
+        tampilkan_hasil_pencarian(kata_kunci, filter_kategori_daftar)
+        st.markdown("---")
+
+    if "kursor_daftar" not in st.session_state:
+        st.session_state["kursor_daftar"] = [None]
+    kursor_daftar = st.session_state["kursor_daftar"]
+
     with st.spinner("Memuat daftar masalah..."):
-        df_problems = diagnoser.get_dataframe_problems(
+        total_problems = diagnoser.hitung_problems(
+            filter_kategori=filter_kategori_daftar,
+            tanggal_mulai=date_start_filter,
+            tanggal_akhir=date_end_filter
+        )
+        df_problems = diagnoser.get_halaman_problems(
+            batas=UKURAN_HALAMAN_DAFTAR,
+            setelah=kursor_daftar[-1],
             filter_kategori=filter_kategori_daftar,
             tanggal_mulai=date_start_filter,
             tanggal_akhir=date_end_filter
         )
 
+    halaman_ke = len(kursor_daftar)
+    jumlah_halaman = max(1, -(-total_problems // UKURAN_HALAMAN_DAFTAR))
+    col_prev, col_info, col_next = st.columns([1, 3, 1])
+    with col_prev:
+        if st.button("⬅️ Sebelumnya", disabled=halaman_ke <= 1, key="halaman_sebelumnya"):
+            kursor_daftar.pop()
+            st.session_state.pop('data_editor_problems', None)
+            st.rerun()
+    with col_info:
+        st.caption(f"Halaman {halaman_ke} dari {jumlah_halaman} · total {format_angka(total_problems)} masalah")
+    with col_next:
+        if st.button("Berikutnya ➡️", disabled=halaman_ke >= jumlah_halaman or df_problems.empty,
+                     key="halaman_berikutnya"):
+            kursor_daftar.append((df_problems['Tanggal'].iloc[-1], int(df_problems['ID'].iloc[-1])))
+            st.session_state.pop('data_editor_problems', None)
+            st.rerun()
+
     if df_problems.empty:
         st.info("Belum ada masalah hardware yang dicatat.")
     else:
@@ -161,11 +257,10 @@ def halaman_daftar_masalah():
             key="data_editor_problems"
         )
 
-        # DEBUG: Cek apakah session_state.data_editor_problems ada dan memiliki edited_rows
-        print(f"DEBUG APP: st.session_state.data_editor_problems: {st.session_state.get('data_editor_problems')}")
+        log.debug("st.session_state.data_editor_problems: %s", st.session_state.get('data_editor_problems'))
         if "data_editor_problems" in st.session_state and st.session_state.data_editor_problems.get('edited_rows'):
             edited_rows = st.session_state.data_editor_problems['edited_rows']
-            print(f"DEBUG APP: edited_rows terdeteksi: {edited_rows}")
+            log.debug("edited_rows terdeteksi: %s", edited_rows)
 
             rows_to_delete_indices = []
             for idx, changes in edited_rows.items():
@@ -173,7 +268,7 @@ def halaman_daftar_masalah():
                     rows_to_delete_indices.append(idx)
 
             if rows_to_delete_indices:
-                print(f"DEBUG APP: Baris yang dipilih untuk dihapus (indeks): {rows_to_delete_indices}")
+                log.debug("Baris yang dipilih untuk dihapus (indeks): %s", rows_to_delete_indices)
                 st.markdown("---")
                 st.subheader("🗑️ Konfirmasi Penghapusan")
                 st.warning("Anda telah memilih masalah berikut untuk dihapus:", icon="⚠️")
@@ -183,10 +278,8 @@ def halaman_daftar_masalah():
                     # --- TEMPATKAN KODE KONVERSI DI SINI ---
                     problem_id_raw = df_problems.iloc[idx]['ID']
 
-                    # Pastikan kamu sudah import numpy as np di bagian atas file
-                    import numpy as np  # <-- PASTIKAN INI ADA DI ATAS FILE streamlit_app.py
-
-                    if isinstance(problem_id_raw, (int, np.int64)):
+                    # numbers.Integral mencakup int Python dan numpy.int64 dari DataFrame
+                    if isinstance(problem_id_raw, numbers.Integral):
                         problem_id = int(problem_id_raw)  # Konversi eksplisit ke int standar Python
                     elif isinstance(problem_id_raw, list) and len(problem_id_raw) > 0:
                         problem_id = int(problem_id_raw[0])  # Ambil elemen pertama jika itu list
@@ -199,69 +292,75 @@ def halaman_daftar_masalah():
                     st.write(f"- **ID: {problem_id}** | Masalah: {problem_name}")
                     selected_ids.append(problem_id)
 
-                print(f"DEBUG APP: ID masalah yang akan dihapus: {selected_ids}")
+                log.debug("ID masalah yang akan dihapus: %s", selected_ids)
 
                 if st.button("YA, Hapus Masalah yang Dipilih", key="confirm_bulk_delete"):
-                        print("DEBUG APP: Tombol 'YA, Hapus Sekarang' DITEKAN!")
+                        log.debug("Tombol 'YA, Hapus Sekarang' DITEKAN!")
                         with st.spinner("Menghapus masalah yang dipilih..."):
-                            all_deleted_successfully = True
-                            for problem_id in selected_ids:  # Loop ini akan iterasi integer sekarang
-                                print(f"DEBUG APP: Memanggil diagnoser.hapus_problem untuk ID: {problem_id}")
-                                if not diagnoser.hapus_problem(problem_id):
-                                    all_deleted_successfully = False
-                                    st.error(f"❌ Gagal menghapus masalah dengan ID {problem_id}.")
-                                    print(f"ERROR APP: Gagal menghapus ID {problem_id}. Berhenti.")
-                                    break
-
-                            if all_deleted_successfully:
+                            log.debug("Memanggil diagnoser.hapus_problem_batch untuk ID: %s", selected_ids)
+                            deleted_ids = diagnoser.hapus_problem_batch(selected_ids)
+
+                            if deleted_ids is None:
+                                st.error("❌ Gagal menghapus masalah. Tidak ada data yang dihapus.")
+                                log.error("Hapus batch gagal, transaksi dibatalkan.")
+                            elif len(deleted_ids) == len(selected_ids):
                                 st.success("✅ Semua masalah yang dipilih berhasil dihapus.")
-                                print("DEBUG APP: Semua masalah berhasil dihapus. Membersihkan cache dan rerun.")
+                                log.debug("Semua masalah berhasil dihapus. Membersihkan cache dan rerun.")
+                            else:
+                                missing_ids = sorted(set(selected_ids) - set(deleted_ids))
+                                st.warning(f"Sebagian ID tidak ditemukan (mungkin sudah dihapus): {missing_ids}", icon="⚠️")
 
-                            st.cache_data.clear()
                             if 'data_editor_problems' in st.session_state:
                                 del st.session_state['data_editor_problems']
                             st.rerun()
                 # Tombol konfirmasi TIDAK
                 elif st.button("Tidak Jadi Hapus", key="cancel_bulk_delete"):
-                    print("DEBUG APP: Tombol 'Tidak Jadi Hapus' DITEKAN. Membatalkan penghapusan.")
+                    log.debug("Tombol 'Tidak Jadi Hapus' DITEKAN. Membatalkan penghapusan.")
                     st.info("Penghapusan dibatalkan.")
                     if 'data_editor_problems' in st.session_state:
                         del st.session_state['data_editor_problems']
                     st.rerun()
             else:
-                print("DEBUG APP: Tidak ada baris yang dipilih untuk dihapus.")
+                log.debug("Tidak ada baris yang dipilih untuk dihapus.")
                 pass
         else:
-            print("DEBUG APP: Tidak ada edited_rows di data_editor_problems.")
+            log.debug("Tidak ada edited_rows di data_editor_problems.")
             pass
 
 
+PERIODE_TREN = {"Harian": "D", "Mingguan": "W", "Bulanan": "M", "Kuartalan": "Q"}
+
+
+def tampilkan_panel_anomali(df_anomali):
+    """Lonjakan tiket per kategori: hari berjalan sebagai peringatan merah, 7 hari terakhir kuning, sisanya tabel."""
+    if df_anomali.empty:
+        st.success("✅ Tidak ada lonjakan masalah yang terdeteksi.")
+        return
+    terbaru = df_anomali['Tanggal'].max()
+    for _, baris in df_anomali.iterrows():
+        pesan = (f"**{baris['Kategori']}**: {baris['Jumlah']} tiket pada {baris['Tanggal']} "
+                 f"(biasanya ±{baris['EWMA']:.1f}/hari, skor {baris['Skor Z']:.1f})")
+        if baris['Hari Berjalan']:
+            st.error("🚨 Lonjakan hari ini — " + pesan)
+        elif (terbaru - baris['Tanggal']).days < 7:
+            st.warning("⚠️ Lonjakan — " + pesan)
+    with st.expander(f"Riwayat lonjakan ({len(df_anomali)})"):
+        st.dataframe(df_anomali.drop(columns=['Anomali']), hide_index=True, use_container_width=True)
+
+
 def halaman_analisis_tren():
     st.subheader("📊 Analisis & Tren Masalah Hardware")
+    wadah_anomali = st.container()
 
     st.markdown("---")
     st.markdown("#### Masalah Paling Sering Terjadi")
 
     col_freq_start, col_freq_end = st.columns(2)
     with col_freq_start:
-        freq_date_start = st.date_input("Filter Mulai (Frekuensi):", value=None, key="freq_start_date",
-                                        on_change=st.cache_data.clear)
+        freq_date_start = st.date_input("Filter Mulai (Frekuensi):", value=None, key="freq_start_date")
     with col_freq_end:
-        freq_date_end = st.date_input("Filter Akhir (Frekuensi):", value=None, key="freq_end_date",
-                                      on_change=st.cache_data.clear)
-
-    @st.cache_data(ttl=300)
-    def get_frekuensi_cached(start_date, end_date):
-        return diagnoser.get_frekuensi_problem(tanggal_mulai=start_date, tanggal_akhir=end_date)
-
-    with st.spinner("Memuat frekuensi masalah..."):
-        df_frekuensi = get_frekuensi_cached(freq_date_start, freq_date_end)
-
-    if df_frekuensi.empty:
-        st.info("Tidak ada data frekuensi masalah untuk periode ini.")
-    else:
-        st.dataframe(df_frekuensi, hide_index=True, use_container_width=True)
-        st.bar_chart(df_frekuensi.set_index('Masalah')['Jumlah Kejadian'])
+        freq_date_end = st.date_input("Filter Akhir (Frekuensi):", value=None, key="freq_end_date")
+    wadah_frekuensi = st.container()
 
     st.markdown("---")
     st.markdown("#### Tren Masalah dari Waktu ke Waktu")
@@ -269,36 +368,79 @@ def halaman_analisis_tren():
     kategori_filter_tren = st.selectbox(
         "Filter Kategori (Tren):",
         ["Semua Kategori"] + KATEGORI_PROBLEM,
-        key="kategori_filter_tren",
-        on_change=st.cache_data.clear
+        key="kategori_filter_tren"
     )
 
     pilihan_periode_tren = st.radio(
         "Periode Tren:",
-        ["Harian", "Bulanan"],
+        list(PERIODE_TREN),
         key="periode_tren_radio",
-        horizontal=True,
-        on_change=st.cache_data.clear
+        horizontal=True
     )
-
-    with st.spinner(f"Memuat tren masalah {pilihan_periode_tren.lower()}..."):
-        if pilihan_periode_tren == "Harian":
-            @st.cache_data(ttl=300)
-            def get_tren_harian_cached(kategori):
-                return diagnoser.get_tren_problem_harian(kategori_problem=kategori)
-
-            df_tren = get_tren_harian_cached(kategori_filter_tren)
+    tren_bertumpuk = st.checkbox("Tampilkan per kategori (bertumpuk)", key="tren_bertumpuk",
+                                 disabled=kategori_filter_tren != "Semua Kategori")
+    wadah_tren = st.container()
+
+    # Semua query halaman ini saling independen: jalankan paralel, total waktu ~ query terlama.
+    # Tren diambil sebagai matriks periode × kategori; ganti kategori/tampilan cukup men-slice matriks (cache).
+    rentang_frekuensi = {"tanggal_mulai": freq_date_start, "tanggal_akhir": freq_date_end}
+    with st.spinner("Memuat analisis masalah..."):
+        hasil = diagnoser.analisis_paralel({
+            "frekuensi": ("get_frekuensi_problem", rentang_frekuensi),
+            "per_kategori": ("get_jumlah_per_kategori", rentang_frekuensi),
+            "tren": ("get_tren_matrix", {"granularitas": PERIODE_TREN[pilihan_periode_tren]}),
+            "anomali": ("get_anomali", {}),
+        })
+
+    with wadah_anomali:
+        tampilkan_panel_anomali(hasil["anomali"])
+
+    with wadah_frekuensi:
+        df_frekuensi = hasil["frekuensi"]
+        if df_frekuensi.empty:
+            st.info("Tidak ada data frekuensi masalah untuk periode ini.")
         else:
-            @st.cache_data(ttl=300)
-            def get_tren_bulanan_cached(kategori):
-                return diagnoser.get_tren_problem_bulanan(kategori_problem=kategori)
-
-            df_tren = get_tren_bulanan_cached(kategori_filter_tren)
-
-    if df_tren.empty:
-        st.info(f"Tidak ada data tren masalah {pilihan_periode_tren.lower()} untuk kategori ini.")
-    else:
-        st.line_chart(df_tren['Jumlah Masalah'])
+            st.dataframe(df_frekuensi, hide_index=True, use_container_width=True)
+            st.bar_chart(df_frekuensi.set_index('Masalah')['Jumlah Kejadian'])
+
+            df_kategori = hasil["per_kategori"]
+            if not df_kategori.empty:
+                st.markdown("##### Jumlah Masalah per Kategori")
+                st.bar_chart(df_kategori.set_index('Kategori')['Jumlah Masalah'])
+
+    with wadah_tren:
+        df_tren = hasil["tren"]
+        if kategori_filter_tren != "Semua Kategori":
+            df_tren = df_tren[[kategori_filter_tren]] if kategori_filter_tren in df_tren.columns else df_tren.iloc[:, :0]
+        if df_tren.empty or not df_tren.to_numpy().any():
+            st.info(f"Tidak ada data tren masalah {pilihan_periode_tren.lower()} untuk kategori ini.")
+        elif tren_bertumpuk and kategori_filter_tren == "Semua Kategori":
+            st.area_chart(df_tren)
+        else:
+            st.line_chart(df_tren.sum(axis=1).rename('Jumlah Masalah'))
+
+
+def tampilkan_panel_performa():
+    instrumentasi = get_instrumentasi()
+    with st.sidebar.expander("📈 Performa Query (Admin)"):
+        if not instrumentasi.aktif:
+            st.caption("Instrumentasi dimatikan (INSTRUMENTASI_AKTIF di konfigurasi.py).")
+            return
+        top = instrumentasi.top_query(10)
+        if top:
+            st.caption("Query teratas berdasarkan total waktu")
+            df_top = pd.DataFrame(top)[["jenis", "jumlah", "total_ms", "rata_ms", "maks_ms", "baris", "byte", "bentuk"]]
+            st.dataframe(df_top, hide_index=True, use_container_width=True)
+        else:
+            st.caption("Belum ada query tercatat.")
+        lambat = instrumentasi.query_lambat()
+        st.caption(f"Query lambat (>= {instrumentasi.ambang_lambat_ms} ms): {len(lambat)}")
+        for catatan in lambat[:5]:
+            st.code(f"{catatan['durasi_ms']} ms | {catatan['bentuk'][:300]}\n" + "\n".join(catatan['plan'] or []),
+                    language="text")
+        if st.button("Reset Statistik Query", key="reset_statistik_query"):
+            instrumentasi.reset()
+            st.rerun()
 
 
 def main():
@@ -315,6 +457,16 @@ def main():
     st.sidebar.info("Catatan kerusakan")
     st.sidebar.markdown(f"**Waktu Server:** {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
 
+    with st.sidebar.expander("⚙️ Statistik Cache Query"):
+        stat_cache = diagnoser.statistik_cache()
+        total_akses = stat_cache.get("hit", 0) + stat_cache.get("miss", 0)
+        if total_akses:
+            st.caption(f"Hit rate: {stat_cache['hit'] / total_akses:.0%}")
+        st.json(stat_cache)
+
+    if PANEL_PERFORMA:
+        tampilkan_panel_performa()
+
     if menu_pilihan == "Tambah Masalah":
         halaman_tambah_masalah()
     elif menu_pilihan == "Daftar Masalah":
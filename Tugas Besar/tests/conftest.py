@@ -0,0 +1,54 @@
+# conftest.py
+import datetime
+import os
+import sqlite3
+import sys
+import pytest
+
+DIREKTORI_APLIKASI = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DIREKTORI_APLIKASI)
+
+import database
+from manajer_diagnosis import HardwareDiagnoser
+from model import Problem
+
+DB_BAWAAN = os.path.join(DIREKTORI_APLIKASI, "diagnosis_hardware.db")
+
+
+def pakai_db(path: str):
+    """Arahkan database.py ke `path`; setup awal (migrasi) dijalankan lagi oleh HardwareDiagnoser berikutnya."""
+    database.atur_db_path(path)
+    HardwareDiagnoser._db_setup_done = False
+
+
+def salin_db_bawaan(tujuan: str) -> str:
+    """Salin database bawaan repo lewat backup API dari koneksi read-only (file aslinya tidak pernah ditulis)."""
+    sumber = sqlite3.connect(f"file:{DB_BAWAAN}?mode=ro", uri=True)
+    salinan = sqlite3.connect(tujuan)
+    try:
+        sumber.backup(salinan)
+    finally:
+        salinan.close()
+        sumber.close()
+    return tujuan
+
+
+def buat_problem(nama: str = "Layar berkedip", tanggal=None, kategori: str = "Tampilan (Layar/Grafis)") -> Problem:
+    return Problem(nama, "Kabel longgar", "Pasang ulang kabel", f"{nama} saat dipakai", kategori,
+                   tanggal or datetime.date.today())
+
+
+@pytest.fixture
+def db_sementara(tmp_path):
+    """Database baru di direktori sementara; DB_PATH dikembalikan sesudah test."""
+    path_lama = database.DB_PATH
+    pakai_db(str(tmp_path / "uji.db"))
+    yield database.DB_PATH
+    pakai_db(path_lama)
+
+
+@pytest.fixture
+def diagnoser(db_sementara):
+    diag = HardwareDiagnoser(gunakan_cache=False)
+    yield diag
+    diag.tutup()
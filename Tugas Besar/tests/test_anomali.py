@@ -0,0 +1,31 @@
+import datetime
+import random
+from model import Problem
+
+KATEGORI = "Audio"
+
+
+def _tiket(tanggal: datetime.date) -> Problem:
+    return Problem("Suara speaker pecah", "Driver audio", "Update driver", kategori_problem=KATEGORI, tanggal_masuk=tanggal)
+
+
+def _status_hari_ini(diag) -> dict:
+    status = diag.get_status_anomali()
+    return status[status["Kategori"] == KATEGORI].iloc[0].to_dict()
+
+
+def test_tiket_bertanggal_masa_depan_tidak_memajukan_hari(diagnoser):
+    hari_ini = datetime.date.today()
+    acak = random.Random(1)
+    riwayat = [_tiket(hari_ini - datetime.timedelta(days=i)) for i in range(1, 91) for _ in range(acak.randint(3, 7))]
+    assert diagnoser.tambah_problem_batch(riwayat)["berhasil"] == len(riwayat)
+    diagnoser.get_status_anomali()                          # detektor dibangun dari rollup
+
+    assert diagnoser.tambah_problem(_tiket(datetime.date(2099, 1, 1)))
+    assert diagnoser.tambah_problem_batch([_tiket(hari_ini)] * 50)["berhasil"] == 50
+    status = _status_hari_ini(diagnoser)
+    assert (status["Tanggal"], status["Jumlah"], status["Anomali"]) == (hari_ini, 50, True)
+
+    diagnoser._detektor = None                              # bangun ulang: rollup sudah berisi tiket 2099
+    status = _status_hari_ini(diagnoser)
+    assert (status["Tanggal"], status["Jumlah"], status["Anomali"]) == (hari_ini, 50, True)
@@ -0,0 +1,82 @@
+import datetime
+import os
+import pandas as pd
+import pytest
+import arsip
+import database
+import migrasi
+from conftest import buat_problem
+from data_sintetis import isi_database
+
+
+def _snapshot_baca(diag) -> dict:
+    return {
+        "problems": diag.get_dataframe_problems(),
+        "jumlah": diag.hitung_problems(),
+        "frekuensi": diag.get_frekuensi_problem(),
+        "per_kategori": diag.get_jumlah_per_kategori(),
+        "bulanan": diag.get_tren_problem_bulanan(),
+    }
+
+
+def _sama(sebelum: dict, sesudah: dict):
+    assert sesudah["jumlah"] == sebelum["jumlah"]
+    for kunci in ("problems", "frekuensi", "per_kategori", "bulanan"):
+        pd.testing.assert_frame_equal(sesudah[kunci].reset_index(drop=True), sebelum[kunci].reset_index(drop=True),
+                                      check_dtype=False)
+
+
+def test_gulung_arsip_hasil_baca_sama(diagnoser):
+    tahun_ini = datetime.date.today().year
+    isi_database(diagnoser, 3000, tahun=3)
+    sebelum = _snapshot_baca(diagnoser)
+    lama = diagnoser.get_semua_problems()[-1]
+    assert lama.tanggal_masuk.year < tahun_ini
+
+    hasil = arsip.gulung(sebelum=tahun_ini)
+    assert sum(h["dipindah"] for h in hasil) > 0
+    partisi = arsip.daftar_partisi()
+    assert {p["tahun"] for p in partisi} == {h["tahun"] for h in hasil}
+    for p in partisi:
+        assert os.path.exists(os.path.join(arsip.direktori_arsip(), p["berkas"]))
+    # Database utama hanya menyimpan tahun berjalan; data lama dibaca lewat ATTACH.
+    assert database.fetch_query("SELECT COUNT(*) FROM problems WHERE tanggal_masuk < ?",
+                                (arsip._rentang_tahun(tahun_ini)[0],))[0][0] == 0
+
+    _sama(sebelum, _snapshot_baca(diagnoser))
+    dari_arsip = diagnoser.get_problem_by_id(lama.id)
+    assert (dari_arsip.nama_problem, dari_arsip.tanggal_masuk) == (lama.nama_problem, lama.tanggal_masuk)
+    assert lama.id in set(diagnoser.cari_problem(lama.nama_problem, limit=5000)["ID"])
+
+
+def test_gulung_ulang_tahun_yang_sama(diagnoser):
+    tahun_lalu = datetime.date.today().year - 1
+    for bulan in (1, 2):
+        assert diagnoser.tambah_problem(buat_problem(tanggal=datetime.date(tahun_lalu, bulan, 1)))
+    assert arsip.gulung(tahun=[tahun_lalu])[0]["versi"] == 1
+
+    assert diagnoser.tambah_problem(buat_problem("Kipas berisik", datetime.date(tahun_lalu, 3, 1), "Suhu (Overheating)"))
+    sebelum = _snapshot_baca(diagnoser)
+    hasil = arsip.gulung(tahun=[tahun_lalu])
+    assert hasil[0]["versi"] == 2 and hasil[0]["dipindah"] == 1
+
+    (partisi,) = arsip.daftar_partisi()
+    assert partisi["jumlah"] == 3 and partisi["berkas"].endswith("_v2.db")
+    # Versi tepat sebelumnya disimpan untuk pembaca dengan snapshot lama.
+    assert sorted(os.listdir(arsip.direktori_arsip())) == [f"problems_{tahun_lalu}_v1.db", partisi["berkas"]]
+    _sama(sebelum, _snapshot_baca(diagnoser))
+
+
+def test_rebuild_rollup_tetap_mencakup_arsip(diagnoser):
+    tahun_ini = datetime.date.today().year
+    isi_database(diagnoser, 2000, tahun=3)
+    arsip.gulung(sebelum=tahun_ini)
+    assert len(arsip.daftar_partisi()) >= 2
+    sebelum = _snapshot_baca(diagnoser)
+    rollup = database.fetch_query("SELECT * FROM rollup_harian ORDER BY tanggal, kategori_id, katalog_id")
+
+    assert diagnoser.rebuild_rollup() == len(rollup)
+    assert database.fetch_query("SELECT * FROM rollup_harian ORDER BY tanggal, kategori_id, katalog_id") == rollup
+    _sama(sebelum, _snapshot_baca(diagnoser))
+    with pytest.raises(RuntimeError):
+        database.kirim_tulis(lambda conn: migrasi.rebuild_rollup(conn, commit=False)).result()
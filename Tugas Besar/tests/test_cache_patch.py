@@ -0,0 +1,67 @@
+import datetime
+import pandas as pd
+import pytest
+import manajer_diagnosis
+from conftest import buat_problem
+from data_sintetis import isi_database
+from manajer_diagnosis import HardwareDiagnoser
+
+HARI_INI = datetime.date.today()
+PANGGILAN = [
+    ("get_dataframe_problems", {}),
+    ("get_dataframe_problems", {"filter_kategori": "Tampilan (Layar/Grafis)"}),
+    ("hitung_problems", {}),
+    ("hitung_problems", {"tanggal_mulai": HARI_INI - datetime.timedelta(days=30)}),
+    ("get_frekuensi_problem", {}),
+    ("get_jumlah_per_kategori", {}),
+    ("get_tren_problem_harian", {}),
+    ("get_tren_problem_bulanan", {"kategori_problem": "Tampilan (Layar/Grafis)"}),
+]
+
+
+@pytest.fixture
+def dua_diagnoser(diagnoser):
+    isi_database(diagnoser, 500, tahun=1)
+    dengan_cache = HardwareDiagnoser(gunakan_cache=True)
+    yield dengan_cache, diagnoser
+    dengan_cache.tutup()
+
+
+def _bandingkan(dengan_cache, tanpa_cache):
+    for nama, kwargs in PANGGILAN:
+        hasil, acuan = getattr(dengan_cache, nama)(**kwargs), getattr(tanpa_cache, nama)(**kwargs)
+        if isinstance(acuan, pd.DataFrame):
+            pd.testing.assert_frame_equal(hasil.reset_index(drop=True), acuan.reset_index(drop=True),
+                                          check_dtype=False, obj=f"{nama}({kwargs})")
+        else:
+            assert hasil == acuan, f"{nama}({kwargs})"
+
+
+def _ubah_data(diag):
+    assert diag.tambah_problem(buat_problem("Layar bergaris"))
+    assert diag.tambah_problem_batch([buat_problem("Kipas berisik", HARI_INI, "Suhu (Overheating)")] * 3)["berhasil"] == 3
+    terakhir = diag.get_semua_problems()[0]
+    terakhir.nama_problem, terakhir.kategori_problem = "Layar bergaris", "Tampilan (Layar/Grafis)"
+    assert diag.ubah_problem(terakhir)
+    lain = diag.get_semua_problems()[5]
+    assert diag.hapus_problem(lain.id)
+
+
+def test_cache_dipatch_dari_changelog(dua_diagnoser):
+    dengan_cache, tanpa_cache = dua_diagnoser
+    _bandingkan(dengan_cache, tanpa_cache)
+    _ubah_data(tanpa_cache)
+    _bandingkan(dengan_cache, tanpa_cache)
+    stat = dengan_cache.statistik_cache()
+    assert stat["patch"] == len(PANGGILAN)
+    _bandingkan(dengan_cache, tanpa_cache)
+    assert dengan_cache.statistik_cache()["hit"] == stat["hit"] + len(PANGGILAN)
+
+
+def test_cache_dihitung_ulang_jika_perubahan_terlalu_banyak(dua_diagnoser, monkeypatch):
+    dengan_cache, tanpa_cache = dua_diagnoser
+    monkeypatch.setattr(manajer_diagnosis, "CACHE_BATAS_PATCH", 2)
+    _bandingkan(dengan_cache, tanpa_cache)
+    _ubah_data(tanpa_cache)
+    _bandingkan(dengan_cache, tanpa_cache)
+    assert dengan_cache.statistik_cache()["patch"] == 0
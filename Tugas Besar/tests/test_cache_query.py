@@ -0,0 +1,98 @@
+import datetime
+import sqlite3
+import pytest
+import cache_query
+import database
+from cache_query import QueryCache
+from conftest import buat_problem
+from manajer_diagnosis import HardwareDiagnoser
+from model import tanggal_ke_hari
+
+
+class _Jam:
+    def __init__(self):
+        self.sekarang = 1000.0
+
+    def __call__(self):
+        return self.sekarang
+
+
+@pytest.fixture
+def jam(monkeypatch):
+    jam = _Jam()
+    monkeypatch.setattr(cache_query.time, "monotonic", jam)
+    return jam
+
+
+def test_ttl_kedaluwarsa(jam):
+    cache = QueryCache(maks_entri=10, ttl_detik=60)
+    cache.simpan("a", 1, "nilai")
+    jam.sekarang += 59
+    assert cache.ambil("a", 1) == ("hit", "nilai", None)
+    jam.sekarang += 2
+    assert cache.ambil("a", 1) == ("miss", None, None)
+    stat = cache.statistik()
+    assert (stat["hit"], stat["miss"], stat["kedaluwarsa"], stat["entri"]) == (1, 1, 1, 0)
+
+
+def test_lru_dan_jumlah_eviksi(jam):
+    cache = QueryCache(maks_entri=2, ttl_detik=0)
+    cache.simpan("a", 1, "A")
+    cache.simpan("b", 1, "B")
+    assert cache.ambil("a", 1)[0] == "hit"          # "a" baru dipakai: "b" yang paling lama
+    cache.simpan("c", 1, "C")
+    cache.simpan("d", 1, "D")
+    assert [cache.ambil(k, 1)[0] for k in "abcd"] == ["miss", "miss", "hit", "hit"]
+    stat = cache.statistik()
+    assert (stat["eviksi"], stat["entri"], stat["maks_entri"]) == (2, 2, 2)
+
+
+def test_generasi_lama_jadi_basi_dengan_info():
+    cache = QueryCache()
+    cache.simpan("a", (1, 7), "lama", info=42)
+    assert cache.ambil("a", (1, 8)) == ("basi", "lama", 42)
+    assert cache.statistik()["invalidasi"] == 1
+
+
+def _tulis_dari_koneksi_lain(nama: str):
+    conn = sqlite3.connect(database.DB_PATH)
+    try:
+        with conn:
+            conn.execute("""
+                INSERT INTO problems (nama_problem, deskripsi_problem, kategori_problem, penyebab, solusi, tanggal_masuk)
+                VALUES (?, '', 'Lainnya', 'Tidak diketahui', 'Cek ulang', ?)
+            """, (nama, tanggal_ke_hari(datetime.date.today())))
+    finally:
+        conn.close()
+
+
+@pytest.fixture
+def diag_cache(diagnoser):
+    diag = HardwareDiagnoser(gunakan_cache=True)
+    yield diag
+    diag.tutup()
+
+
+def test_tulisan_koneksi_lain_membatalkan_cache(diag_cache):
+    assert diag_cache.tambah_problem(buat_problem())
+    assert len(diag_cache.get_halaman_problems()) == 1
+    assert len(diag_cache.get_halaman_problems()) == 1
+    assert diag_cache.statistik_cache()["hit"] == 1
+
+    # Commit dari koneksi di luar pool/penulis proses ini hanya terlihat lewat PRAGMA data_version.
+    _tulis_dari_koneksi_lain("Kipas berisik")
+    assert sorted(diag_cache.get_halaman_problems()["Masalah"]) == ["Kipas berisik", "Layar berkedip"]
+    assert diag_cache.statistik_cache()["invalidasi"] == 1
+    # Method ber-patch memperbarui hasil basi dari change log, juga untuk tulisan dari koneksi lain.
+    assert diag_cache.hitung_problems() == 2
+    _tulis_dari_koneksi_lain("SSD tidak terbaca")
+    assert diag_cache.hitung_problems() == 3
+    assert diag_cache.statistik_cache()["patch"] == 1
+
+
+def test_dataframe_dari_cache_adalah_salinan(diag_cache):
+    assert diag_cache.tambah_problem(buat_problem())
+    df = diag_cache.get_halaman_problems()
+    df.loc[0, "Masalah"] = "diubah pemanggil"
+    assert diag_cache.get_halaman_problems()["Masalah"].tolist() == ["Layar berkedip"]
+    assert diag_cache.statistik_cache()["hit"] == 1
@@ -0,0 +1,91 @@
+import datetime
+import os
+import sqlite3
+import threading
+import pytest
+import arsip
+import cadangan
+import database
+from conftest import buat_problem
+from data_sintetis import isi_database
+from manajer_diagnosis import HardwareDiagnoser
+
+
+def _jumlah_tiket(path: str) -> int:
+    """Tiket di database `path` (problems_data) ditambah tiket di partisi arsip yang terdaftar di sana."""
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        return conn.execute("SELECT (SELECT COUNT(*) FROM problems_data)"
+                            " + (SELECT COALESCE(SUM(jumlah), 0) FROM arsip_partisi)").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def _cadangkan_sambil_menulis(diag, direktori: str, label: str) -> tuple[dict, int]:
+    """Cadangkan dengan langkah kecil sementara thread lain terus menambah tiket. Return: (manifest, commit)."""
+    berhenti, commit = threading.Event(), [0]
+
+    def tulis():
+        while not berhenti.is_set():
+            assert diag.tambah_problem(buat_problem("Kipas berisik"))
+            commit[0] += 1
+    thread = threading.Thread(target=tulis)
+    thread.start()
+    try:
+        manifest = cadangan.buat_cadangan(database.DB_PATH, direktori, simpan=None, halaman=4, jeda_ms=2, label=label)
+    finally:
+        berhenti.set()
+        thread.join()
+    return manifest, commit[0]
+
+
+def test_cadangan_online_saat_penulis_commit_lalu_pulihkan(diagnoser, tmp_path):
+    isi_database(diagnoser, 3000, tahun=3)
+    arsip.gulung(sebelum=datetime.date.today().year)
+    berkas_arsip = sorted(p["berkas"] for p in arsip.daftar_partisi())
+    assert berkas_arsip
+    direktori = str(tmp_path / "cadangan")
+
+    manifest, commit = _cadangkan_sambil_menulis(diagnoser, direktori, "satu")
+    assert commit > 0 and manifest["mode"] == "snapshot WAL" and manifest["ulang"] == 0
+    salinan = os.path.join(manifest["path"], manifest["database"])
+    assert cadangan.periksa_integritas(salinan) == []
+    assert cadangan.periksa_cadangan(manifest["path"]) == []
+    # Salinan berdiri sendiri (tanpa -wal) dan berisi satu snapshot: tidak lebih dari isi database sesudahnya.
+    assert not os.path.exists(salinan + "-wal")
+    jumlah_salinan = _jumlah_tiket(salinan)
+    assert 3000 <= jumlah_salinan <= diagnoser.hitung_problems()
+
+    # File arsip ikut disalin; cadangan berikutnya men-hardlink file yang sama.
+    folder_arsip = os.path.basename(arsip.direktori_arsip(salinan))
+    assert manifest["arsip_ditautkan"] == 0
+    assert sorted(os.listdir(os.path.join(manifest["path"], folder_arsip))) == berkas_arsip
+    kedua, _ = _cadangkan_sambil_menulis(diagnoser, direktori, "dua")
+    assert kedua["arsip_ditautkan"] == len(berkas_arsip)
+    for berkas in berkas_arsip:
+        pertama, ditautkan = (os.stat(os.path.join(m["path"], folder_arsip, berkas)) for m in (manifest, kedua))
+        assert (pertama.st_ino, pertama.st_nlink) == (ditautkan.st_ino, 2)
+
+    assert diagnoser.tambah_problem_batch([buat_problem("Layar mati")] * 100)["berhasil"] == 100
+    diagnoser.tutup()
+    database.tutup_pool()
+    hasil = cadangan.pulihkan(manifest["path"], database.DB_PATH, direktori=direktori)
+    assert os.path.basename(hasil["pengaman"]).endswith("_sebelum_pulih")
+
+    diag = HardwareDiagnoser(gunakan_cache=False)
+    try:
+        assert diag.hitung_problems() == jumlah_salinan
+        assert cadangan.periksa_integritas(database.DB_PATH) == []
+        assert sorted(p["berkas"] for p in arsip.daftar_partisi()) == berkas_arsip
+        assert diag.get_frekuensi_problem()["Jumlah Kejadian"].sum() == jumlah_salinan
+    finally:
+        diag.tutup()
+
+
+def test_cadangan_gagal_cek_integritas_tidak_meninggalkan_folder(diagnoser, tmp_path, monkeypatch):
+    assert diagnoser.tambah_problem(buat_problem())
+    direktori = str(tmp_path / "cadangan")
+    monkeypatch.setattr(cadangan, "periksa_integritas", lambda path, cepat=False: ["rusak"])
+    with pytest.raises(RuntimeError, match="rusak"):
+        cadangan.buat_cadangan(database.DB_PATH, direktori, simpan=None)
+    assert os.listdir(direktori) == [] and cadangan.daftar_cadangan(direktori) == []
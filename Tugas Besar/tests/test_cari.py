@@ -0,0 +1,49 @@
+import datetime
+import database
+from conftest import buat_problem
+
+
+def _id_hasil(diag, teks: str, **kwargs) -> list[int]:
+    return diag.cari_problem(teks, limit=100, **kwargs)["ID"].tolist()
+
+
+def test_fts_ikut_tambah_ubah_dan_hapus(diagnoser):
+    assert diagnoser.tambah_problem(buat_problem("Layar berkedip"))
+    assert diagnoser.tambah_problem(buat_problem("Kipas berisik", kategori="Suhu (Overheating)"))
+    layar, kipas = sorted(p.id for p in diagnoser.get_semua_problems())
+    assert _id_hasil(diagnoser, "berkedip") == [layar]
+
+    problem = diagnoser.get_problem_by_id(layar)
+    problem.nama_problem, problem.deskripsi_problem = "Monitor bergaris", "Muncul garis vertikal"
+    problem.solusi = "Ganti panel monitor"
+    assert diagnoser.ubah_problem(problem)
+    assert _id_hasil(diagnoser, "berkedip") == []                  # isi lama tidak tertinggal di indeks
+    assert _id_hasil(diagnoser, "panel") == [layar]
+    assert _id_hasil(diagnoser, "bergaris monitor") == [layar]
+
+    assert diagnoser.hapus_problem(layar)
+    assert _id_hasil(diagnoser, "monitor") == []
+    assert _id_hasil(diagnoser, "kipas") == [kipas]
+    # Indeks FTS (external content) tetap konsisten dengan tabel problems_data.
+    database.kirim_tulis(lambda conn: conn.execute(
+        "INSERT INTO problems_fts (problems_fts) VALUES ('integrity-check')")).result()
+
+
+def test_prefix_sorotan_filter_dan_input_bebas(diagnoser):
+    kemarin = datetime.date.today() - datetime.timedelta(days=1)
+    assert diagnoser.tambah_problem(buat_problem("Baterai cepat habis", kemarin, "Power (Baterai/Charger)"))
+    assert diagnoser.tambah_problem(buat_problem("Baterai CMOS lemah", kategori="Booting (Tidak Nyala/BSOD)"))
+
+    hasil = diagnoser.cari_problem("bater")
+    assert len(hasil) == 2 and "**Baterai**" in hasil["Masalah (Sorotan)"].iloc[0]
+    assert hasil["Skor"].is_monotonic_increasing                   # BM25: lebih kecil = lebih relevan
+    booting = diagnoser.cari_problem("baterai", kategori="Booting (Tidak Nyala/BSOD)")
+    assert booting["Masalah"].tolist() == ["Baterai CMOS lemah"]
+    assert diagnoser.cari_problem("baterai", limit=1, offset=1)["ID"].tolist() == hasil["ID"].tolist()[1:]
+    assert hasil["Tanggal"].map(type).eq(datetime.date).all()
+
+    # Sintaks FTS5 dari pengguna dibaca sebagai kata biasa, bukan query yang error.
+    for teks in ('"baterai', "baterai)", "(baterai", "baterai^", "-baterai", "baterai*"):
+        assert len(diagnoser.cari_problem(teks)) == 2, teks
+    assert len(diagnoser.cari_problem("cmos: (lemah")) == 1
+    assert diagnoser.cari_problem("").empty and list(diagnoser.cari_problem("").columns) == list(hasil.columns)
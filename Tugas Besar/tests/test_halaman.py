@@ -0,0 +1,46 @@
+import datetime
+from conftest import buat_problem
+
+HARI_INI = datetime.date.today()
+KATEGORI = ("Tampilan (Layar/Grafis)", "Audio")
+
+
+def _isi(diag) -> list[tuple]:
+    """35 tiket di 4 tanggal (banyak yang bertanggal sama). Return: (tanggal, id, kategori) urut terbaru dulu."""
+    tiket = [buat_problem(f"Masalah {i}", HARI_INI - datetime.timedelta(days=i % 4), KATEGORI[i % 3 == 0])
+             for i in range(35)]
+    assert diag.tambah_problem_batch(tiket)["berhasil"] == 35
+    return sorted(((p.tanggal_masuk, p.id, p.kategori_problem) for p in diag.get_semua_problems()), reverse=True)
+
+
+def _semua_halaman(diag, batas: int, **filter) -> list[list[tuple]]:
+    halaman, setelah = [], None
+    while True:
+        df = diag.get_halaman_problems(batas=batas, setelah=setelah, **filter)
+        if df.empty: return halaman
+        halaman.append(list(zip(df["Tanggal"], df["ID"])))
+        setelah = (df["Tanggal"].iloc[-1], int(df["ID"].iloc[-1]))
+
+
+def test_keyset_melewati_tanggal_kembar_tanpa_duplikat(diagnoser):
+    semua = _isi(diagnoser)
+    halaman = _semua_halaman(diagnoser, 6)
+    assert [len(h) for h in halaman] == [6] * 5 + [5]
+    assert [baris for h in halaman for baris in h] == [(t, i) for t, i, _ in semua]
+    # Kursor boleh berupa date, string ISO, atau nomor hari: hasilnya sama.
+    tanggal, id_problem = halaman[0][-1]
+    for kursor in ((tanggal.isoformat(), id_problem), ((tanggal - datetime.date(1970, 1, 1)).days, id_problem)):
+        assert list(diagnoser.get_halaman_problems(batas=6, setelah=kursor)["ID"]) == [i for _, i in halaman[1]]
+
+
+def test_keyset_dengan_filter_dan_iterator(diagnoser):
+    semua = _isi(diagnoser)
+    audio = [(t, i) for t, i, k in semua if k == "Audio" and t < HARI_INI]
+    halaman = _semua_halaman(diagnoser, 4, filter_kategori="Audio", tanggal_akhir=HARI_INI - datetime.timedelta(days=1))
+    assert [baris for h in halaman for baris in h] == audio
+    assert diagnoser.hitung_problems("Audio", tanggal_akhir=HARI_INI - datetime.timedelta(days=1)) == len(audio)
+
+    assert [(p.tanggal_masuk, p.id) for p in diagnoser.iter_problems(batch_size=7)] == [(t, i) for t, i, _ in semua]
+    batch = list(diagnoser.iter_problems(batch_size=7, sebagai_dataframe=True))
+    assert [len(df) for df in batch] == [7] * 5
+    assert [i for df in batch for i in df["ID"]] == [i for _, i, _ in semua]
@@ -0,0 +1,45 @@
+import asyncio
+import datetime
+import arsip
+from conftest import buat_problem
+from manajer_async import AsyncHardwareDiagnoser
+
+
+def _tambah(diag, jumlah: int = 3, tanggal=None) -> list[int]:
+    for i in range(jumlah):
+        assert diag.tambah_problem(buat_problem(f"Layar berkedip {i}", tanggal))
+    return sorted(p.id for p in diag.get_semua_problems())[-jumlah:]
+
+
+def test_hapus_problem_hanya_true_jika_ada_yang_terhapus(diagnoser):
+    tahun_lalu = datetime.date.today().year - 1
+    (id_arsip,) = _tambah(diagnoser, 1, datetime.date(tahun_lalu, 6, 1))
+    arsip.gulung(tahun=[tahun_lalu])
+    id_aktif, id_lain = _tambah(diagnoser, 2)
+    terhapus = []
+    diagnoser._setelah_hapus = terhapus.extend
+
+    assert diagnoser.hapus_problem(id_aktif) is True
+    assert diagnoser.hapus_problem(id_aktif) is False           # sudah terhapus
+    assert diagnoser.hapus_problem(id_lain + 1000) is False     # tidak pernah ada
+    assert diagnoser.hapus_problem(id_arsip) is False           # arsip hanya-baca
+    assert terhapus == [id_aktif]
+    assert diagnoser.get_problem_by_id(id_arsip) is not None
+    assert [p.id for p in diagnoser.get_semua_problems()] == [id_lain, id_arsip]
+
+
+def test_hapus_problem_tanpa_tunggu_mengembalikan_future(diagnoser):
+    (id_problem,) = _tambah(diagnoser, 1)
+    assert diagnoser.hapus_problem(id_problem, tunggu=False).result() is True
+    assert diagnoser.hapus_problem(id_problem, tunggu=False).result() is False
+
+
+def test_hapus_problem_async(diagnoser):
+    id_aktif, id_lain = _tambah(diagnoser, 2)
+
+    async def utama():
+        async with AsyncHardwareDiagnoser(diagnoser) as adiag:
+            return [await adiag.hapus_problem(i) for i in (id_aktif, id_aktif, id_lain + 1000)]
+
+    assert asyncio.run(utama()) == [True, False, False]
+    assert [p.id for p in diagnoser.get_semua_problems()] == [id_lain]
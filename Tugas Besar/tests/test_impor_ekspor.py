@@ -0,0 +1,45 @@
+import http.client
+import json
+import threading
+import pytest
+import impor_ekspor
+from layanan_http import ServerDiagnosis
+
+VALID = {"nama_problem": "Layar berkedip", "penyebab": "Kabel longgar", "solusi": "Pasang ulang kabel",
+         "kategori_problem": "Tampilan (Layar/Grafis)", "tanggal_masuk": "2026-01-05"}
+BARIS = [json.dumps(VALID), "42", "[1, 2]", '"teks"', "null", "{rusak", json.dumps({**VALID, "nama_problem": "Kipas"})]
+
+
+def test_baca_ndjson_record_bukan_objek_jadi_error():
+    hasil = list(impor_ekspor.baca_ndjson(b.encode() for b in BARIS))
+    assert [type(r).__name__ for r in hasil] == ["dict"] + ["ValueError"] * 5 + ["dict"]
+    with pytest.raises(ValueError):
+        impor_ekspor.record_ke_problem([1, 2])
+
+
+def test_impor_records_baris_bukan_objek_masuk_gagal_detail(diagnoser):
+    hasil = impor_ekspor.impor_records(diagnoser, impor_ekspor.baca_ndjson(b.encode() for b in BARIS))
+    assert (hasil["berhasil"], hasil["gagal"]) == (2, 5)
+    assert [nomor for nomor, _ in hasil["gagal_detail"]] == [2, 3, 4, 5, 6]
+    assert sorted(p.nama_problem for p in diagnoser.get_semua_problems()) == ["Kipas", "Layar berkedip"]
+
+
+def test_http_ingest_baris_bukan_objek_tidak_500(diagnoser):
+    server = ServerDiagnosis(("127.0.0.1", 0), diagnoser)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        conn = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=10)
+        conn.request("POST", "/problems", body="\n".join(BARIS).encode(), headers={"Content-Type": "application/x-ndjson"})
+        respons = conn.getresponse()
+        isi = json.loads(respons.read())
+        assert respons.status == 200
+        assert (isi["berhasil"], isi["gagal"]) == (2, 5)
+        # Koneksi keep-alive tetap bisa dipakai untuk permintaan berikutnya.
+        conn.request("GET", "/problems")
+        respons = conn.getresponse()
+        assert respons.status == 200 and len(json.loads(respons.read())["data"]) == 2
+        conn.close()
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,63 @@
+import logging
+import threading
+import pytest
+import database
+import instrumentasi
+from conftest import buat_problem
+
+
+@pytest.fixture
+def log_tertangkap():
+    catatan = []
+    handler = logging.Handler(logging.DEBUG)
+    handler.emit = catatan.append
+    logger = logging.getLogger("diagnosis")
+    level_lama = logger.level
+    logger.addHandler(handler)
+    logger.setLevel(logging.DEBUG)
+    yield catatan
+    logger.removeHandler(handler)
+    logger.setLevel(level_lama)
+
+
+def test_ambang_lambat_per_baris_untuk_tulisan_bulk():
+    inst = instrumentasi.Instrumentasi(aktif=True, ambang_lambat_ms=100)
+    assert inst.lambat(0.5, "fetch", 10_000)
+    assert not inst.lambat(0.5, "execute_many", 10_000)
+    assert inst.lambat(0.5, "execute_many", 2)
+    assert inst.lambat(0.5, "execute_many", 0)              # batch gagal: durasi penuh
+
+
+def test_impor_bulk_tidak_dicatat_lambat(diagnoser, monkeypatch, log_tertangkap):
+    inst = instrumentasi.Instrumentasi(aktif=True, ambang_lambat_ms=1)
+    monkeypatch.setattr(database, "_instrumentasi", inst)
+    assert diagnoser.tambah_problem_batch([buat_problem(f"Layar {i}") for i in range(5000)])["berhasil"] == 5000
+    assert [s for s in inst.top_query(50) if s["jenis"] == "execute_many"][0]["maks_ms"] >= 1
+    assert inst.query_lambat() == []
+    assert [r for r in log_tertangkap if r.levelno >= logging.WARNING] == []
+
+
+def _sambil_interrupt(conn, fungsi):
+    """Jalankan `fungsi` sambil terus meng-interrupt `conn` sampai `fungsi` kembali."""
+    selesai = threading.Event()
+
+    def interrupt():
+        while not selesai.wait(0.02):
+            conn.interrupt()
+    thread = threading.Thread(target=interrupt, daemon=True)
+    thread.start()
+    try:
+        return fungsi()
+    finally:
+        selesai.set()
+        thread.join()
+
+
+def test_baca_yang_di_interrupt_dicatat_debug(diagnoser, log_tertangkap):
+    tanpa_akhir = "WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n) SELECT COUNT(*) FROM n"
+    with database.snapshot() as conn:
+        assert _sambil_interrupt(conn, lambda: database.get_dataframe(tanpa_akhir)).empty
+        assert _sambil_interrupt(conn, lambda: database.fetch_query(tanpa_akhir)) is None
+    gagal = [r for r in log_tertangkap if "interrupted" in r.getMessage()]
+    assert len(gagal) == 2 and {r.levelno for r in gagal} == {logging.DEBUG}
+    assert database.fetch_query("SELECT COUNT(*) FROM problems")[0][0] == 0
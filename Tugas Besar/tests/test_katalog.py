@@ -0,0 +1,39 @@
+import database
+from conftest import buat_problem
+
+
+def _frekuensi(diag) -> dict:
+    df = diag.get_frekuensi_problem()
+    return dict(zip(df["Masalah"], df["Jumlah Kejadian"]))
+
+
+def test_nama_beda_spasi_dan_huruf_jadi_satu_entri(diagnoser):
+    for nama in ("WiFi Hilang", "wifi  hilang", " WIFI\tHilang ", "Layar berkedip"):
+        assert diagnoser.tambah_problem(buat_problem(nama, kategori="Jaringan (WiFi/LAN)"))
+
+    assert _frekuensi(diagnoser) == {"WiFi Hilang": 3, "Layar berkedip": 1}
+    assert database.fetch_query("SELECT COUNT(*) FROM katalog_problem")[0][0] == 2
+    # Nama tampilan berasal dari entri katalog (nama pertama yang didaftarkan).
+    assert {p.nama_problem for p in diagnoser.get_semua_problems()} == {"WiFi Hilang", "Layar berkedip"}
+    assert len(diagnoser.cari_problem("wifi")) == 3
+
+    # Kategori disimpan sebagai id integer; tabel kategori tidak bertambah untuk kategori yang sama.
+    row = database.fetch_query("SELECT typeof(kategori_id), typeof(katalog_id) FROM problems_data LIMIT 1")[0]
+    assert tuple(row) == ("integer", "integer")
+    jumlah_kategori = database.fetch_query("SELECT COUNT(*) FROM kategori")[0][0]
+    assert diagnoser.tambah_problem(buat_problem("Kipas", kategori="Jaringan (WiFi/LAN)"))
+    assert database.fetch_query("SELECT COUNT(*) FROM kategori")[0][0] == jumlah_kategori
+
+
+def test_alias_menggabungkan_tiket_lama_dan_baru(diagnoser):
+    for nama in ("Internet putus", "internet  putus", "Koneksi hilang"):
+        assert diagnoser.tambah_problem(buat_problem(nama))
+    dipindah = diagnoser.tambah_alias_problem("Internet putus", "Koneksi hilang")
+    assert dipindah == 2
+    assert _frekuensi(diagnoser) == {"Koneksi hilang": 3}
+
+    # Tiket baru dengan nama alias (ejaan apa pun) langsung masuk entri tujuan.
+    assert diagnoser.tambah_problem(buat_problem("INTERNET putus"))
+    assert _frekuensi(diagnoser) == {"Koneksi hilang": 4}
+    assert {p.nama_problem for p in diagnoser.get_semua_problems()} == {"Koneksi hilang"}
+    assert diagnoser.rebuild_rollup() and _frekuensi(diagnoser) == {"Koneksi hilang": 4}
@@ -0,0 +1,78 @@
+import http.client
+import json
+import threading
+import pytest
+from layanan_http import ServerDiagnosis
+
+TIKET = {"nama_problem": "Layar berkedip", "penyebab": "Kabel longgar", "solusi": "Pasang ulang kabel",
+         "kategori_problem": "Tampilan (Layar/Grafis)", "tanggal_masuk": "2026-01-05"}
+
+
+@pytest.fixture
+def klien(diagnoser):
+    """Server di port bebas + satu koneksi keep-alive ke sana."""
+    server = ServerDiagnosis(("127.0.0.1", 0), diagnoser)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    conn = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=10)
+    yield conn
+    conn.close()
+    server.shutdown()
+    server.server_close()
+
+
+def _minta(conn, metode: str, path: str, body: bytes | None = None, **header) -> tuple[int, dict, dict | None]:
+    conn.request(metode, path, body=body, headers={k.replace("_", "-"): v for k, v in header.items()})
+    respons = conn.getresponse()
+    isi = respons.read()
+    return respons.status, dict(respons.getheaders()), json.loads(isi) if isi else None
+
+
+def _ingest(conn, *baris: str) -> dict:
+    status, _, isi = _minta(conn, "POST", "/problems", "\n".join(baris).encode(),
+                            Content_Type="application/x-ndjson")
+    assert status == 200
+    return isi
+
+
+def test_etag_304_dan_etag_baru_setelah_tulis(klien):
+    _ingest(klien, json.dumps(TIKET))
+    status, header, isi = _minta(klien, "GET", "/problems")
+    etag = header["ETag"]
+    assert status == 200 and len(isi["data"]) == 1
+
+    status, header, isi = _minta(klien, "GET", "/problems", If_None_Match=etag)
+    assert (status, header["ETag"], isi) == (304, etag, None)
+    # ETag berlaku untuk seluruh data, jadi endpoint lain pun 304.
+    assert _minta(klien, "GET", "/statistik/frekuensi", If_None_Match=f'"lain", {etag}')[0] == 304
+
+    _ingest(klien, json.dumps({**TIKET, "nama_problem": "Kipas berisik"}))
+    status, header, isi = _minta(klien, "GET", "/problems", If_None_Match=etag)
+    assert status == 200 and header["ETag"] != etag and len(isi["data"]) == 2
+    assert _minta(klien, "GET", "/versi")[2]["etag"] == header["ETag"]
+
+
+def test_baris_bukan_objek_dihitung_gagal(klien):
+    isi = _ingest(klien, json.dumps(TIKET), "[1, 2]", "{rusak", json.dumps({**TIKET, "solusi": ""}))
+    assert (isi["berhasil"], isi["gagal"]) == (1, 3)
+    assert [nomor for nomor, _ in isi["gagal_detail"]] == [2, 3, 4]
+    assert len(_minta(klien, "GET", "/problems")[2]["data"]) == 1
+
+
+def test_hapus_problem(klien):
+    _ingest(klien, json.dumps(TIKET))
+    (tiket,) = _minta(klien, "GET", "/problems")[2]["data"]
+    etag = _minta(klien, "GET", "/versi")[1]["ETag"]
+
+    status, _, isi = _minta(klien, "DELETE", f"/problems/{tiket['ID']}")
+    assert status == 200 and isi["terhapus"]
+    assert _minta(klien, "DELETE", f"/problems/{tiket['ID']}")[0] == 404
+    assert _minta(klien, "GET", f"/problems/{tiket['ID']}")[0] == 404
+    assert _minta(klien, "GET", "/problems", If_None_Match=etag)[0] == 200
+
+
+def test_permintaan_salah(klien):
+    assert _minta(klien, "GET", "/problems?batas=nol")[0] == 400
+    assert _minta(klien, "GET", "/statistik/tren?periode=tahunan")[0] == 400
+    assert _minta(klien, "DELETE", "/cari")[0] == 405
+    assert _minta(klien, "GET", "/tidak-ada")[0] == 404
@@ -0,0 +1,101 @@
+import asyncio
+import time
+import pytest
+import database
+from conftest import pakai_db
+from data_sintetis import isi_database
+from manajer_async import AntreanPenuh, AsyncHardwareDiagnoser
+from manajer_diagnosis import HardwareDiagnoser
+
+JUMLAH = 30_000
+JEDA_MAKS_DETIK = 0.25
+
+
+@pytest.fixture(scope="module")
+def diag_besar(tmp_path_factory):
+    path_lama = database.DB_PATH
+    pakai_db(str(tmp_path_factory.mktemp("async") / "uji.db"))
+    diag = HardwareDiagnoser(gunakan_cache=False)
+    isi_database(diag, JUMLAH)
+    yield diag
+    diag.tutup()
+    pakai_db(path_lama)
+
+
+async def _tunggu_pool_kembali(adiag, batas_detik: float = 5.0) -> dict:
+    batas = time.monotonic() + batas_detik
+    while True:
+        pool = adiag.statistik()["pool"]
+        if pool["idle"] == pool["terbuka"] or time.monotonic() > batas: return pool
+        await asyncio.sleep(0.01)
+
+
+def test_event_loop_tetap_responsif(diag_besar):
+    async def utama():
+        async with AsyncHardwareDiagnoser(diag_besar, maks_thread=2) as adiag:
+            jeda, selesai = [0.0], [False]
+
+            async def detak():
+                while not selesai[0]:
+                    mulai = time.perf_counter()
+                    await asyncio.sleep(0.005)
+                    jeda[0] = max(jeda[0], time.perf_counter() - mulai - 0.005)
+            tugas_detak = asyncio.create_task(detak())
+            await asyncio.sleep(0.01)
+            mulai = time.perf_counter()
+            hasil = await asyncio.gather(adiag.get_dataframe_problems(), adiag.get_tren_problem_bulanan(),
+                                         adiag.get_dataframe_problems(), adiag.hitung_problems())
+            durasi = time.perf_counter() - mulai
+            selesai[0] = True
+            await tugas_detak
+            return hasil, durasi, jeda[0], await _tunggu_pool_kembali(adiag)
+
+    hasil, durasi, jeda, pool = asyncio.run(utama())
+    assert len(hasil[0]) == len(hasil[2]) == hasil[3] == JUMLAH
+    assert jeda < JEDA_MAKS_DETIK
+    assert jeda < durasi / 2
+    assert pool["terbuka"] <= 2 and pool["idle"] == pool["terbuka"]
+
+
+def test_pembatalan_query_berjalan(diag_besar):
+    async def utama():
+        async with AsyncHardwareDiagnoser(diag_besar, maks_thread=1) as adiag:
+            await adiag.get_dataframe_problems()     # pemanasan: import pandas tidak ikut terukur
+            mulai = time.perf_counter()
+            jumlah = len(await adiag.get_dataframe_problems())
+            durasi_penuh = time.perf_counter() - mulai
+            tugas = asyncio.create_task(adiag.get_dataframe_problems())
+            # Tunggu sampai query benar-benar berjalan (koneksi sedang dipinjam), baru dibatalkan.
+            while adiag.statistik()["pool"]["idle"] == adiag.statistik()["pool"]["terbuka"]:
+                await asyncio.sleep(0.001)
+            await asyncio.sleep(0.02)
+            mulai = time.perf_counter()
+            tugas.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await tugas
+            pool = await _tunggu_pool_kembali(adiag)
+            durasi_batal = time.perf_counter() - mulai
+            stat = adiag.statistik()
+            jumlah_lagi = len(await adiag.get_dataframe_problems())
+            return stat, pool, (jumlah, jumlah_lagi), durasi_batal, durasi_penuh
+
+    stat, pool, jumlah, durasi_batal, durasi_penuh = asyncio.run(utama())
+    assert stat["dibatalkan"] == 1 and stat["berjalan"] == 0 and stat["selesai"] == 2
+    # Query yang di-interrupt berhenti lebih cepat daripada menunggu query selesai; koneksinya kembali utuh.
+    assert durasi_batal < durasi_penuh / 2
+    assert pool["terbuka"] == 1 and pool["idle"] == 1 and pool["dibuang"] == 0
+    assert jumlah == (JUMLAH, JUMLAH)
+
+
+def test_antrean_penuh_ditolak(diag_besar):
+    async def utama():
+        async with AsyncHardwareDiagnoser(diag_besar, maks_antrean=1, tolak_saat_penuh=True) as adiag:
+            pertama = asyncio.create_task(adiag.get_dataframe_problems())
+            await asyncio.sleep(0)
+            with pytest.raises(AntreanPenuh):
+                await adiag.hitung_problems()
+            return len(await pertama), adiag.statistik()
+
+    jumlah, stat = asyncio.run(utama())
+    assert jumlah == JUMLAH
+    assert stat["ditolak"] == 1 and stat["selesai"] == 1
@@ -0,0 +1,74 @@
+import sqlite3
+import pytest
+import database
+import migrasi
+from conftest import buat_problem, pakai_db, salin_db_bawaan
+from manajer_diagnosis import HardwareDiagnoser
+from model import hari_ke_tanggal, parse_tanggal
+
+KOLOM = "id, nama_problem, deskripsi_problem, kategori_problem, penyebab, solusi, tanggal_masuk"
+
+
+@pytest.fixture
+def db_bawaan(tmp_path):
+    path_lama = database.DB_PATH
+    path = salin_db_bawaan(str(tmp_path / "bawaan.db"))
+    conn = sqlite3.connect(path)
+    asli = conn.execute(f"SELECT {KOLOM} FROM problems ORDER BY id").fetchall()
+    seq = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'problems'").fetchone()[0]
+    conn.close()
+    yield path, asli, seq
+    pakai_db(path_lama)
+
+
+def _baris(conn) -> list[tuple]:
+    return [(*row[:6], hari_ke_tanggal(row[6])) for row in conn.execute(f"SELECT {KOLOM} FROM problems ORDER BY id")]
+
+
+def test_migrasi_6_sampai_8_pada_db_bawaan(db_bawaan):
+    path, asli, seq = db_bawaan
+    asli = [(*row[:6], parse_tanggal(row[6])) for row in asli]
+    assert asli, "database bawaan seharusnya berisi tiket contoh"
+    conn = sqlite3.connect(path)
+    try:
+        assert migrasi.jalankan_migrasi(conn, sampai_versi=5) == 5
+
+        assert migrasi.jalankan_migrasi(conn, sampai_versi=6) == 6
+        assert {t for (t,) in conn.execute("SELECT DISTINCT typeof(tanggal_masuk) FROM problems")} == {"integer"}
+        assert _baris(conn) == asli
+
+        assert migrasi.jalankan_migrasi(conn, sampai_versi=7) == 7
+        jenis = dict(conn.execute("SELECT name, type FROM sqlite_master WHERE name IN ('problems', 'problems_data')"))
+        assert jenis == {"problems": "view", "problems_data": "table"}
+        assert _baris(conn) == asli
+        assert conn.execute("SELECT SUM(jumlah) FROM rollup_harian").fetchone()[0] == len(asli)
+
+        assert migrasi.jalankan_migrasi(conn) == migrasi.VERSI_TERBARU == 8
+        assert conn.execute("SELECT COUNT(*) FROM arsip_partisi").fetchone()[0] == 0
+        assert migrasi.jalankan_migrasi(conn) == 8      # idempoten
+
+        assert conn.execute("PRAGMA integrity_check").fetchone()[0] == "ok"
+        assert conn.execute("PRAGMA foreign_key_check").fetchall() == []
+        conn.execute("INSERT INTO problems_fts (problems_fts) VALUES ('integrity-check')")
+        seq_data = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'problems_data'").fetchone()[0]
+        assert seq_data == seq
+    finally:
+        conn.close()
+
+
+def test_db_bawaan_terbaca_setelah_migrasi(db_bawaan):
+    path, asli, seq = db_bawaan
+    pakai_db(path)
+    diag = HardwareDiagnoser(gunakan_cache=False)
+    try:
+        problems = diag.get_semua_problems()
+        assert sorted((p.id, p.nama_problem, p.tanggal_masuk) for p in problems) == \
+            [(row[0], row[1], parse_tanggal(row[6])) for row in asli]
+        assert set(diag.cari_problem("SSD")["ID"]) == {row[0] for row in asli if "SSD" in " ".join(row[1:6])}
+        assert diag.get_frekuensi_problem()["Jumlah Kejadian"].sum() == len(asli)
+
+        # Id yang pernah dihapus tidak dipakai ulang: sequence ikut dipindah ke problems_data.
+        assert diag.tambah_problem(buat_problem())
+        assert max(p.id for p in diag.get_semua_problems()) == seq + 1
+    finally:
+        diag.tutup()
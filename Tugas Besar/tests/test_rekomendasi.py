@@ -0,0 +1,84 @@
+import multiprocessing
+import numpy as np
+import pytest
+import rekomendasi
+from conftest import DIREKTORI_APLIKASI, buat_problem
+
+NAMA = ["Layar berkedip", "Kipas berisik", "Baterai cepat habis", "WiFi tidak terdeteksi", "Laptop lambat saat booting",
+        "Keyboard beberapa tombol mati", "Suara speaker pecah", "SSD tidak terbaca"]
+
+
+def _indeks(tmp_path) -> rekomendasi.IndeksRekomendasi:
+    indeks = rekomendasi.IndeksRekomendasi(str(tmp_path / "indeks"))
+    indeks.tambah((i + 1, nama, f"{nama} sejak kemarin") for i, nama in enumerate(NAMA * 20))
+    return indeks
+
+
+def test_teks_tidak_mirip_tidak_dapat_hasil(tmp_path):
+    indeks = _indeks(tmp_path)
+    for teks in ("xyzqw", "asdf qwer", "printer", "nasi goreng"):
+        assert indeks.cari(rekomendasi.teks_problem(teks)) == []
+    hasil = indeks.cari(rekomendasi.teks_problem("layar berkedip terus"), k=3)
+    assert len(hasil) == 3 and all(NAMA[(i - 1) % len(NAMA)] == "Layar berkedip" for i, _ in hasil)
+    assert hasil[0][1] >= rekomendasi.REKOMENDASI_MIN_SKOR
+
+
+def test_skor_cosine_tidak_bergantung_panjang_query(tmp_path):
+    indeks = _indeks(tmp_path)
+    teks = rekomendasi.teks_problem("Suara speaker pecah", "Suara speaker pecah sejak kemarin")
+    hasil = indeks.cari(teks, k=100, min_skor=-1)
+    assert hasil[0][1] == pytest.approx(1.0, abs=1e-4)                  # dokumen yang identik
+    assert all(-1e-6 <= s <= 1 + 1e-6 for _, s in hasil)
+    # Mengulang query hampir tidak mengubah arah vektornya, jadi urutan & skor praktis sama.
+    panjang = indeks.cari(" ".join([teks] * 5), k=100, min_skor=-1)
+    assert [i for i, _ in panjang] == [i for i, _ in hasil]
+    np.testing.assert_allclose([s for _, s in panjang], [s for _, s in hasil], atol=0.01)
+
+
+def test_hapus_ganti_dan_kompaksi(tmp_path):
+    indeks = _indeks(tmp_path)
+    teks = rekomendasi.teks_problem("Kipas berisik")
+    semua = {i for i, _ in indeks.cari(teks, k=100)}
+    assert len(semua) == 20
+    indeks.hapus(sorted(semua)[:5])
+    indeks.tambah([(sorted(semua)[5], "SSD tidak terbaca", "")])     # ganti isi dokumen yang sama
+    sisa = {i for i, _ in indeks.cari(teks, k=100)}
+    assert sisa == set(sorted(semua)[6:])
+    skor = indeks.cari(teks, k=100)
+    indeks.kompaksi()
+    assert indeks.jumlah == indeks.jumlah_aktif == len(NAMA) * 20 - 5
+    assert [i for i, _ in indeks.cari(teks, k=100)] == [i for i, _ in skor]
+    np.testing.assert_allclose([s for _, s in indeks.cari(teks, k=100)], [s for _, s in skor], rtol=1e-5)
+    assert rekomendasi.IndeksRekomendasi(indeks.direktori).cari(teks, k=100) == indeks.cari(teks, k=100)
+
+
+def _tambah_dari_proses(direktori: str, awal: int):
+    import sys
+    sys.path.insert(0, DIREKTORI_APLIKASI)
+    import rekomendasi as r
+    indeks = r.IndeksRekomendasi(direktori)
+    for j in range(20):
+        indeks.tambah([(awal + j * 10 + m, "Kipas berisik", f"proses {awal}") for m in range(10)])
+
+
+def test_beberapa_proses_menulis_bersamaan(tmp_path):
+    direktori = str(tmp_path / "indeks")
+    rekomendasi.IndeksRekomendasi(direktori)
+    konteks = multiprocessing.get_context("spawn")
+    proses = [konteks.Process(target=_tambah_dari_proses, args=(direktori, awal)) for awal in (1000, 2000, 3000)]
+    for p in proses: p.start()
+    for p in proses: p.join(60)
+    assert [p.exitcode for p in proses] == [0, 0, 0]
+
+    indeks = rekomendasi.IndeksRekomendasi(direktori)
+    ids = np.asarray(indeks._ids[:indeks.jumlah])
+    assert indeks.jumlah_aktif == len(set(ids.tolist())) == 600
+    assert int(indeks._awal[indeks.jumlah]) == indeks.nnz
+    assert len(indeks.cari(rekomendasi.teks_problem("kipas berisik"), k=1000)) == 600
+
+
+def test_rekomendasi_solusi_kosong_untuk_teks_acak(diagnoser):
+    for nama in NAMA:
+        assert diagnoser.tambah_problem(buat_problem(nama))
+    assert diagnoser.rekomendasi_solusi("xyzqw").empty
+    assert diagnoser.rekomendasi_solusi("Kipas berisik")["Masalah"].iloc[0] == "Kipas berisik"
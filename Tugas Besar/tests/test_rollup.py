@@ -0,0 +1,81 @@
+import datetime
+import pandas as pd
+import database
+from conftest import buat_problem
+from data_sintetis import isi_database
+
+HARI_INI = datetime.date.today()
+SQL_ROLLUP = "SELECT tanggal, kategori_id, katalog_id, jumlah FROM rollup_harian ORDER BY 1, 2, 3"
+SQL_HITUNG = """
+    SELECT tanggal_masuk, COALESCE(kategori_id, 0), katalog_id, COUNT(*) FROM problems_data
+    GROUP BY 1, 2, 3 ORDER BY 1, 2, 3
+"""
+
+
+def _rollup_sama_dengan_count():
+    assert [tuple(r) for r in database.fetch_query(SQL_ROLLUP) or []] == \
+           [tuple(r) for r in database.fetch_query(SQL_HITUNG) or []]
+
+
+def test_rollup_mengikuti_tambah_ubah_hapus_dan_batch(diagnoser):
+    isi_database(diagnoser, 400, tahun=1)
+    _rollup_sama_dengan_count()
+
+    assert diagnoser.tambah_problem(buat_problem("Kipas berisik", HARI_INI, "Suhu (Overheating)"))
+    _rollup_sama_dengan_count()
+    problem = diagnoser.get_problem_by_id(max(p.id for p in diagnoser.get_semua_problems()))
+
+    problem.kategori_problem = "Tampilan (Layar/Grafis)"              # pindah kategori
+    assert diagnoser.ubah_problem(problem)
+    _rollup_sama_dengan_count()
+    problem.tanggal_masuk = HARI_INI - datetime.timedelta(days=40)     # pindah tanggal
+    assert diagnoser.ubah_problem(problem)
+    _rollup_sama_dengan_count()
+    problem.nama_problem = "Layar berkedip"                            # pindah entri katalog
+    assert diagnoser.ubah_problem(problem)
+    _rollup_sama_dengan_count()
+
+    assert diagnoser.hapus_problem(problem.id)
+    _rollup_sama_dengan_count()
+    ids = [p.id for p in diagnoser.get_semua_problems()][:50]
+    assert diagnoser.hapus_problem_batch(ids)
+    _rollup_sama_dengan_count()
+    # Hitungan nol tidak tertinggal sebagai baris rollup.
+    assert database.fetch_query("SELECT COUNT(*) FROM rollup_harian WHERE jumlah <= 0")[0][0] == 0
+
+    assert diagnoser.rebuild_rollup() == len(database.fetch_query(SQL_ROLLUP))
+    _rollup_sama_dengan_count()
+
+
+def test_analitik_rollup_sama_dengan_hitungan_dari_tiket(diagnoser):
+    isi_database(diagnoser, 1500, tahun=2)
+    df = diagnoser.get_dataframe_problems()
+    mulai, akhir = HARI_INI - datetime.timedelta(days=200), HARI_INI - datetime.timedelta(days=20)
+
+    frekuensi = diagnoser.get_frekuensi_problem(mulai, akhir)
+    dalam_rentang = df[(df["Tanggal"] >= mulai) & (df["Tanggal"] <= akhir)]
+    assert dict(zip(frekuensi["Masalah"], frekuensi["Jumlah Kejadian"])) == \
+           dalam_rentang["Masalah"].value_counts().to_dict()
+    assert list(frekuensi["Jumlah Kejadian"]) == sorted(frekuensi["Jumlah Kejadian"], reverse=True)
+
+    per_kategori = diagnoser.get_jumlah_per_kategori()
+    assert dict(zip(per_kategori["Kategori"], per_kategori["Jumlah Masalah"])) == df["Kategori"].value_counts().to_dict()
+
+    kategori = df["Kategori"].iloc[0]
+    harian = diagnoser.get_tren_problem_harian(kategori)
+    per_hari = df[df["Kategori"] == kategori].groupby("Tanggal").size()
+    assert harian["Jumlah Masalah"].sum() == per_hari.sum()
+    assert (harian.index.to_series().diff().dropna() == pd.Timedelta(days=1)).all()     # hari kosong diisi 0
+    assert harian.loc[pd.Timestamp(per_hari.index[0]), "Jumlah Masalah"] == per_hari.iloc[0]
+
+    bulanan = diagnoser.get_tren_problem_bulanan()
+    per_bulan = df.groupby(pd.to_datetime(df["Tanggal"]).dt.to_period("M").dt.to_timestamp()).size()
+    assert bulanan["Jumlah Masalah"].to_dict() == per_bulan.to_dict()
+
+
+def test_analitik_kosong(diagnoser):
+    assert diagnoser.get_frekuensi_problem().empty
+    assert diagnoser.get_jumlah_per_kategori().empty
+    harian = diagnoser.get_tren_problem_harian()
+    assert harian.empty and list(harian.columns) == ["Jumlah Masalah"]
+    assert diagnoser.get_tren_problem_bulanan().empty
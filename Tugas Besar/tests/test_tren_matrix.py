@@ -0,0 +1,56 @@
+import datetime
+import pandas as pd
+import pytest
+from data_sintetis import isi_database
+
+# Periode pandas per granularitas (minggu W-SUN = Senin s/d Minggu) dan frekuensi awal periodenya.
+PERIODE = {"D": "D", "W": "W-SUN", "M": "M", "Q": "Q"}
+AWAL_PERIODE = {"D": "D", "W": "W-MON", "M": "MS", "Q": "QS"}
+
+
+def _acuan(df: pd.DataFrame, granularitas: str) -> pd.DataFrame:
+    """Matriks yang sama dihitung dari tiket mentah dengan pandas."""
+    tanggal = pd.to_datetime(df["Tanggal"])
+    hasil = pd.crosstab(tanggal.dt.to_period(PERIODE[granularitas]).dt.start_time, df["Kategori"])
+    index = pd.date_range(hasil.index.min(), hasil.index.max(), freq=AWAL_PERIODE[granularitas])
+    return hasil.reindex(index, fill_value=0)
+
+
+@pytest.mark.parametrize("granularitas", ["D", "W", "M", "Q"])
+def test_matriks_sama_dengan_crosstab(diagnoser, granularitas):
+    isi_database(diagnoser, 1500, tahun=2)
+    df = diagnoser.get_dataframe_problems()
+    matriks = diagnoser.get_tren_matrix(granularitas)
+    acuan = _acuan(df, granularitas)
+
+    assert list(matriks.columns) == sorted(df["Kategori"].unique())
+    assert matriks.index.name == "periode"
+    assert (matriks.index == acuan.index).all()
+    assert (matriks.to_numpy() == acuan[matriks.columns].to_numpy()).all()
+    if granularitas == "W":
+        assert (matriks.index.dayofweek == 0).all()                   # minggu dimulai Senin
+
+
+def test_rentang_dan_kategori_tanpa_data_diisi_nol(diagnoser):
+    isi_database(diagnoser, 300, tahun=1)
+    df = diagnoser.get_dataframe_problems()
+    hari_ini = datetime.date.today()
+    mulai, akhir = hari_ini - datetime.timedelta(days=400), hari_ini - datetime.timedelta(days=30)
+    kategori = ["Audio", "Kategori Tanpa Tiket"]
+
+    matriks = diagnoser.get_tren_matrix("D", kategori, mulai, akhir)
+    assert list(matriks.columns) == kategori
+    assert (matriks.index[0].date(), matriks.index[-1].date(), len(matriks)) == (mulai, akhir, 371)
+    dalam = df[(df["Tanggal"] >= mulai) & (df["Tanggal"] <= akhir)]
+    assert matriks["Audio"].sum() == (dalam["Kategori"] == "Audio").sum()
+    assert matriks["Kategori Tanpa Tiket"].eq(0).all()
+
+    assert diagnoser.get_tren_matrix("M", "Semua Kategori").to_numpy().sum() == len(df)
+    assert diagnoser.get_tren_matrix("D", tanggal_mulai=akhir, tanggal_akhir=mulai).empty
+    with pytest.raises(ValueError):
+        diagnoser.get_tren_matrix("Y")
+
+
+def test_database_kosong(diagnoser):
+    matriks = diagnoser.get_tren_matrix("W")
+    assert matriks.empty and matriks.index.name == "periode"
@@ -0,0 +1,42 @@
+import threading
+import time
+import database
+from conftest import buat_problem
+
+
+def test_hook_setelah_tulis_tidak_di_thread_penulis(diagnoser):
+    thread_hook = []
+    diagnoser._setelah_tambah = lambda: thread_hook.append(threading.current_thread().name)
+
+    assert diagnoser.tambah_problem(buat_problem()) is True
+    future = diagnoser.tambah_problem(buat_problem(), tunggu=False)
+    assert isinstance(future.result(), int)
+    assert thread_hook[0] == threading.current_thread().name
+    assert thread_hook[1].startswith("pasca-tulis")
+
+
+def test_hook_lambat_tidak_menahan_antrean_tulis(diagnoser):
+    mulai_hook, lepas = threading.Event(), threading.Event()
+
+    def hook_lambat():
+        mulai_hook.set()
+        lepas.wait(5)
+    diagnoser._setelah_tambah = hook_lambat
+
+    future = diagnoser.tambah_problem(buat_problem(), tunggu=False)
+    assert mulai_hook.wait(5)
+    # Hook masih berjalan: Future belum selesai, tapi tulisan lain tetap di-commit oleh penulis.
+    assert not future.done()
+    assert database.kirim_tulis(lambda conn: conn.execute("SELECT 1").fetchone()[0]).result(timeout=2) == 1
+    lepas.set()
+    assert isinstance(future.result(timeout=5), int)
+
+
+def test_hook_gagal_tidak_menggagalkan_tulisan(diagnoser):
+    def hook_rusak():
+        raise RuntimeError("indeks rusak")
+    diagnoser._setelah_tambah = hook_rusak
+
+    assert diagnoser.tambah_problem(buat_problem()) is True
+    assert isinstance(diagnoser.tambah_problem(buat_problem(), tunggu=False).result(timeout=5), int)
+    assert diagnoser.hitung_problems() == 2
@@ -0,0 +1,209 @@
+# uji_beban.py
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit, urlencode
+from benchmark import ringkas_latensi
+from data_sintetis import GeneratorProblem
+
+# Campuran permintaan baca (endpoint, bobot). Daftar berhalaman diambil sampai `HALAMAN_MAKS` halaman.
+CAMPURAN_BACA = [("daftar", 4), ("frekuensi", 3), ("tren", 2), ("kategori", 2), ("cari", 2), ("detail", 3)]
+HALAMAN_MAKS = 5
+KATA_CARI = ["layar", "wifi", "panas", "baterai", "lambat", "bunyi", "driver", "keyboard"]
+
+
+class Klien:
+    """Satu koneksi HTTP keep-alive + cache ETag per URL (seperti klien polling di bengkel)."""
+
+    def __init__(self, url: str, pakai_etag: bool = True):
+        bagian = urlsplit(url)
+        self.conn = http.client.HTTPConnection(bagian.hostname, bagian.port or 80, timeout=60)
+        self.pakai_etag = pakai_etag
+        self.etag: dict[str, str] = {}
+
+    def minta(self, metode: str, path: str, body=None, header: dict | None = None) -> tuple[int, bytes, float]:
+        header = dict(header or {})
+        if metode == "GET" and self.pakai_etag and path in self.etag:
+            header["If-None-Match"] = self.etag[path]
+        mulai = time.perf_counter()
+        try:
+            self.conn.request(metode, path, body=body, headers=header)
+            respons = self.conn.getresponse()
+            isi = respons.read()
+        except (http.client.HTTPException, OSError):
+            self.conn.close()       # koneksi putus: buka ulang di permintaan berikutnya
+            raise
+        durasi = time.perf_counter() - mulai
+        if metode == "GET" and respons.getheader("ETag"):
+            self.etag[path] = respons.getheader("ETag")
+        return respons.status, isi, durasi
+
+
+def _server_lokal(jumlah: int, seed: int) -> tuple[subprocess.Popen, str, tempfile.TemporaryDirectory]:
+    direktori = tempfile.TemporaryDirectory(prefix="uji_beban_")
+    db = os.path.join(direktori.name, "uji.db")
+    here = os.path.dirname(os.path.abspath(__file__))
+    if jumlah:
+        subprocess.run([sys.executable, os.path.join(here, "data_sintetis.py"), str(jumlah), "--seed", str(seed),
+                        "--db", db], check=True, stdout=subprocess.DEVNULL)
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    proses = subprocess.Popen([sys.executable, os.path.join(here, "layanan_http.py"), "--port", str(port),
+                               "--db", db], stdout=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}"
+    for _ in range(200):
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.1): break
+        except OSError:
+            time.sleep(0.05)
+    return proses, url, direktori
+
+
+def uji_ingest(url: str, jumlah: int, batch: int, klien: int, seed: int) -> dict:
+    """Kirim `jumlah` tiket sintetis sebagai NDJSON, `batch` baris per POST, dari `klien` thread."""
+    generator = GeneratorProblem(seed=seed)
+    antrean = list(range(0, jumlah, batch))
+    kunci = threading.Lock()
+    durasi, hasil = [], {"berhasil": 0, "gagal": 0, "error_http": 0}
+
+    def kerja():
+        k = Klien(url)
+        while True:
+            with kunci:
+                if not antrean: return
+                mulai = antrean.pop()
+            body = "\n".join(json.dumps(p.to_dict()) for p in generator.buat(min(batch, jumlah - mulai), mulai))
+            status, isi, d = k.minta("POST", "/problems", body.encode(), {"Content-Type": "application/x-ndjson"})
+            with kunci:
+                durasi.append(d)
+                if status != 200:
+                    hasil["error_http"] += 1
+                    continue
+                data = json.loads(isi)
+                hasil["berhasil"] += data["berhasil"]
+                hasil["gagal"] += data["gagal"]
+
+    mulai = time.perf_counter()
+    thread = [threading.Thread(target=kerja) for _ in range(klien)]
+    for t in thread: t.start()
+    for t in thread: t.join()
+    total = time.perf_counter() - mulai
+    return {**hasil, "detik": round(total, 3), "baris_per_detik": round(hasil["berhasil"] / total, 1),
+            "latensi_post": ringkas_latensi(durasi, baris=batch) if durasi else None}
+
+
+def uji_baca(url: str, durasi_detik: float, klien: int, pakai_etag: bool, tulis_per_detik: float,
+             seed: int) -> dict:
+    """`klien` thread polling campuran endpoint baca selama `durasi_detik`; opsional tulisan latar belakang
+    (`tulis_per_detik`) supaya ETag sesekali berubah seperti di pemakaian nyata."""
+    nama, bobot = zip(*CAMPURAN_BACA)
+    kunci = threading.Lock()
+    latensi = defaultdict(list)
+    status_hitung = defaultdict(int)
+    batas_waktu = time.monotonic() + durasi_detik
+    k_awal = Klien(url)
+    _, isi, _ = k_awal.minta("GET", "/problems?batas=200")
+    ids = [row["ID"] for row in json.loads(isi)["data"]] or [1]
+
+    def path_acak(rnd: random.Random, jenis: str, kursor: dict) -> str:
+        if jenis == "daftar":
+            query = {"batas": 50}
+            if kursor.get("setelah") and kursor["halaman"] < HALAMAN_MAKS: query["setelah"] = kursor["setelah"]
+            else: kursor["halaman"] = 0
+            return "/problems?" + urlencode(query)
+        if jenis == "frekuensi": return "/statistik/frekuensi"
+        if jenis == "kategori": return "/statistik/kategori"
+        if jenis == "tren": return "/statistik/tren?periode=" + rnd.choice(["harian", "bulanan"])
+        if jenis == "cari": return "/cari?" + urlencode({"q": rnd.choice(KATA_CARI)})
+        return f"/problems/{rnd.choice(ids)}"
+
+    def kerja(nomor: int):
+        rnd = random.Random(seed + nomor)
+        k = Klien(url, pakai_etag)
+        kursor = {"setelah": None, "halaman": 0}
+        while time.monotonic() < batas_waktu:
+            jenis = rnd.choices(nama, weights=bobot)[0]
+            status, isi, d = k.minta("GET", path_acak(rnd, jenis, kursor))
+            if jenis == "daftar" and status == 200:
+                kursor["setelah"] = json.loads(isi)["berikutnya"]
+                kursor["halaman"] += 1
+            with kunci:
+                latensi[jenis].append(d)
+                status_hitung[status] += 1
+
+    def tulis_latar():
+        k = Klien(url)
+        generator = GeneratorProblem(seed=seed + 99)
+        i = 0
+        while time.monotonic() < batas_waktu:
+            p = next(generator.buat(1, 10_000_000 + i))
+            k.minta("POST", "/problems", json.dumps(p.to_dict()).encode())
+            i += 1
+            time.sleep(1 / tulis_per_detik)
+
+    thread = [threading.Thread(target=kerja, args=(i,)) for i in range(klien)]
+    if tulis_per_detik > 0: thread.append(threading.Thread(target=tulis_latar))
+    mulai = time.perf_counter()
+    for t in thread: t.start()
+    for t in thread: t.join()
+    total = time.perf_counter() - mulai
+    jumlah = sum(len(v) for v in latensi.values())
+    return {"detik": round(total, 2), "permintaan": jumlah, "permintaan_per_detik": round(jumlah / total, 1),
+            "status": dict(status_hitung), "endpoint": {j: ringkas_latensi(d) for j, d in latensi.items()}}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Uji beban layanan_http.py (ingest NDJSON + polling baca).")
+    parser.add_argument("--url", help="URL layanan yang sudah berjalan (default: jalankan server lokal sementara)")
+    parser.add_argument("--isi-awal", type=int, default=50_000, help="Tiket sintetis di server lokal sementara")
+    parser.add_argument("--ingest", type=int, default=20_000, help="Jumlah tiket yang dikirim lewat POST")
+    parser.add_argument("--batch", type=int, default=1000, help="Baris NDJSON per POST")
+    parser.add_argument("--klien", type=int, default=8)
+    parser.add_argument("--durasi", type=float, default=10, help="Lama fase baca (detik)")
+    parser.add_argument("--tanpa-etag", action="store_true", help="Jangan kirim If-None-Match (pembanding)")
+    parser.add_argument("--tulis-per-detik", type=float, default=2, help="Tulisan latar selama fase baca")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", "-o", help="Tulis hasil ke file JSON")
+    args = parser.parse_args(argv)
+
+    proses = direktori = None
+    url = args.url
+    if not url:
+        print(f"[uji_beban] Menyiapkan server lokal dengan {args.isi_awal:,} tiket...", flush=True)
+        proses, url, direktori = _server_lokal(args.isi_awal, args.seed)
+    try:
+        hasil = {"url": url, "klien": args.klien, "etag": not args.tanpa_etag}
+        if args.ingest:
+            hasil["ingest"] = uji_ingest(url, args.ingest, args.batch, args.klien, args.seed + 1)
+            r = hasil["ingest"]
+            print(f"[uji_beban] Ingest: {r['berhasil']:,} baris dalam {r['detik']} s ({r['baris_per_detik']:,} baris/s), "
+                  f"p50 POST {r['latensi_post']['p50_ms']:.1f} ms, gagal {r['gagal']}, error HTTP {r['error_http']}")
+        hasil["baca"] = r = uji_baca(url, args.durasi, args.klien, not args.tanpa_etag, args.tulis_per_detik,
+                                     args.seed)
+        print(f"[uji_beban] Baca: {r['permintaan']:,} permintaan ({r['permintaan_per_detik']:,}/s), status {r['status']}")
+        for jenis, ringkas in sorted(r["endpoint"].items()):
+            print(f"  {jenis:<10} n {ringkas['n']:>7}  p50 {ringkas['p50_ms']:>8.2f} ms  "
+                  f"p90 {ringkas['p90_ms']:>8.2f} ms  p99 {ringkas['p99_ms']:>8.2f} ms")
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(hasil, f, indent=2)
+    finally:
+        if proses is not None:
+            proses.terminate()
+            proses.wait(10)
+            direktori.cleanup()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())